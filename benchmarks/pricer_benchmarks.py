@@ -0,0 +1,348 @@
+"""
+Benchmarks reproductibles des pricers, sans accès réseau.
+
+Chaque benchmark utilise une option et un sous-jacent synthétiques (Option.from_values,
+StockData.from_values) et une graine fixe. Pour chaque configuration (taille de lot, nombre
+de trajectoires, nombre de pas), on mesure le temps (médiane de plusieurs répétitions, après
+un appel de préchauffage qui absorbe la compilation Numba), le débit, le pic de mémoire
+allouée (tracemalloc) et l'erreur par rapport au prix de référence (formule fermée de
+Black-Scholes, méthode COS pour Heston) : les couples (temps, erreur) d'un même pricer
+forment sa courbe de convergence.
+
+    python -m benchmarks.pricer_benchmarks -o resultats.json
+    python -m benchmarks.pricer_benchmarks --quick --compare resultats.json
+
+Les résultats sont écrits en JSON ; --compare affiche le rapport des temps avec un fichier
+produit sur un autre commit.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from data.stock_data import StockData
+from models.binomial_tree_pricer import binomial_tree_prices
+from models.black_scholes_pricer import BlackScholesPricer, black_scholes_prices
+from models.finite_difference_pricer import finite_difference_prices
+from models.greek_calculator import GreekCalculator, black_scholes_greeks
+from models.heston_fft_pricer import cos_put_prices
+from models.heston_pricer import HestonPricer
+from models.instrumentation import RecordingInstrumentation, set_instrumentation
+from models.monte_carlo_pricer import MonteCarloPricer
+from models.option import Option
+
+# Contrat de référence : call/put à la monnaie, un an
+SPOT = 100.0
+STRIKE = 100.0
+MATURITY = 1.0
+RATE = 0.05
+VOLATILITY = 0.2
+SEED = 12345
+
+# Paramètres de Heston des benchmarks (vol of vol marquée, pour que le schéma de discrétisation compte)
+HESTON_PARAMS = {'kappa': 2.0, 'theta': 0.04, 'xi': 0.5, 'rho': -0.7, 'v0': 0.04}
+
+# Balayages (complet, rapide)
+SWEEPS = {
+    'batch_sizes': ([1, 100, 10_000, 1_000_000], [1, 100, 10_000]),
+    'object_counts': ([1_000], [100]),
+    'mc_paths': ([10_000, 100_000, 1_000_000, 10_000_000], [10_000, 100_000]),
+    'mc_variants': (['pseudo', 'antithetic', 'control_variate', 'sobol'], ['pseudo', 'antithetic', 'sobol']),
+    'heston_paths': ([10_000, 100_000, 1_000_000], [10_000]),
+    'heston_steps': ([16, 64, 252], [16, 64]),
+    'tree_steps': ([50, 100, 500, 1000, 2000], [50, 100, 500]),
+    'tree_strikes': ([1, 10, 100], [1, 10]),
+    'fd_space_steps': ([100, 200, 400, 800, 1600], [100, 200, 400]),
+}
+
+
+def synthetic_contract(strike=STRIKE, maturity=MATURITY, rate=RATE, spot=SPOT, volatility=VOLATILITY):
+    """
+    :return: Tuple (Option, StockData) synthétiques, construits sans source de données.
+    """
+    return (Option.from_values('BENCH', strike, maturity, rate),
+            StockData.from_values('BENCH', spot, volatility))
+
+
+def measure(function, repeats):
+    """
+    Chronomètre function après un appel de préchauffage.
+
+    :return: Dictionnaire (dernière valeur renvoyée, temps médian et minimal, temps de compilation
+             Numba du préchauffage, pic de mémoire allouée pendant un appel).
+    """
+    instrumentation = RecordingInstrumentation()
+    previous = set_instrumentation(instrumentation)
+    try:
+        start = time.perf_counter()
+        function()
+        warmup_seconds = time.perf_counter() - start
+    finally:
+        set_instrumentation(previous)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = function()
+        times.append(time.perf_counter() - start)
+
+    # Mesure mémoire séparée : tracemalloc ralentit les allocations
+    tracemalloc.start()
+    try:
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'value': value,
+        'seconds': statistics.median(times),
+        'min_seconds': min(times),
+        'repeats': repeats,
+        'warmup_seconds': warmup_seconds,
+        'numba_compile_seconds': instrumentation.numba_compile_seconds,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _result(benchmark, params, measurement, work, unit, price=None, reference=None, std_error=None):
+    result = {
+        'benchmark': benchmark,
+        'params': params,
+        'seconds': measurement['seconds'],
+        'min_seconds': measurement['min_seconds'],
+        'repeats': measurement['repeats'],
+        'numba_compile_seconds': measurement['numba_compile_seconds'],
+        'peak_memory_bytes': measurement['peak_memory_bytes'],
+        'throughput': work / measurement['seconds'] if measurement['seconds'] > 0 else None,
+        'throughput_unit': unit,
+    }
+    if price is not None:
+        result.update(price=float(price), reference=float(reference), abs_error=abs(float(price) - float(reference)))
+    if std_error is not None:
+        result['std_error'] = float(std_error)
+    return result
+
+
+def bench_black_scholes(sweep, repeats):
+    results = []
+    rng = np.random.default_rng(SEED)
+    for size in sweep['batch_sizes']:
+        strikes = rng.uniform(50, 150, size)
+        maturities = rng.uniform(0.1, 2.0, size)
+        measurement = measure(lambda: black_scholes_prices(SPOT, strikes, maturities, RATE, VOLATILITY), repeats)
+        results.append(_result('black_scholes_batch', {'batch_size': size}, measurement, size, 'contracts/s'))
+
+    for count in sweep['object_counts']:
+        pricers = [BlackScholesPricer(*synthetic_contract(strike=strike)) for strike in rng.uniform(50, 150, count)]
+        measurement = measure(lambda: [pricer.price_call() for pricer in pricers], repeats)
+        results.append(_result('black_scholes_pricer', {'objects': count}, measurement, count, 'contracts/s'))
+    return results
+
+
+def bench_greeks(sweep, repeats):
+    results = []
+    rng = np.random.default_rng(SEED)
+    for size in sweep['batch_sizes']:
+        strikes = rng.uniform(50, 150, size)
+        maturities = rng.uniform(0.1, 2.0, size)
+        measurement = measure(lambda: black_scholes_greeks(SPOT, strikes, maturities, RATE, VOLATILITY), repeats)
+        results.append(_result('greeks_batch', {'batch_size': size}, measurement, size, 'contracts/s'))
+
+    for count in sweep['object_counts']:
+        calculators = [GreekCalculator(*synthetic_contract(strike=strike)) for strike in rng.uniform(50, 150, count)]
+        measurement = measure(lambda: [calculator.calculate_all_greeks() for calculator in calculators], repeats)
+        results.append(_result('greek_calculator', {'objects': count}, measurement, count, 'contracts/s'))
+    return results
+
+
+def bench_monte_carlo(sweep, repeats):
+    results = []
+    option, stock_data = synthetic_contract()
+    reference = black_scholes_prices(SPOT, STRIKE, MATURITY, RATE, VOLATILITY)
+    for variant in sweep['mc_variants']:
+        options = {'antithetic': variant == 'antithetic', 'control_variate': variant == 'control_variate',
+                   'sampling': 'sobol' if variant == 'sobol' else 'pseudo'}
+        for num_paths in sweep['mc_paths']:
+            # Un nouveau pricer à chaque appel : price_call_put garde sinon son résultat en cache
+            measurement = measure(lambda: MonteCarloPricer(option, stock_data, num_paths, seed=SEED,
+                                                           **options).estimate_call_put(), repeats)
+            call_result = measurement['value'][0]
+            results.append(_result('monte_carlo', {'variant': variant, 'num_paths': num_paths}, measurement,
+                                   call_result.num_paths, 'paths/s', call_result.price, reference,
+                                   call_result.std_error))
+    return results
+
+
+def bench_heston(sweep, repeats):
+    results = []
+    option, stock_data = synthetic_contract()
+    reference_put = cos_put_prices(STRIKE, SPOT, RATE, MATURITY, **HESTON_PARAMS, num_terms=512)[0]
+    reference = reference_put + SPOT - STRIKE * np.exp(-RATE * MATURITY)
+    for scheme in ('qe', 'euler'):
+        for num_steps in sweep['heston_steps']:
+            for num_paths in sweep['heston_paths']:
+                measurement = measure(lambda: HestonPricer(option, stock_data, **HESTON_PARAMS, seed=SEED,
+                                                           scheme=scheme).price_call_put(num_paths, num_steps),
+                                      repeats)
+                params = {'scheme': scheme, 'num_steps': num_steps, 'num_paths': num_paths}
+                results.append(_result('heston_mc', params, measurement, num_paths * num_steps, 'path-steps/s',
+                                       measurement['value'][0], reference))
+    return results
+
+
+def bench_binomial(sweep, repeats):
+    results = []
+    reference = black_scholes_prices(SPOT, STRIKE, MATURITY, RATE, VOLATILITY)
+    for method in ('crr', 'bbs', 'bbsr'):
+        for num_steps in sweep['tree_steps']:
+            measurement = measure(lambda: binomial_tree_prices(SPOT, STRIKE, RATE, VOLATILITY, MATURITY, num_steps,
+                                                               method=method), repeats)
+            results.append(_result('binomial', {'method': method, 'num_steps': num_steps}, measurement,
+                                   num_steps * (num_steps + 1) / 2, 'nodes/s', measurement['value'][0], reference))
+
+    num_steps = sweep['tree_steps'][-1]
+    for num_strikes in sweep['tree_strikes']:
+        strikes = np.linspace(80, 120, num_strikes)
+        measurement = measure(lambda: binomial_tree_prices(SPOT, strikes, RATE, VOLATILITY, MATURITY, num_steps,
+                                                           american=True), repeats)
+        results.append(_result('binomial_american_batch', {'num_steps': num_steps, 'num_strikes': num_strikes},
+                               measurement, num_strikes, 'contracts/s'))
+    return results
+
+
+def bench_finite_difference(sweep, repeats):
+    results = []
+    reference = black_scholes_prices(SPOT, STRIKE, MATURITY, RATE, VOLATILITY)
+    for num_space_steps in sweep['fd_space_steps']:
+        num_time_steps = num_space_steps // 2
+        measurement = measure(lambda: finite_difference_prices(SPOT, STRIKE, RATE, VOLATILITY, MATURITY,
+                                                               num_space_steps=num_space_steps,
+                                                               num_time_steps=num_time_steps), repeats)
+        params = {'num_space_steps': num_space_steps, 'num_time_steps': num_time_steps}
+        results.append(_result('finite_difference', params, measurement, num_space_steps * num_time_steps,
+                               'nodes/s', measurement['value'][0], reference))
+
+    num_space_steps = sweep['fd_space_steps'][-1]
+    for num_strikes in sweep['tree_strikes']:
+        strikes = np.linspace(80, 120, num_strikes)
+        measurement = measure(lambda: finite_difference_prices(SPOT, strikes, RATE, VOLATILITY, MATURITY, False,
+                                                               american=True, num_space_steps=num_space_steps,
+                                                               num_time_steps=num_space_steps // 2), repeats)
+        results.append(_result('finite_difference_american_batch',
+                               {'num_space_steps': num_space_steps, 'num_strikes': num_strikes},
+                               measurement, num_strikes, 'contracts/s'))
+    return results
+
+
+BENCHMARKS = {
+    'black_scholes': bench_black_scholes,
+    'greeks': bench_greeks,
+    'monte_carlo': bench_monte_carlo,
+    'heston': bench_heston,
+    'binomial': bench_binomial,
+    'finite_difference': bench_finite_difference,
+}
+
+
+def environment():
+    """
+    :return: Dictionnaire décrivant la machine, les versions et le commit, pour comparer les résultats.
+    """
+    import numba
+    import scipy
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'numba': numba.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(names=None, quick=False, repeats=None):
+    """
+    Exécute les benchmarks demandés.
+
+    :param names: Noms des benchmarks, parmi BENCHMARKS (None pour tous).
+    :param quick: Balayages réduits, pour une vérification rapide.
+    :param repeats: Nombre de répétitions chronométrées (par défaut 1 en mode rapide, 3 sinon).
+    :return: Dictionnaire {'environment': ..., 'quick': ..., 'results': [...]} sérialisable en JSON.
+    """
+    names = list(BENCHMARKS) if names is None else names
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks {unknown}, expected some of {tuple(BENCHMARKS)}")
+    sweep = {name: values[1 if quick else 0] for name, values in SWEEPS.items()}
+    repeats = (1 if quick else 3) if repeats is None else repeats
+
+    results = []
+    for name in names:
+        results += BENCHMARKS[name](sweep, repeats)
+    return {'environment': environment(), 'quick': quick, 'results': results}
+
+
+def _key(result):
+    return result['benchmark'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(current, baseline):
+    """
+    Rapproche deux séries de résultats par (benchmark, paramètres).
+
+    :return: Liste de tuples (benchmark, paramètres, temps de référence, temps actuel, rapport actuel / référence).
+    """
+    baseline_seconds = {_key(result): result['seconds'] for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = _key(result)
+        if key in baseline_seconds:
+            rows.append((key[0], key[1], baseline_seconds[key], result['seconds'],
+                         result['seconds'] / baseline_seconds[key]))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne des pricers d'options.")
+    parser.add_argument('-o', '--output', help="Fichier JSON des résultats (par défaut la sortie standard)")
+    parser.add_argument('--only', nargs='+', choices=tuple(BENCHMARKS), help="Benchmarks à exécuter")
+    parser.add_argument('--quick', action='store_true', help="Balayages réduits")
+    parser.add_argument('--repeats', type=int, help="Nombre de répétitions chronométrées")
+    parser.add_argument('--compare', help="Fichier JSON de référence (autre commit) à comparer")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only, args.quick, args.repeats)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=1)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print(f"{'Benchmark':<25} {'Params':<55} {'Base (s)':>10} {'Now (s)':>10} {'Ratio':>7}", file=sys.stderr)
+        for benchmark, params, base_seconds, seconds, ratio in compare(report, baseline):
+            print(f"{benchmark:<25} {params:<55} {base_seconds:>10.4f} {seconds:>10.4f} {ratio:>7.2f}",
+                  file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
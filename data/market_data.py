@@ -1,15 +1,59 @@
-import yfinance as yf
+import numpy as np
+from datetime import datetime
+from data.market_data_provider import get_default_provider
 
 class MarketData:
-    def __init__(self, option):
+    def __init__(self, option, provider=None):
+        """
+        :param option: L'option dont on récupère les prix de marché (classe Option).
+        :param provider: Source de données de marché (par défaut celle de l'option).
+        """
         self.option = option
+        if provider is None:
+            provider = getattr(option, 'provider', None) or get_default_provider()
+        self.provider = provider
 
     def get_market_price(self, call=True):
-        options = yf.Ticker(self.option.ticker).option_chain(self.option.maturity_date)
+        # La chaîne est mise en cache par le provider : call et put ne la téléchargent qu'une fois
+        options = self.provider.get_option_chain(self.option.ticker, self.option.maturity_date)
         if call:
             option_type = options.calls
         else:
             option_type = options.puts
 
         closest_strike_idx = (option_type['strike'] - self.option.strike_price).abs().idxmin()
-        return option_type.iloc[closest_strike_idx]['lastPrice']
\ No newline at end of file
+        return option_type.iloc[closest_strike_idx]['lastPrice']
+
+    def get_option_chain_quotes(self, max_expirations=None):
+        """
+        Récupère toutes les cotations (calls et puts) de la chaîne d'options du sous-jacent.
+
+        Le prix retenu est le milieu bid/ask lorsqu'il est disponible, le dernier prix sinon.
+        Les cotations sans prix positif et les échéances passées sont ignorées.
+
+        :param max_expirations: Nombre maximal d'échéances récupérées (None pour toutes).
+        :return: Tuple d'arrays (strikes, maturités en années, prix, is_call).
+        """
+        expirations = self.provider.get_expirations(self.option.ticker)
+        if max_expirations is not None:
+            expirations = expirations[:max_expirations]
+
+        now = datetime.now()
+        strikes, maturities, prices, is_call = [], [], [], []
+        for expiration in expirations:
+            T = (datetime.strptime(expiration, "%Y-%m-%d") - now).days / 365.0
+            if T <= 0:
+                continue
+            chain = self.provider.get_option_chain(self.option.ticker, expiration)
+            for quotes, call in ((chain.calls, True), (chain.puts, False)):
+                mid = 0.5 * (quotes['bid'] + quotes['ask'])
+                price = np.where((quotes['bid'] > 0) & (quotes['ask'] > 0), mid, quotes['lastPrice'])
+                valid = np.isfinite(price) & (price > 0)
+                strikes.append(quotes['strike'].to_numpy()[valid])
+                prices.append(price[valid])
+                maturities.append(np.full(valid.sum(), T))
+                is_call.append(np.full(valid.sum(), call))
+
+        if not strikes:
+            return np.array([]), np.array([]), np.array([]), np.array([], dtype=bool)
+        return np.concatenate(strikes), np.concatenate(maturities), np.concatenate(prices), np.concatenate(is_call)
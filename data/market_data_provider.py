@@ -0,0 +1,360 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# pandas et yfinance sont importés à la demande : un worker qui ne touche pas au réseau
+# ou aux fichiers de marché ne paie pas leur coût d'import.
+
+# Chaîne d'options d'une échéance, avec les mêmes attributs que celle renvoyée par yfinance
+OptionChain = namedtuple('OptionChain', ['calls', 'puts'])
+
+
+class MarketDataProvider:
+    """
+    Interface des sources de données de marché.
+
+    Les sous-classes implémentent get_price_history, get_expirations et get_option_chain ;
+    les méthodes « batch » ont une implémentation par défaut qui boucle sur les tickers et
+    peuvent être surchargées par les sources capables de grouper leurs requêtes.
+    """
+
+    def get_price_history(self, ticker, period="1y"):
+        """
+        :return: DataFrame de l'historique (au moins une colonne 'Close'), indexé par date.
+        """
+        raise NotImplementedError
+
+    def get_expirations(self, ticker):
+        """
+        :return: Tuple des échéances disponibles, au format "%Y-%m-%d".
+        """
+        raise NotImplementedError
+
+    def get_option_chain(self, ticker, expiration):
+        """
+        :return: OptionChain (DataFrames calls et puts avec au moins 'strike', 'lastPrice', 'bid', 'ask').
+        """
+        raise NotImplementedError
+
+    def get_spot_price(self, ticker):
+        return float(self.get_price_history(ticker, "1d")['Close'].iloc[-1])
+
+    def get_price_histories(self, tickers, period="1y"):
+        """
+        :return: Dictionnaire {ticker: DataFrame de l'historique}.
+        """
+        return {ticker: self.get_price_history(ticker, period) for ticker in tickers}
+
+    def get_spot_prices(self, tickers):
+        """
+        :return: Dictionnaire {ticker: dernier prix}.
+        """
+        return {ticker: self.get_spot_price(ticker) for ticker in tickers}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Source de données yfinance. Les historiques de plusieurs tickers sont téléchargés en une requête.
+    """
+
+    def get_price_history(self, ticker, period="1y"):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(period=period)
+
+    def get_expirations(self, ticker):
+        import yfinance as yf
+        return tuple(yf.Ticker(ticker).options)
+
+    def get_option_chain(self, ticker, expiration):
+        import yfinance as yf
+        chain = yf.Ticker(ticker).option_chain(expiration)
+        return OptionChain(chain.calls, chain.puts)
+
+    def get_price_histories(self, tickers, period="1y"):
+        tickers = list(tickers)
+        if len(tickers) <= 1:
+            return super().get_price_histories(tickers, period)
+        import yfinance as yf
+        data = yf.download(tickers, period=period, group_by='ticker', threads=True, progress=False)
+        return {ticker: data[ticker].dropna(how='all') for ticker in tickers}
+
+    def get_spot_prices(self, tickers):
+        histories = self.get_price_histories(tickers, "1d")
+        return {ticker: float(history['Close'].iloc[-1]) for ticker, history in histories.items()}
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+    Source de données lue sur disque, pour les tests et le rejeu hors ligne.
+
+    Arborescence attendue (voir save_snapshot) :
+        <directory>/<ticker>/history.csv
+        <directory>/<ticker>/timezone.txt (facultatif : fuseau horaire de l'index de l'historique)
+        <directory>/<ticker>/options/<expiration>_calls.csv
+        <directory>/<ticker>/options/<expiration>_puts.csv
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _ticker_path(self, ticker, *parts):
+        return os.path.join(self.directory, ticker, *parts)
+
+    def get_price_history(self, ticker, period="1y"):
+        import pandas as pd
+        history = pd.read_csv(self._ticker_path(ticker, "history.csv"), index_col=0, parse_dates=True)
+        try:
+            with open(self._ticker_path(ticker, "timezone.txt")) as file:
+                timezone = file.read().strip()
+        except FileNotFoundError:
+            timezone = None
+        if timezone is not None or not isinstance(history.index, pd.DatetimeIndex):
+            # Dates avec décalage horaire (variable au changement d'heure, que read_csv laisse en
+            # chaînes) : relues en UTC puis ramenées au fuseau d'origine
+            history.index = pd.to_datetime(history.index, utc=True).rename(history.index.name)
+            if timezone is not None:
+                history.index = history.index.tz_convert(timezone)
+        if period == "1d":
+            return history.iloc[-1:]
+        return history
+
+    def get_expirations(self, ticker):
+        files = os.listdir(self._ticker_path(ticker, "options"))
+        return tuple(sorted({name.split('_')[0] for name in files if name.endswith("_calls.csv")}))
+
+    def get_option_chain(self, ticker, expiration):
+        import pandas as pd
+        calls = pd.read_csv(self._ticker_path(ticker, "options", f"{expiration}_calls.csv"))
+        puts = pd.read_csv(self._ticker_path(ticker, "options", f"{expiration}_puts.csv"))
+        return OptionChain(calls, puts)
+
+
+def save_snapshot(provider, tickers, directory, period="1y", max_expirations=None):
+    """
+    Enregistre l'historique et les chaînes d'options de plusieurs tickers au format de LocalFileProvider.
+
+    :param provider: Source des données (par exemple YFinanceProvider).
+    :param tickers: Liste des tickers.
+    :param directory: Répertoire de destination.
+    :param period: Profondeur de l'historique.
+    :param max_expirations: Nombre maximal d'échéances enregistrées (None pour toutes).
+    """
+    for ticker, history in provider.get_price_histories(tickers, period).items():
+        os.makedirs(os.path.join(directory, ticker, "options"), exist_ok=True)
+        history.to_csv(os.path.join(directory, ticker, "history.csv"))
+        timezone = getattr(history.index, 'tz', None)
+        if timezone is not None:
+            with open(os.path.join(directory, ticker, "timezone.txt"), 'w') as file:
+                file.write(str(timezone))
+        expirations = provider.get_expirations(ticker)
+        for expiration in expirations[:max_expirations]:
+            chain = provider.get_option_chain(ticker, expiration)
+            chain.calls.to_csv(os.path.join(directory, ticker, "options", f"{expiration}_calls.csv"), index=False)
+            chain.puts.to_csv(os.path.join(directory, ticker, "options", f"{expiration}_puts.csv"), index=False)
+
+
+def _encode(value):
+    import pandas as pd
+    if isinstance(value, pd.DataFrame):
+        encoded = {'__frame__': value.to_json(orient='split', date_format='iso')}
+        if isinstance(value.index, pd.DatetimeIndex):
+            # to_json écrit les dates en UTC et perd le fuseau et le nom de l'index
+            encoded['__index__'] = {'name': value.index.name,
+                                    'tz': None if value.index.tz is None else str(value.index.tz)}
+        return encoded
+    if isinstance(value, OptionChain):
+        return {'__chain__': [_encode(value.calls), _encode(value.puts)]}
+    if isinstance(value, tuple):
+        return {'__tuple__': list(value)}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and '__frame__' in value:
+        import pandas as pd
+        frame = pd.read_json(io.StringIO(value['__frame__']), orient='split')
+        index = value.get('__index__')
+        if index is not None:
+            if index['tz'] is None:
+                frame.index = pd.to_datetime(frame.index)
+            else:
+                frame.index = pd.to_datetime(frame.index, utc=True).tz_convert(index['tz'])
+            frame.index.name = index['name']
+        return frame
+    if isinstance(value, dict) and '__chain__' in value:
+        return OptionChain(*(_decode(frame) for frame in value['__chain__']))
+    if isinstance(value, dict) and '__tuple__' in value:
+        return tuple(value['__tuple__'])
+    return value
+
+
+class CachedProvider(MarketDataProvider):
+    """
+    Cache devant une autre source de données : cache mémoire avec durée de vie (TTL) et, en
+    option, cache disque SQLite indexé par (type de donnée, ticker, clé, date de cotation).
+
+    Le cache disque conserve chaque instantané avec sa date as_of : il sert au démarrage à
+    chaud (instantanés plus récents que disk_ttl), au partage entre processus (instantanés plus
+    récents que ttl) et au rejeu (as_of fixé dans le passé). Les instantanés plus anciens que
+    retention sont supprimés à chaque enregistrement.
+    """
+
+    def __init__(self, provider, ttl=60.0, cache_path=None, disk_ttl=24 * 3600.0, as_of=None,
+                 retention=7 * 24 * 3600.0):
+        """
+        :param provider: Source de données sous-jacente.
+        :param ttl: Durée de vie en secondes des entrées du cache mémoire.
+        :param cache_path: Chemin de la base SQLite (None pour désactiver le cache disque).
+        :param disk_ttl: Âge maximal en secondes d'un instantané disque réutilisé au démarrage (première lecture
+                         d'une donnée) ; ensuite, seuls les instantanés plus récents que ttl sont relus.
+        :param as_of: Horodatage (secondes epoch) de rejeu : seuls les instantanés antérieurs sont lus
+                      et la source sous-jacente n'est jamais appelée.
+        :param retention: Âge en secondes au-delà duquel les instantanés disque d'une donnée sont supprimés
+                          lorsqu'elle est rafraîchie (None pour tout conserver).
+        """
+        self.provider = provider
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.disk_ttl = disk_ttl
+        self.as_of = as_of
+        self.retention = retention
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        if cache_path is not None:
+            self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots (kind TEXT, ticker TEXT, key TEXT, as_of REAL, payload TEXT, "
+                "PRIMARY KEY (kind, ticker, key, as_of))")
+            self._connection.commit()
+
+    def _lookup(self, kind, ticker, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((kind, ticker, key))
+            if entry is not None and (self.as_of is not None or now - entry[0] <= self.ttl):
+                self.hits += 1
+                return True, entry[1]
+            if self._connection is not None:
+                if self.as_of is None:
+                    # disk_ttl au démarrage seulement : une entrée mémoire expirée n'est remplacée que par
+                    # un instantané plus récent que ttl (écrit par un autre processus), sinon elle est rafraîchie
+                    max_age = self.disk_ttl if entry is None else self.ttl
+                    row = self._connection.execute(
+                        "SELECT as_of, payload FROM snapshots WHERE kind = ? AND ticker = ? AND key = ? "
+                        "AND as_of >= ? ORDER BY as_of DESC LIMIT 1", (kind, ticker, key, now - max_age)).fetchone()
+                else:
+                    row = self._connection.execute(
+                        "SELECT as_of, payload FROM snapshots WHERE kind = ? AND ticker = ? AND key = ? "
+                        "AND as_of <= ? ORDER BY as_of DESC LIMIT 1", (kind, ticker, key, self.as_of)).fetchone()
+                if row is not None:
+                    value = _decode(json.loads(row[1]))
+                    # Horodaté à sa date de cotation : l'instantané expire de la mémoire selon son âge réel
+                    self._memory[(kind, ticker, key)] = (row[0], value)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def _store(self, kind, key, values):
+        """
+        Enregistre des valeurs {ticker: valeur} dans les deux caches, en une seule transaction disque.
+        """
+        now = time.time()
+        with self._lock:
+            for ticker, value in values.items():
+                self._memory[(kind, ticker, key)] = (now, value)
+            if self._connection is not None:
+                self._connection.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                                             [(kind, ticker, key, now, json.dumps(_encode(value)))
+                                              for ticker, value in values.items()])
+                if self.retention is not None:
+                    self._connection.executemany(
+                        "DELETE FROM snapshots WHERE kind = ? AND ticker = ? AND key = ? AND as_of < ?",
+                        [(kind, ticker, key, now - self.retention) for ticker in values])
+                self._connection.commit()
+
+    def _cached(self, kind, ticker, key, fetch):
+        found, value = self._lookup(kind, ticker, key)
+        if found:
+            return value
+        if self.as_of is not None:
+            raise KeyError(f"No {kind} snapshot for {ticker} ({key}) at or before as_of={self.as_of}")
+        value = fetch()
+        self._store(kind, key, {ticker: value})
+        return value
+
+    def get_price_history(self, ticker, period="1y"):
+        return self._cached('history', ticker, period, lambda: self.provider.get_price_history(ticker, period))
+
+    def get_expirations(self, ticker):
+        return self._cached('expirations', ticker, '', lambda: tuple(self.provider.get_expirations(ticker)))
+
+    def get_option_chain(self, ticker, expiration):
+        return self._cached('chain', ticker, expiration, lambda: self.provider.get_option_chain(ticker, expiration))
+
+    def get_spot_price(self, ticker):
+        return self._cached('spot', ticker, '', lambda: self.provider.get_spot_price(ticker))
+
+    def get_price_histories(self, tickers, period="1y"):
+        """
+        Sert les historiques en cache et récupère tous les autres en une seule requête groupée.
+        """
+        histories, missing = {}, []
+        for ticker in tickers:
+            found, value = self._lookup('history', ticker, period)
+            if found:
+                histories[ticker] = value
+            else:
+                missing.append(ticker)
+        if missing:
+            if self.as_of is not None:
+                raise KeyError(f"No history snapshot for {missing} at or before as_of={self.as_of}")
+            fetched = self.provider.get_price_histories(missing, period)
+            self._store('history', period, fetched)
+            histories.update(fetched)
+        return {ticker: histories[ticker] for ticker in tickers}
+
+    def get_spot_prices(self, tickers):
+        spots, missing = {}, []
+        for ticker in tickers:
+            found, value = self._lookup('spot', ticker, '')
+            if found:
+                spots[ticker] = value
+            else:
+                missing.append(ticker)
+        if missing:
+            if self.as_of is not None:
+                raise KeyError(f"No spot snapshot for {missing} at or before as_of={self.as_of}")
+            fetched = self.provider.get_spot_prices(missing)
+            self._store('spot', '', fetched)
+            spots.update(fetched)
+        return {ticker: spots[ticker] for ticker in tickers}
+
+
+_default_provider = None
+
+
+def get_default_provider():
+    """
+    Source utilisée lorsque Option, StockData ou MarketData ne reçoivent pas de provider :
+    yfinance derrière un cache mémoire partagé, pour ne pas répéter les mêmes requêtes.
+    """
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = CachedProvider(YFinanceProvider())
+    return _default_provider
+
+
+def set_default_provider(provider):
+    """
+    Remplace la source par défaut (par exemple par un LocalFileProvider pour un rejeu hors ligne).
+    """
+    global _default_provider
+    _default_provider = provider
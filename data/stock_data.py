@@ -1,13 +1,60 @@
-import yfinance as yf
 import numpy as np
+from data.market_data_provider import get_default_provider
 
 class StockData:
-    def __init__(self, ticker):
+    def __init__(self, ticker, provider=None, volatility_estimator=None):
+        """
+        Initialise les données de l'actif sous-jacent.
+
+        :param ticker: Symbole de l'actif.
+        :param provider: Source de données de marché (par défaut yfinance avec cache mémoire).
+        :param volatility_estimator: Estimateur incrémental (voir data.volatility_estimators) à la place de
+                                     l'écart-type historique. S'il a déjà une estimation du ticker (état relu
+                                     après un redémarrage), seul le dernier prix est téléchargé ; sinon (ticker
+                                     inconnu ou pas assez de rendements), il est initialisé sur l'historique.
+        """
         self.ticker = ticker
-        self.stock = yf.Ticker(ticker)
-        self.current_price = self.stock.history(period="1d")['Close'].iloc[-1]
+        self.provider = get_default_provider() if provider is None else provider
+        self.volatility_estimator = volatility_estimator
+        if volatility_estimator is not None and volatility_estimator.has_estimate(ticker):
+            self.history = None
+            self.current_price = self.provider.get_spot_price(ticker)
+        else:
+            # Un seul historique d'un an suffit : sa dernière clôture est le prix courant
+            self.history = self.provider.get_price_history(ticker, period="1y")
+            self.current_price = self.history['Close'].iloc[-1]
+            if volatility_estimator is not None:
+                volatility_estimator.warm_up({ticker: self.history})
         self.volatility = self.calculate_volatility()
 
+    @classmethod
+    def from_values(cls, ticker, current_price, volatility, provider=None):
+        """
+        Construit les données de l'actif à partir d'un prix et d'une volatilité connus,
+        sans télécharger d'historique.
+        """
+        stock_data = cls.__new__(cls)
+        stock_data.ticker = ticker
+        stock_data.provider = provider
+        stock_data.history = None
+        stock_data.volatility_estimator = None
+        stock_data.current_price = current_price
+        stock_data.volatility = volatility
+        return stock_data
+
     def calculate_volatility(self):
-        historical_data = self.stock.history(period="1y")
-        return np.sqrt(252) * historical_data['Close'].pct_change().std()
\ No newline at end of file
+        if self.volatility_estimator is not None:
+            return self.volatility_estimator.volatility(self.ticker)
+        return np.sqrt(252) * self.history['Close'].pct_change().std()
+
+    def update_price(self, price):
+        """
+        Met à jour le prix courant et, avec un estimateur incrémental, la volatilité (en O(1)).
+
+        L'estimateur compte un rendement par appel : avec un estimateur quotidien, n'appeler
+        update_price qu'une fois par période (par exemple à la clôture).
+        """
+        self.current_price = price
+        if self.volatility_estimator is not None:
+            self.volatility_estimator.update_ticker(self.ticker, price)
+            self.volatility = self.calculate_volatility()
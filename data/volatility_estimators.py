@@ -0,0 +1,434 @@
+"""
+Estimateurs de volatilité incrémentaux : fenêtre glissante, EWMA et GARCH(1,1).
+
+Chaque estimateur suit plusieurs tickers à la fois : son état est un ensemble d'arrays (une
+ligne par ticker) mis à jour en O(1) par nouveau prix, de façon vectorisée sur tous les
+tickers d'un même appel à update. L'état s'enregistre et se relit (save / load_estimator)
+pour reprendre après un redémarrage sans retélécharger d'historique.
+
+    estimator = EwmaVolatility.from_histories(provider.get_price_histories(tickers))
+    estimator.update([101.2, 54.3], tickers)
+    stock_data = StockData(ticker, provider, volatility_estimator=estimator)
+"""
+import numpy as np
+
+# Nombre de périodes (jours de bourse) par an, pour annualiser la volatilité
+PERIODS_PER_YEAR = 252
+
+
+def _close_prices(history):
+    """
+    Prix de clôture d'un historique : DataFrame avec une colonne 'Close', Series ou array.
+    """
+    if hasattr(history, 'columns'):
+        history = history['Close']
+    return np.asarray(history, dtype=np.float64)
+
+
+class VolatilityEstimator:
+    """
+    Base des estimateurs : gestion des tickers, des derniers prix et de la persistance.
+
+    Les sous-classes définissent kind, _state_names (arrays d'état, une ligne par ticker),
+    _params (paramètres scalaires), _grow, _update_returns et _variances.
+    """
+    kind = None
+    _state_names = ()
+
+    def __init__(self, tickers=(), periods_per_year=PERIODS_PER_YEAR):
+        """
+        :param tickers: Tickers suivis (d'autres peuvent être ajoutés par add_tickers ou update).
+        :param periods_per_year: Nombre de rendements par an, pour annualiser la volatilité.
+        """
+        self.periods_per_year = periods_per_year
+        self.tickers = []
+        self._index = {}
+        self.last_prices = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.add_tickers(tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._index
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def has_estimate(self, ticker):
+        """
+        :return: True si le ticker est suivi et a déjà une volatilité finie (assez de rendements).
+        """
+        return ticker in self._index and bool(np.isfinite(self.volatility(ticker)))
+
+    def _params(self):
+        return {}
+
+    def _grow(self, count):
+        """
+        Ajoute count lignes aux arrays d'état.
+        """
+        self.last_prices = np.concatenate([self.last_prices, np.full(count, np.nan)])
+        self.counts = np.concatenate([self.counts, np.zeros(count, dtype=np.int64)])
+
+    def _update_returns(self, rows, returns):
+        """
+        Intègre un rendement logarithmique par ligne de rows (lignes distinctes).
+        """
+        raise NotImplementedError
+
+    def _variances(self):
+        """
+        :return: Array des variances par période (NaN pour les tickers sans assez de rendements).
+        """
+        raise NotImplementedError
+
+    def add_tickers(self, tickers):
+        """
+        Ajoute des tickers (ceux déjà suivis sont ignorés).
+        """
+        new = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._index]
+        for ticker in new:
+            self._index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        if new:
+            self._grow(len(new))
+
+    def rows(self, tickers):
+        """
+        :return: Array des lignes d'état des tickers (ajoutés s'ils ne sont pas encore suivis).
+        """
+        self.add_tickers(tickers)
+        return np.array([self._index[ticker] for ticker in tickers], dtype=np.int64)
+
+    def update(self, prices, tickers=None):
+        """
+        Intègre un nouveau prix par ticker, en O(1) par ticker.
+
+        Le premier prix d'un ticker ne fait que l'initialiser ; les prix NaN ou non positifs
+        sont ignorés (pas de cotation sur cette période).
+
+        :param prices: Array des nouveaux prix, un par ticker.
+        :param tickers: Tickers correspondants, distincts (par défaut tous les tickers suivis, dans l'ordre).
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        rows = np.arange(len(self.tickers)) if tickers is None else self.rows(tickers)
+        if prices.shape != rows.shape:
+            raise ValueError(f"Expected one price per ticker ({len(rows)}), got shape {prices.shape}")
+        self._update_rows(rows, prices)
+
+    def _update_rows(self, rows, prices):
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(prices) & (prices > 0)
+        rows, prices = rows[valid], prices[valid]
+
+        previous = self.last_prices[rows]
+        known = np.isfinite(previous)
+        if known.any():
+            self._update_returns(rows[known], np.log(prices[known] / previous[known]))
+            self.counts[rows[known]] += 1
+        self.last_prices[rows] = prices
+
+    def update_ticker(self, ticker, price):
+        """
+        Intègre un nouveau prix pour un seul ticker.
+        """
+        self.update([price], [ticker])
+
+    def warm_up(self, histories):
+        """
+        Initialise les tickers à partir de leurs historiques de prix.
+
+        Les historiques sont alignés sur leur dernière date puis intégrés période par période,
+        chaque mise à jour portant sur tous les tickers à la fois. Le dernier prix d'un ticker
+        déjà suivi est oublié : il n'est pas relié au début de l'historique par un faux rendement.
+
+        :param histories: Dictionnaire {ticker: DataFrame avec une colonne 'Close', Series ou array de prix}.
+        """
+        tickers = list(histories)
+        if not tickers:
+            return
+        closes = [_close_prices(histories[ticker]) for ticker in tickers]
+        length = max(len(close) for close in closes)
+        matrix = np.full((length, len(tickers)), np.nan)
+        for column, close in enumerate(closes):
+            if len(close):
+                matrix[length - len(close):, column] = close
+        rows = self.rows(tickers)
+        self.last_prices[rows] = np.nan
+        for prices in matrix:
+            self._update_rows(rows, prices)
+
+    @classmethod
+    def from_histories(cls, histories, **kwargs):
+        """
+        Construit un estimateur initialisé sur des historiques de prix (voir warm_up).
+        """
+        estimator = cls(list(histories), **kwargs)
+        estimator.warm_up(histories)
+        return estimator
+
+    def variance(self, ticker=None):
+        """
+        :return: Variance par période d'un ticker, ou array des variances de tous les tickers.
+        """
+        variances = self._variances()
+        return variances if ticker is None else float(variances[self._index[ticker]])
+
+    def volatility(self, ticker=None):
+        """
+        :return: Volatilité annualisée d'un ticker, ou array des volatilités de tous les tickers
+                 (NaN tant qu'un ticker n'a pas assez de rendements).
+        """
+        return np.sqrt(self.periods_per_year * self.variance(ticker))
+
+    def volatilities(self):
+        """
+        :return: Dictionnaire {ticker: volatilité annualisée}.
+        """
+        return dict(zip(self.tickers, self.volatility().tolist()))
+
+    def save(self, path):
+        """
+        Enregistre les paramètres et l'état de l'estimateur (format .npz, voir load_estimator).
+        """
+        arrays = {name: getattr(self, name) for name in self._state_names}
+        np.savez(path, kind=self.kind, tickers=np.array(self.tickers, dtype=str),
+                 periods_per_year=self.periods_per_year, last_prices=self.last_prices, counts=self.counts,
+                 **{f'param_{name}': value for name, value in self._params().items()},
+                 **{f'state_{name}': value for name, value in arrays.items()})
+
+
+class RollingVolatility(VolatilityEstimator):
+    """
+    Écart-type des rendements sur une fenêtre glissante de window périodes.
+
+    Les rendements de la fenêtre sont gardés dans un buffer circulaire ; la somme et la
+    somme des carrés sont mises à jour à chaque rendement entrant et sortant.
+    """
+    kind = 'rolling'
+    _state_names = ('buffer', 'positions', 'sums', 'sums_of_squares')
+
+    def __init__(self, tickers=(), window=21, periods_per_year=PERIODS_PER_YEAR):
+        """
+        :param window: Nombre de rendements de la fenêtre (au moins 2).
+        """
+        if window < 2:
+            raise ValueError(f"Rolling window must hold at least 2 returns, got {window}")
+        self.window = int(window)
+        self.buffer = np.zeros((0, self.window))
+        self.positions = np.empty(0, dtype=np.int64)
+        self.sums = np.empty(0)
+        self.sums_of_squares = np.empty(0)
+        super().__init__(tickers, periods_per_year)
+
+    def _params(self):
+        return {'window': self.window}
+
+    def _grow(self, count):
+        super()._grow(count)
+        self.buffer = np.concatenate([self.buffer, np.zeros((count, self.window))])
+        self.positions = np.concatenate([self.positions, np.zeros(count, dtype=np.int64)])
+        self.sums = np.concatenate([self.sums, np.zeros(count)])
+        self.sums_of_squares = np.concatenate([self.sums_of_squares, np.zeros(count)])
+
+    def _update_returns(self, rows, returns):
+        # Le rendement sortant vaut 0 tant que la fenêtre n'est pas pleine
+        positions = self.positions[rows]
+        leaving = self.buffer[rows, positions]
+        self.buffer[rows, positions] = returns
+        self.sums[rows] += returns - leaving
+        self.sums_of_squares[rows] += returns**2 - leaving**2
+        self.positions[rows] = (positions + 1) % self.window
+
+    def _variances(self):
+        n = np.minimum(self.counts, self.window).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variances = (self.sums_of_squares - self.sums**2 / n) / (n - 1)
+        return np.where(n >= 2, np.maximum(variances, 0.0), np.nan)
+
+
+class EwmaVolatility(VolatilityEstimator):
+    """
+    Variance à moyenne mobile exponentielle (RiskMetrics) : var = decay * var + (1 - decay) * r^2.
+    """
+    kind = 'ewma'
+    _state_names = ('variances',)
+
+    def __init__(self, tickers=(), decay=0.94, periods_per_year=PERIODS_PER_YEAR):
+        """
+        :param decay: Facteur de décroissance lambda, entre 0 et 1 (0.94 pour des rendements quotidiens).
+        """
+        if not 0 < decay < 1:
+            raise ValueError(f"EWMA decay must be between 0 and 1, got {decay}")
+        self.decay = float(decay)
+        self.variances = np.empty(0)
+        super().__init__(tickers, periods_per_year)
+
+    def _params(self):
+        return {'decay': self.decay}
+
+    def _grow(self, count):
+        super()._grow(count)
+        self.variances = np.concatenate([self.variances, np.full(count, np.nan)])
+
+    def _update_returns(self, rows, returns):
+        # Le premier rendement initialise la variance
+        previous = self.variances[rows]
+        self.variances[rows] = np.where(np.isnan(previous), returns**2,
+                                        self.decay * previous + (1 - self.decay) * returns**2)
+
+    def _variances(self):
+        return self.variances.copy()
+
+
+def fit_garch(returns):
+    """
+    Estime les paramètres d'un GARCH(1,1) par maximum de vraisemblance gaussienne, avec ciblage
+    de la variance : omega = variance empirique * (1 - alpha - beta).
+
+    :param returns: Array des rendements logarithmiques (au moins quelques dizaines).
+    :return: Tuple (omega, alpha, beta).
+    """
+    from scipy.optimize import minimize
+
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 10:
+        raise ValueError(f"Need at least 10 returns to fit a GARCH(1,1), got {len(returns)}")
+    sample_variance = returns.var()
+    squared = returns**2
+
+    def negative_log_likelihood(x):
+        alpha, beta = x
+        if alpha < 0 or beta < 0 or alpha + beta >= 0.999:
+            return np.inf
+        omega = sample_variance * (1 - alpha - beta)
+        variance = sample_variance
+        total = 0.0
+        for r2 in squared:
+            total += np.log(variance) + r2 / variance
+            variance = omega + alpha * r2 + beta * variance
+        return 0.5 * total
+
+    result = minimize(negative_log_likelihood, x0=[0.08, 0.9], method='Nelder-Mead',
+                      options={'xatol': 1e-6, 'fatol': 1e-8})
+    alpha, beta = result.x
+    return sample_variance * (1 - alpha - beta), alpha, beta
+
+
+class GarchVolatility(VolatilityEstimator):
+    """
+    GARCH(1,1) : var_{t+1} = omega + alpha * r_t^2 + beta * var_t, avec des paramètres par ticker.
+
+    La volatilité renvoyée est la prévision pour la période suivante, ou la moyenne des
+    variances prévues sur un horizon donné (structure par terme, voir variance).
+    """
+    kind = 'garch'
+    _state_names = ('variances', 'omegas', 'alphas', 'betas')
+
+    def __init__(self, tickers=(), omega=2e-6, alpha=0.08, beta=0.9, periods_per_year=PERIODS_PER_YEAR):
+        """
+        :param omega: Paramètre omega des tickers ajoutés sans paramètres propres.
+        :param alpha: Poids du dernier rendement au carré.
+        :param beta: Poids de la variance précédente (alpha + beta < 1).
+        """
+        if alpha < 0 or beta < 0 or alpha + beta >= 1 or omega <= 0:
+            raise ValueError(f"GARCH(1,1) needs omega > 0, alpha, beta >= 0 and alpha + beta < 1, "
+                             f"got omega={omega}, alpha={alpha}, beta={beta}")
+        self.omega = float(omega)
+        self.alpha = float(alpha)
+        self.beta = float(beta)
+        self.variances = np.empty(0)
+        self.omegas = np.empty(0)
+        self.alphas = np.empty(0)
+        self.betas = np.empty(0)
+        super().__init__(tickers, periods_per_year)
+
+    def _params(self):
+        return {'omega': self.omega, 'alpha': self.alpha, 'beta': self.beta}
+
+    def _grow(self, count):
+        super()._grow(count)
+        self.variances = np.concatenate([self.variances, np.full(count, np.nan)])
+        self.omegas = np.concatenate([self.omegas, np.full(count, self.omega)])
+        self.alphas = np.concatenate([self.alphas, np.full(count, self.alpha)])
+        self.betas = np.concatenate([self.betas, np.full(count, self.beta)])
+
+    def set_params(self, ticker, omega, alpha, beta):
+        """
+        Fixe les paramètres GARCH(1,1) propres à un ticker.
+        """
+        row = self.rows([ticker])[0]
+        self.omegas[row], self.alphas[row], self.betas[row] = omega, alpha, beta
+
+    def long_run_variances(self):
+        """
+        :return: Array des variances de long terme omega / (1 - alpha - beta).
+        """
+        return self.omegas / (1 - self.alphas - self.betas)
+
+    def _update_returns(self, rows, returns):
+        # Avant le premier rendement, la variance conditionnelle est la variance de long terme
+        previous = self.variances[rows]
+        previous = np.where(np.isnan(previous), self.long_run_variances()[rows], previous)
+        self.variances[rows] = self.omegas[rows] + self.alphas[rows] * returns**2 + self.betas[rows] * previous
+
+    def _variances(self):
+        return self.variances.copy()
+
+    def variance(self, ticker=None, horizon=None):
+        """
+        :param horizon: Nombre de périodes de l'horizon (par exemple 252 * maturité) : renvoie la moyenne
+                        des variances prévues sur l'horizon au lieu de la prévision à une période.
+        :return: Variance par période d'un ticker, ou array des variances de tous les tickers.
+        """
+        variances = self._variances()
+        if horizon is not None and horizon > 1:
+            persistence = self.alphas + self.betas
+            long_run = self.long_run_variances()
+            weight = (1 - persistence**horizon) / (horizon * (1 - persistence))
+            variances = long_run + (variances - long_run) * weight
+        return variances if ticker is None else float(variances[self._index[ticker]])
+
+    def volatility(self, ticker=None, horizon=None):
+        """
+        :param horizon: Nombre de périodes de l'horizon (None pour la prévision à une période).
+        :return: Volatilité annualisée d'un ticker, ou array des volatilités de tous les tickers.
+        """
+        return np.sqrt(self.periods_per_year * self.variance(ticker, horizon))
+
+    @classmethod
+    def from_histories(cls, histories, fit=True, **kwargs):
+        """
+        Construit un estimateur initialisé sur des historiques de prix, en estimant si fit est vrai
+        les paramètres de chaque ticker par maximum de vraisemblance (voir fit_garch).
+        """
+        estimator = cls(list(histories), **kwargs)
+        if fit:
+            for ticker, history in histories.items():
+                returns = np.diff(np.log(_close_prices(history)))
+                estimator.set_params(ticker, *fit_garch(returns))
+        estimator.warm_up(histories)
+        return estimator
+
+
+ESTIMATORS = {estimator.kind: estimator for estimator in (RollingVolatility, EwmaVolatility, GarchVolatility)}
+
+
+def load_estimator(path):
+    """
+    Relit un estimateur enregistré par save.
+
+    :return: Estimateur (RollingVolatility, EwmaVolatility ou GarchVolatility) dans l'état enregistré.
+    """
+    with np.load(path) as data:
+        kind = str(data['kind'])
+        if kind not in ESTIMATORS:
+            raise ValueError(f"Unknown volatility estimator kind {kind!r}, expected one of {tuple(ESTIMATORS)}")
+        params = {name[len('param_'):]: data[name].item() for name in data.files if name.startswith('param_')}
+        estimator = ESTIMATORS[kind](data['tickers'].tolist(), periods_per_year=int(data['periods_per_year']),
+                                     **params)
+        estimator.last_prices = data['last_prices'].copy()
+        estimator.counts = data['counts'].copy()
+        for name in estimator._state_names:
+            setattr(estimator, name, data[f'state_{name}'].copy())
+    return estimator
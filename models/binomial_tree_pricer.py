@@ -1,19 +1,108 @@
 import numpy as np
+from numba import njit
+from models.black_scholes_pricer import black_scholes_prices
+from models.instrumentation import get_instrumentation
+
+TREE_METHODS = ('crr', 'bbs', 'bbsr')
+
+
+@njit
+def roll_back_tree(values, node_prices, d, discount, p, strikes, signs, american):
+    """
+    Remonte l'arbre en place, pour plusieurs strikes à la fois, jusqu'à la racine.
+
+    :param values: Array (nombre de strikes, n + 1) des valeurs de l'option au niveau n (modifié en place).
+    :param node_prices: Array (n + 1,) des prix du sous-jacent au niveau n (modifié en place).
+    :param d: Facteur de baisse.
+    :param discount: Facteur d'actualisation sur un pas, exp(-r * dt).
+    :param p: Probabilité risque-neutre de hausse.
+    :param strikes: Array des prix d'exercice.
+    :param signs: Array valant +1 pour un call, -1 pour un put.
+    :param american: Vérifie l'exercice anticipé à chaque nœud si True.
+    :return: Array des prix à la racine, un par strike.
+    """
+    n = node_prices.shape[0] - 1
+    q = 1 - p
+    for step in range(n - 1, -1, -1):
+        for i in range(step + 1):
+            # Le nœud (step, i) est le nœud (step + 1, i) après une baisse en moins
+            node_prices[i] *= d
+            for k in range(values.shape[0]):
+                continuation = discount * (p * values[k, i] + q * values[k, i + 1])
+                if american:
+                    exercise = signs[k] * (node_prices[i] - strikes[k])
+                    if exercise > continuation:
+                        continuation = exercise
+                values[k, i] = continuation
+    return values[:, 0].copy()
+
+
+def binomial_tree_prices(S0, strikes, r, sigma, T, num_steps, is_call=True, american=False, method='crr'):
+    """
+    Calcule les prix d'options sur un arbre binomial (Cox-Ross-Rubinstein), pour plusieurs strikes
+    remontés ensemble dans le même arbre.
+
+    :param S0: Prix du sous-jacent.
+    :param strikes: Scalaire ou array des prix d'exercice.
+    :param r: Taux sans risque.
+    :param sigma: Volatilité.
+    :param T: Maturité en années.
+    :param num_steps: Nombre de pas de l'arbre.
+    :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+    :param american: Exercice américain si True, européen sinon.
+    :param method: 'crr' (arbre classique), 'bbs' (Black-Scholes sur le dernier pas, Broadie-Detemple)
+                   ou 'bbsr' (bbs avec extrapolation de Richardson sur N et N / 2 pas).
+    :return: Array des prix, un par strike.
+    """
+    if method not in TREE_METHODS:
+        raise ValueError(f"Unknown tree method {method!r}, expected one of {TREE_METHODS}")
+    if method == 'bbsr':
+        fine = binomial_tree_prices(S0, strikes, r, sigma, T, num_steps, is_call, american, 'bbs')
+        coarse = binomial_tree_prices(S0, strikes, r, sigma, T, max(1, num_steps // 2), is_call, american, 'bbs')
+        return 2 * fine - coarse
+
+    strikes, is_call = np.broadcast_arrays(np.atleast_1d(np.asarray(strikes, dtype=np.float64)), is_call)
+    strikes = strikes.astype(np.float64)
+    signs = np.where(is_call, 1.0, -1.0)
+
+    dt = T / num_steps
+    u = np.exp(sigma * np.sqrt(dt))  # Facteur de hausse
+    d = 1 / u  # Facteur de baisse
+    p = (np.exp(r * dt) - d) / (u - d)  # Probabilité risque-neutre
+    discount = np.exp(-r * dt)
+
+    # Niveau de départ de la remontée : l'échéance, ou l'avant-dernier pas pour bbs
+    level = num_steps - 1 if method == 'bbs' else num_steps
+    node_prices = S0 * u ** (level - 2.0 * np.arange(level + 1))
+    exercise = np.maximum(signs[:, None] * (node_prices[None, :] - strikes[:, None]), 0)
+    if method == 'bbs':
+        values = black_scholes_prices(node_prices[None, :], strikes[:, None], dt, r, sigma, is_call[:, None])
+        if american:
+            values = np.maximum(values, exercise)
+    else:
+        values = exercise
+
+    with get_instrumentation().stage('tree_roll_back'):
+        return roll_back_tree(np.ascontiguousarray(values), node_prices, d, discount, p, strikes, signs, american)
 
 
 class BinomialTreePricer:
 
-    def __init__(self, option, stock_data, num_steps=100):
+    def __init__(self, option, stock_data, num_steps=100, american=False, method='crr'):
         """
         Initialise le pricer d'options avec un arbre binomial.
 
         :param option: L'option à pricer (classe Option).
         :param stock_data: Les données de l'actif sous-jacent (classe StockData).
         :param num_steps: Nombre de pas de temps dans l'arbre binomial (par défaut 100).
+        :param american: Exercice américain si True (par défaut européen).
+        :param method: 'crr', 'bbs' ou 'bbsr' (voir binomial_tree_prices).
         """
         self.option = option
         self.stock_data = stock_data
         self.num_steps = num_steps
+        self.american = american
+        self.method = method
 
     def calculate_tree_parameters(self):
         """
@@ -29,44 +118,27 @@ class BinomialTreePricer:
         p = (np.exp(r * dt) - d) / (u - d)  # Probabilité risque-neutre
 
         return u, d, p
-    
+
+    def price_chain(self, strikes, is_call=True):
+        """
+        Calcule les prix de plusieurs strikes en une seule remontée de l'arbre.
+
+        :param strikes: Array des prix d'exercice.
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des prix.
+        """
+        return binomial_tree_prices(self.stock_data.current_price, strikes, self.option.risk_free_rate,
+                                    self.stock_data.volatility, self.option.time_to_maturity, self.num_steps,
+                                    is_call, self.american, self.method)
+
     def price_call(self):
         """
         Calcule le prix d'une option d'achat (call) en utilisant un arbre binomial.
         """
-        u, d, p = self.calculate_tree_parameters()
-        S0 = self.stock_data.current_price
-        K = self.option.strike_price
-        T = self.option.time_to_maturity
-        r = self.option.risk_free_rate
-        dt = T / self.num_steps
-
-        # Calcul des prix à l'échéance
-        prices_at_maturity = S0 * (u ** np.arange(self.num_steps, -1, -1)) * (d ** np.arange(0, self.num_steps + 1))
-        payoffs = np.maximum(prices_at_maturity - K, 0)
-
-        # Calcul du prix de l'option en remontant l'arbre
-        for step in range(self.num_steps, 0, -1):
-            payoffs = np.exp(-r * dt) * (p * payoffs[:-1] + (1 - p) * payoffs[1:])
-        return payoffs[0]
+        return self.price_chain(self.option.strike_price, is_call=True)[0]
 
     def price_put(self):
         """
         Calcule le prix d'une option de vente (put) en utilisant un arbre binomial.
         """
-        u, d, p = self.calculate_tree_parameters()
-        S0 = self.stock_data.current_price
-        K = self.option.strike_price
-        T = self.option.time_to_maturity
-        r = self.option.risk_free_rate
-        dt = T / self.num_steps
-
-        # Calcul des prix à l'échéance
-        prices_at_maturity = S0 * (u ** np.arange(self.num_steps, -1, -1)) * (d ** np.arange(0, self.num_steps + 1))
-        payoffs = np.maximum(K - prices_at_maturity, 0)
-
-        # Calcul du prix de l'option en remontant l'arbre
-        for step in range(self.num_steps, 0, -1):
-            payoffs = np.exp(-r * dt) * (p * payoffs[:-1] + (1 - p) * payoffs[1:])
-
-        return payoffs[0]
\ No newline at end of file
+        return self.price_chain(self.option.strike_price, is_call=False)[0]
@@ -1,7 +1,38 @@
 import numpy as np
-from scipy.stats import norm
-import pandas as pd
-from scipy.stats import norm
+from scipy.special import ndtr
+
+
+def black_scholes_prices(spot, strike, time_to_maturity, risk_free_rate, volatility, is_call=True):
+    """
+    Calcule en une seule passe les prix Black-Scholes d'un ensemble de contrats.
+
+    Tous les paramètres sont des scalaires ou des arrays NumPy, diffusés (broadcast)
+    les uns contre les autres. d1 et d2 sont calculés une seule fois et partagés entre
+    calls et puts grâce au signe w = +1 (call) / -1 (put) :
+    prix = w * (S * N(w * d1) - K * exp(-r * T) * N(w * d2)).
+
+    :param spot: Prix du sous-jacent.
+    :param strike: Prix d'exercice.
+    :param time_to_maturity: Maturité en années.
+    :param risk_free_rate: Taux sans risque.
+    :param volatility: Volatilité annualisée.
+    :param is_call: Booléen (ou array de booléens) : True pour un call, False pour un put.
+    :return: Array des prix, de la forme diffusée des entrées.
+    """
+    S = np.asarray(spot, dtype=np.float64)
+    K = np.asarray(strike, dtype=np.float64)
+    T = np.asarray(time_to_maturity, dtype=np.float64)
+    r = np.asarray(risk_free_rate, dtype=np.float64)
+    sigma = np.asarray(volatility, dtype=np.float64)
+    w = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)
+
+    sigma_sqrt_T = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    discounted_strike = K * np.exp(-r * T)
+
+    return w * (S * ndtr(w * d1) - discounted_strike * ndtr(w * d2))
+
 
 class BlackScholesPricer:
     def __init__(self, option, stock_data):
@@ -26,7 +57,7 @@ class BlackScholesPricer:
         r = self.option.risk_free_rate
         T = self.option.time_to_maturity
 
-        call_price = S0 * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        call_price = S0 * ndtr(d1) - K * np.exp(-r * T) * ndtr(d2)
         return call_price
 
     def price_put(self):
@@ -36,5 +67,17 @@ class BlackScholesPricer:
         r = self.option.risk_free_rate
         T = self.option.time_to_maturity
 
-        put_price = K * np.exp(-r * T) * norm.cdf(-d2) - S0 * norm.cdf(-d1)
-        return put_price
\ No newline at end of file
+        put_price = K * np.exp(-r * T) * ndtr(-d2) - S0 * ndtr(-d1)
+        return put_price
+
+    def price_chain(self, strikes, maturities, is_call=True):
+        """
+        Calcule les prix d'une chaîne d'options (plusieurs strikes/maturités) sur le même sous-jacent.
+
+        :param strikes: Array des prix d'exercice.
+        :param maturities: Array des maturités (en années).
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des prix.
+        """
+        return black_scholes_prices(self.stock_data.current_price, strikes, maturities,
+                                    self.option.risk_free_rate, self.stock_data.volatility, is_call)
@@ -0,0 +1,282 @@
+import numpy as np
+from numba import njit
+from scipy.special import ndtr
+from models.black_scholes_pricer import black_scholes_prices
+from models.instrumentation import get_instrumentation
+from models.monte_carlo_pricer import (DEFAULT_MEMORY_BUDGET, MonteCarloResult, chunk_size_for_budget,
+                                       estimate_from_statistics, payoff_statistics)
+from models.parallel_monte_carlo import resolve_seed, run_chunks
+
+EXOTIC_TYPES = ('asian_arithmetic', 'asian_geometric', 'barrier', 'lookback')
+
+BARRIER_TYPES = ('up-and-out', 'up-and-in', 'down-and-out', 'down-and-in')
+
+# Statistiques conservées par trajectoire pendant la simulation (colonnes de simulate_path_statistics)
+FINAL_PRICE, ARITHMETIC_MEAN, GEOMETRIC_MEAN, MINIMUM, MAXIMUM, SURVIVAL = range(6)
+NUM_PATH_STATISTICS = 6
+
+# Octets par trajectoire : statistiques courantes et temporaires des payoffs (float64)
+BYTES_PER_EXOTIC_PATH = (NUM_PATH_STATISTICS + 6) * 8
+
+
+@njit
+def simulate_path_statistics(rng, num_paths, S0, r, sigma, T, num_steps, barrier, barrier_up, antithetic):
+    """
+    Simule des trajectoires de Black-Scholes pas à pas en ne conservant que des statistiques
+    courantes : prix final, moyennes arithmétique et géométrique des prix aux dates t_1, ..., t_n,
+    minimum et maximum (S0 compris) et probabilité de survie à la barrière.
+
+    Chaque trajectoire est simulée de bout en bout avec un état scalaire : la mémoire utilisée
+    est O(num_paths), quel que soit le nombre de pas. Entre deux dates, la probabilité que le
+    pont brownien touche la barrière est exp(-2 (b - x_i)(b - x_{i+1}) / (sigma^2 dt)) en
+    log-prix : la survie est le produit des probabilités de non-franchissement, ce qui donne
+    le prix d'une barrière surveillée en continu sans pas de temps quotidiens.
+
+    :param rng: np.random.Generator propre au paquet.
+    :param barrier: Niveau de la barrière (0 pour ne pas en surveiller).
+    :param barrier_up: True pour une barrière haute, False pour une barrière basse.
+    :param antithetic: Simule aussi la trajectoire antithétique (-Z) de chaque trajectoire.
+    :return: Array (1 ou 2 copies, num_paths, NUM_PATH_STATISTICS).
+    """
+    dt = T / num_steps
+    drift = (r - 0.5 * sigma**2) * dt
+    diffusion = sigma * np.sqrt(dt)
+    bridge_scale = -2.0 / (sigma**2 * dt)
+    has_barrier = barrier > 0
+    log_barrier = np.log(barrier) if has_barrier else 0.0
+    log_S0 = np.log(S0)
+
+    num_copies = 2 if antithetic else 1
+    out = np.empty((num_copies, num_paths, NUM_PATH_STATISTICS))
+    log_S = np.empty(num_copies)
+    sum_S = np.empty(num_copies)
+    sum_log_S = np.empty(num_copies)
+    minimum = np.empty(num_copies)
+    maximum = np.empty(num_copies)
+    survival = np.empty(num_copies)
+    for i in range(num_paths):
+        for c in range(num_copies):
+            log_S[c] = log_S0
+            sum_S[c] = 0.0
+            sum_log_S[c] = 0.0
+            minimum[c] = S0
+            maximum[c] = S0
+            survival[c] = 1.0
+            if has_barrier and (log_S0 >= log_barrier if barrier_up else log_S0 <= log_barrier):
+                survival[c] = 0.0
+        for _ in range(num_steps):
+            Z = rng.standard_normal()
+            for c in range(num_copies):
+                previous = log_S[c]
+                log_S[c] = previous + drift + diffusion * (Z if c == 0 else -Z)
+                S = np.exp(log_S[c])
+                sum_S[c] += S
+                sum_log_S[c] += log_S[c]
+                if S < minimum[c]:
+                    minimum[c] = S
+                if S > maximum[c]:
+                    maximum[c] = S
+                if has_barrier and survival[c] > 0:
+                    distance_before = log_barrier - previous
+                    distance_after = log_barrier - log_S[c]
+                    if not barrier_up:
+                        distance_before = -distance_before
+                        distance_after = -distance_after
+                    if distance_after <= 0:
+                        survival[c] = 0.0
+                    else:
+                        survival[c] *= 1 - np.exp(bridge_scale * distance_before * distance_after)
+        for c in range(num_copies):
+            out[c, i, FINAL_PRICE] = np.exp(log_S[c])
+            out[c, i, ARITHMETIC_MEAN] = sum_S[c] / num_steps
+            out[c, i, GEOMETRIC_MEAN] = np.exp(sum_log_S[c] / num_steps)
+            out[c, i, MINIMUM] = minimum[c]
+            out[c, i, MAXIMUM] = maximum[c]
+            out[c, i, SURVIVAL] = survival[c]
+    return out
+
+
+def geometric_asian_prices(S0, K, r, sigma, T, num_steps, is_call=True):
+    """
+    Prix fermé d'une option asiatique à moyenne géométrique discrète (dates t_i = i T / n, i = 1..n).
+
+    Le logarithme de la moyenne géométrique est gaussien, de moyenne
+    ln S0 + (r - sigma^2 / 2) T (n + 1) / (2n) et de variance sigma^2 T (n + 1)(2n + 1) / (6 n^2).
+
+    :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+    :return: Prix (actualisé), de la forme de la diffusion des arguments.
+    """
+    n = num_steps
+    mean = np.log(S0) + (r - 0.5 * sigma**2) * T * (n + 1) / (2 * n)
+    std = sigma * np.sqrt(T * (n + 1) * (2 * n + 1) / (6 * n**2))
+    forward = np.exp(mean + 0.5 * std**2)
+    d1 = (mean - np.log(K) + std**2) / std
+    d2 = d1 - std
+    call = np.exp(-r * T) * (forward * ndtr(d1) - K * ndtr(d2))
+    put = np.exp(-r * T) * (K * ndtr(-d2) - forward * ndtr(-d1))
+    return np.where(is_call, call, put)
+
+
+def exotic_payoffs(statistics, K, exotic, barrier_type):
+    """
+    Payoffs (call, put) et variables de contrôle (call, put) à partir des statistiques de trajectoires.
+
+    La variable de contrôle est le payoff asiatique géométrique pour l'asiatique arithmétique et
+    le payoff européen sinon. Une barrière activante vaut le payoff européen moins la barrière
+    désactivante de même niveau.
+    """
+    final_prices = statistics[..., FINAL_PRICE]
+    european = (np.maximum(final_prices - K, 0), np.maximum(K - final_prices, 0))
+    if exotic == 'asian_arithmetic' or exotic == 'asian_geometric':
+        geometric = (np.maximum(statistics[..., GEOMETRIC_MEAN] - K, 0),
+                     np.maximum(K - statistics[..., GEOMETRIC_MEAN], 0))
+        if exotic == 'asian_geometric':
+            return geometric, european
+        average = statistics[..., ARITHMETIC_MEAN]
+        return (np.maximum(average - K, 0), np.maximum(K - average, 0)), geometric
+    if exotic == 'lookback':
+        return (np.maximum(statistics[..., MAXIMUM] - K, 0), np.maximum(K - statistics[..., MINIMUM], 0)), european
+
+    survival = statistics[..., SURVIVAL]
+    if barrier_type.endswith('-out'):
+        return (european[0] * survival, european[1] * survival), european
+    return (european[0] * (1 - survival), european[1] * (1 - survival)), european
+
+
+def exotic_payoff_stats_kernel(rng, num_samples, S0, sigma, r, T, K, num_steps, exotic, barrier, barrier_type,
+                               antithetic):
+    """
+    Noyau d'un paquet : simule num_samples échantillons de trajectoires et renvoie les statistiques
+    additives des payoffs exotiques call puis put, avec leur variable de contrôle (12 valeurs).
+    """
+    instrumentation = get_instrumentation()
+    barrier_up = barrier_type.startswith('up')
+    # Les tirages sont faits dans la boucle compilée : l'étape path_stepping inclut le générateur
+    with instrumentation.stage('path_stepping'):
+        statistics = simulate_path_statistics(rng, num_samples, S0, r, sigma, T, num_steps,
+                                              barrier if exotic == 'barrier' else 0.0, barrier_up, antithetic)
+    with instrumentation.stage('payoff_reduction'):
+        payoffs, controls = exotic_payoffs(statistics, K, exotic, barrier_type)
+        # En mode antithétique, un échantillon est la moyenne des deux copies
+        stats = np.concatenate([payoff_statistics(payoff.mean(axis=0), control.mean(axis=0))
+                                for payoff, control in zip(payoffs, controls)])
+    instrumentation.count('paths', statistics.shape[0] * num_samples)
+    return stats
+
+
+class ExoticMonteCarloPricer:
+    def __init__(self, option, stock_data, num_simulations, exotic='asian_arithmetic', num_steps=252,
+                 barrier=None, barrier_type='down-and-out', seed=None, num_workers=1, antithetic=False,
+                 control_variate=False, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Initialise le pricer Monte Carlo d'options dépendant de la trajectoire.
+
+        Les trajectoires sont simulées pas à pas et ne gardent que des statistiques courantes
+        (somme, minimum, maximum, survie à la barrière) : la mémoire est O(taille d'un paquet),
+        quel que soit le nombre de pas. Les moyennes des asiatiques et les extrema des lookbacks
+        portent sur les num_steps dates de constatation ; la barrière est surveillée en continu
+        grâce à la correction du pont brownien.
+
+        :param option: L'option à pricer (classe Option).
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param num_simulations: Nombre de simulations.
+        :param exotic: Type d'option, parmi EXOTIC_TYPES ('lookback' est à strike fixe, sur le maximum pour
+                       un call et le minimum pour un put).
+        :param num_steps: Nombre de pas de temps (dates de constatation).
+        :param barrier: Niveau de la barrière (obligatoire si exotic vaut 'barrier').
+        :param barrier_type: Type de barrière, parmi BARRIER_TYPES.
+        :param seed: Graine du générateur aléatoire (None pour un tirage non reproductible).
+        :param num_workers: Nombre de processus utilisés pour simuler les paquets (par défaut 1).
+        :param antithetic: Utilise des variables antithétiques (Z, -Z).
+        :param control_variate: Variable de contrôle : asiatique géométrique (formule fermée) pour l'asiatique
+                                arithmétique, payoff européen (Black-Scholes) sinon.
+        :param memory_budget: Budget mémoire en octets pour un paquet de trajectoires (par défaut 64 Mo).
+        """
+        if exotic not in EXOTIC_TYPES:
+            raise ValueError(f"Unknown exotic type {exotic!r}, expected one of {EXOTIC_TYPES}")
+        if barrier_type not in BARRIER_TYPES:
+            raise ValueError(f"Unknown barrier type {barrier_type!r}, expected one of {BARRIER_TYPES}")
+        if exotic == 'barrier' and (barrier is None or barrier <= 0):
+            raise ValueError(f"Barrier options need a positive barrier level, got {barrier}")
+        if num_steps < 1:
+            raise ValueError(f"num_steps must be at least 1, got {num_steps}")
+        self.option = option
+        self.stock_data = stock_data
+        self.num_simulations = num_simulations
+        self.exotic = exotic
+        self.num_steps = num_steps
+        self.barrier = barrier
+        self.barrier_type = barrier_type
+        self.seed = seed
+        self.num_workers = num_workers
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.memory_budget = memory_budget
+        self._cached_key = None
+        self._cached_results = None
+
+    def _pricing_key(self):
+        return (self.stock_data.current_price, self.stock_data.volatility, self.option.risk_free_rate,
+                self.option.time_to_maturity, self.option.strike_price, self.num_simulations, self.exotic,
+                self.num_steps, self.barrier, self.barrier_type, self.seed, self.antithetic,
+                self.control_variate, self.memory_budget)
+
+    def _control_means(self, S0, K, r, sigma, T):
+        # Espérances (non actualisées) des variables de contrôle du call et du put
+        discount = np.exp(-r * T)
+        if self.exotic == 'asian_arithmetic':
+            return geometric_asian_prices(S0, K, r, sigma, T, self.num_steps, [True, False]) / discount
+        return black_scholes_prices(S0, K, T, r, sigma, [True, False]) / discount
+
+    def estimate_call_put(self):
+        """
+        Estime les prix du call et du put exotiques, avec leur erreur standard, sur les mêmes trajectoires.
+
+        :return: Tuple (MonteCarloResult du call, MonteCarloResult du put).
+        """
+        S0 = self.stock_data.current_price
+        sigma = self.stock_data.volatility
+        r = self.option.risk_free_rate
+        T = self.option.time_to_maturity
+        K = self.option.strike_price
+
+        paths_per_sample = 2 if self.antithetic else 1
+        num_samples = max(1, self.num_simulations // paths_per_sample)
+        chunk_size = min(num_samples, chunk_size_for_budget(self.memory_budget,
+                                                            BYTES_PER_EXOTIC_PATH * paths_per_sample))
+        args = (S0, sigma, r, T, K, self.num_steps, self.exotic, 0.0 if self.barrier is None else self.barrier,
+                self.barrier_type, self.antithetic)
+        stats = run_chunks(exotic_payoff_stats_kernel, args, num_samples, chunk_size,
+                           seed=resolve_seed(self.seed), num_workers=self.num_workers)
+
+        with get_instrumentation().stage('discounting'):
+            discount = np.exp(-r * T)
+            control_means = self._control_means(S0, K, r, sigma, T) if self.control_variate else (None, None)
+            results = []
+            for side, control_mean in enumerate(control_means):
+                price, std_error = estimate_from_statistics(stats[6 * side:6 * side + 6], control_mean)
+                results.append(MonteCarloResult(discount * price, discount * std_error,
+                                                num_samples * paths_per_sample))
+        return tuple(results)
+
+    def price_call_put(self):
+        """
+        Calcule les prix du call et du put exotiques à partir des mêmes trajectoires.
+
+        Le résultat est conservé tant que les paramètres ne changent pas, de sorte que
+        price_call puis price_put ne simulent qu'une seule fois.
+
+        :return: Tuple (prix du call, prix du put).
+        """
+        key = self._pricing_key()
+        if self._cached_key != key:
+            self._cached_results = self.estimate_call_put()
+            self._cached_key = key
+        call_result, put_result = self._cached_results
+        return call_result.price, put_result.price
+
+    def price_call(self):
+        return self.price_call_put()[0]
+
+    def price_put(self):
+        return self.price_call_put()[1]
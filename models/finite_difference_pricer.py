@@ -0,0 +1,248 @@
+import numpy as np
+from collections import namedtuple
+from scipy.linalg import solve_banded
+
+# Grille complète d'un strike : spots, prix, deltas et gammas
+SpotGrid = namedtuple('SpotGrid', ['spots', 'prices', 'deltas', 'gammas'])
+
+# Largeur du domaine en écarts-types de ln(S_T) au-delà de la plus grande moneyness demandée
+DOMAIN_STD_DEVS = 6.0
+
+
+def sinh_grid(x_max, num_space_steps, center=1.0, concentration=0.1):
+    """
+    Grille non uniforme sur [0, x_max], resserrée autour de center : x = center + c * sinh(u),
+    avec u uniforme. Plus concentration est petit, plus les points se concentrent autour de center.
+
+    :return: Array croissant de num_space_steps + 1 points.
+    """
+    low = np.arcsinh((0.0 - center) / concentration)
+    high = np.arcsinh((x_max - center) / concentration)
+    x = center + concentration * np.sinh(np.linspace(low, high, num_space_steps + 1))
+    x[0], x[-1] = 0.0, x_max
+    return x
+
+
+def _operator_coefficients(x, r, sigma):
+    """
+    Coefficients (sous-diagonale, diagonale, sur-diagonale) aux points intérieurs de l'opérateur
+    de Black-Scholes en moneyness, L v = sigma^2 x^2 / 2 v_xx + r x v_x - r v, discrétisé par
+    différences centrées du second ordre sur grille non uniforme.
+    """
+    h_minus = x[1:-1] - x[:-2]
+    h_plus = x[2:] - x[1:-1]
+    h_sum = h_minus + h_plus
+    diffusion = 0.5 * sigma**2 * x[1:-1]**2
+    drift = r * x[1:-1]
+
+    lower = 2 * diffusion / (h_minus * h_sum) - drift * h_plus / (h_minus * h_sum)
+    diagonal = -2 * diffusion / (h_minus * h_plus) + drift * (h_plus - h_minus) / (h_minus * h_plus) - r
+    upper = 2 * diffusion / (h_plus * h_sum) + drift * h_minus / (h_plus * h_sum)
+    return lower, diagonal, upper
+
+
+def _boundary_values(x_max, r, tau, american):
+    """
+    Valeurs (call, put) en x = 0 et x = x_max pour une durée restante tau (strike unitaire).
+    """
+    discount = np.exp(-r * tau)
+    low = np.array([0.0, discount])
+    high = np.array([x_max - discount, 0.0])
+    if american:
+        low = np.maximum(low, [0.0, 1.0])
+        high = np.maximum(high, [x_max - 1.0, 0.0])
+    return low, high
+
+
+def solve_moneyness_grid(r, sigma, T, x_max, american=False, num_space_steps=400, num_time_steps=200,
+                         rannacher_steps=2, concentration=None):
+    """
+    Résout l'EDP de Black-Scholes en moneyness x = S / K pour un strike unitaire, calls et puts
+    ensemble (deux seconds membres d'un même système tridiagonal).
+
+    Schéma de Crank-Nicolson ; les rannacher_steps premiers pas sont remplacés chacun par deux
+    demi-pas implicites, qui amortissent les oscillations dues au coude du payoff. Pour
+    l'exercice américain, la solution est projetée sur le payoff après chaque pas.
+
+    :param x_max: Borne supérieure du domaine en moneyness.
+    :param concentration: Paramètre c de la grille sinh (par défaut sigma * sqrt(T) / 4).
+    :return: Tuple (grille x, array (len(x), 2) des valeurs call et put).
+    """
+    if concentration is None:
+        concentration = 0.25 * sigma * np.sqrt(T)
+    x = sinh_grid(x_max, num_space_steps, concentration=concentration)
+    lower, diagonal, upper = _operator_coefficients(x, r, sigma)
+    payoff = np.stack([np.maximum(x - 1, 0), np.maximum(1 - x, 0)], axis=1)
+
+    dt = T / num_time_steps
+    rannacher_steps = min(rannacher_steps, num_time_steps)
+    steps = [(0.5 * dt, 1.0)] * (2 * rannacher_steps) + [(dt, 0.5)] * (num_time_steps - rannacher_steps)
+
+    values = payoff.copy()
+    tau = 0.0
+    banded = {}
+    for step, theta in steps:
+        low_old, high_old = _boundary_values(x_max, r, tau, american)
+        tau += step
+        low_new, high_new = _boundary_values(x_max, r, tau, american)
+
+        # Second membre (I + (1 - theta) dt L) v^n, termes de bord compris
+        explicit = (1 - theta) * step
+        interior = values[1:-1]
+        rhs = interior + explicit * (diagonal[:, None] * interior)
+        rhs[1:] += explicit * lower[1:, None] * interior[:-1]
+        rhs[:-1] += explicit * upper[:-1, None] * interior[1:]
+        rhs[0] += explicit * lower[0] * low_old + theta * step * lower[0] * low_new
+        rhs[-1] += explicit * upper[-1] * high_old + theta * step * upper[-1] * high_new
+
+        # Matrice (I - theta dt L) au format bande, construite une fois par (pas, theta)
+        key = (step, theta)
+        if key not in banded:
+            implicit = theta * step
+            ab = np.zeros((3, len(diagonal)))
+            ab[0, 1:] = -implicit * upper[:-1]
+            ab[1] = 1 - implicit * diagonal
+            ab[2, :-1] = -implicit * lower[1:]
+            banded[key] = ab
+
+        values = np.empty_like(values)
+        values[1:-1] = solve_banded((1, 1), banded[key], rhs)
+        values[0], values[-1] = low_new, high_new
+        if american:
+            values = np.maximum(values, payoff)
+    return x, values
+
+
+def _quadratic_interpolation(x, values, points):
+    """
+    Interpolation quadratique (Lagrange sur les trois nœuds les plus proches) de values et de ses
+    deux premières dérivées aux points demandés.
+
+    :return: Tuple (valeurs, dérivées premières, dérivées secondes), chacun de forme (len(points),) + values.shape[1:].
+    """
+    j = np.clip(np.searchsorted(x, points), 1, len(x) - 2)
+    x0, x1, x2 = x[j - 1], x[j], x[j + 1]
+    v0, v1, v2 = values[j - 1], values[j], values[j + 1]
+    t = points
+    # Polynômes de Lagrange et leurs dérivées
+    l0 = (t - x1) * (t - x2) / ((x0 - x1) * (x0 - x2))
+    l1 = (t - x0) * (t - x2) / ((x1 - x0) * (x1 - x2))
+    l2 = (t - x0) * (t - x1) / ((x2 - x0) * (x2 - x1))
+    d0 = (2 * t - x1 - x2) / ((x0 - x1) * (x0 - x2))
+    d1 = (2 * t - x0 - x2) / ((x1 - x0) * (x1 - x2))
+    d2 = (2 * t - x0 - x1) / ((x2 - x0) * (x2 - x1))
+    s0 = 2 / ((x0 - x1) * (x0 - x2))
+    s1 = 2 / ((x1 - x0) * (x1 - x2))
+    s2 = 2 / ((x2 - x0) * (x2 - x1))
+
+    def combine(w0, w1, w2):
+        shape = (-1,) + (1,) * (values.ndim - 1)
+        return w0.reshape(shape) * v0 + w1.reshape(shape) * v1 + w2.reshape(shape) * v2
+
+    return combine(l0, l1, l2), combine(d0, d1, d2), combine(s0, s1, s2)
+
+
+def finite_difference_prices(S0, strikes, r, sigma, T, is_call=True, american=False, num_space_steps=400,
+                             num_time_steps=200, rannacher_steps=2, return_greeks=False):
+    """
+    Prix (et en option delta et gamma) de plusieurs strikes par une seule résolution de l'EDP.
+
+    Le prix étant homogène, V(S, K) = K * v(S / K), une seule grille en moneyness sert pour
+    tous les strikes d'un même (spot, taux, volatilité, maturité), européens ou américains.
+
+    :param S0: Prix du sous-jacent.
+    :param strikes: Scalaire ou array des prix d'exercice.
+    :param r: Taux sans risque.
+    :param sigma: Volatilité.
+    :param T: Maturité en années.
+    :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+    :param american: Exercice américain si True, européen sinon.
+    :param num_space_steps: Nombre d'intervalles de la grille en espace.
+    :param num_time_steps: Nombre de pas de temps.
+    :param rannacher_steps: Nombre de pas de Crank-Nicolson remplacés par deux demi-pas implicites.
+    :param return_greeks: Renvoie aussi delta et gamma.
+    :return: Array des prix, ou tuple (prix, deltas, gammas) si return_greeks.
+    """
+    strikes, is_call = np.broadcast_arrays(np.atleast_1d(np.asarray(strikes, dtype=np.float64)), is_call)
+    moneyness = S0 / strikes
+    x_max = max(moneyness.max(), 1.0) * np.exp(abs(r) * T + DOMAIN_STD_DEVS * sigma * np.sqrt(T))
+    x, values = solve_moneyness_grid(r, sigma, T, x_max, american, num_space_steps, num_time_steps,
+                                     rannacher_steps)
+
+    column = np.where(is_call, 0, 1)
+    rows = np.arange(len(strikes))
+    v, v_x, v_xx = _quadratic_interpolation(x, values, moneyness)
+    prices = strikes * v[rows, column]
+    if not return_greeks:
+        return prices
+    # dV/dS = v_x(S / K) et d2V/dS2 = v_xx(S / K) / K
+    return prices, v_x[rows, column], v_xx[rows, column] / strikes
+
+
+class FiniteDifferencePricer:
+    def __init__(self, option, stock_data, num_space_steps=400, num_time_steps=200, american=False,
+                 rannacher_steps=2):
+        """
+        Initialise le pricer par différences finies (Crank-Nicolson avec démarrage de Rannacher).
+
+        :param option: L'option à pricer (classe Option).
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param num_space_steps: Nombre d'intervalles de la grille en espace (non uniforme, resserrée au strike).
+        :param num_time_steps: Nombre de pas de temps.
+        :param american: Exercice américain si True, européen sinon.
+        :param rannacher_steps: Nombre de pas de Crank-Nicolson remplacés par deux demi-pas implicites.
+        """
+        self.option = option
+        self.stock_data = stock_data
+        self.num_space_steps = num_space_steps
+        self.num_time_steps = num_time_steps
+        self.american = american
+        self.rannacher_steps = rannacher_steps
+
+    def price_chain(self, strikes, is_call=True, return_greeks=False):
+        """
+        Calcule les prix de plusieurs strikes en une seule résolution de l'EDP.
+
+        :param strikes: Array des prix d'exercice.
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :param return_greeks: Renvoie aussi delta et gamma.
+        :return: Array des prix, ou tuple (prix, deltas, gammas).
+        """
+        return finite_difference_prices(self.stock_data.current_price, strikes, self.option.risk_free_rate,
+                                        self.stock_data.volatility, self.option.time_to_maturity, is_call,
+                                        self.american, self.num_space_steps, self.num_time_steps,
+                                        self.rannacher_steps, return_greeks)
+
+    def price_call(self):
+        """
+        Calcule le prix d'une option d'achat (call) par différences finies.
+        """
+        return self.price_chain(self.option.strike_price, is_call=True)[0]
+
+    def price_put(self):
+        """
+        Calcule le prix d'une option de vente (put) par différences finies.
+        """
+        return self.price_chain(self.option.strike_price, is_call=False)[0]
+
+    def spot_grid(self, is_call=True):
+        """
+        Renvoie la solution complète de l'EDP : prix, delta et gamma pour chaque spot de la grille.
+
+        :param is_call: True pour un call, False pour un put.
+        :return: SpotGrid (spots, prix, deltas, gammas).
+        """
+        K = self.option.strike_price
+        S0 = self.stock_data.current_price
+        sigma = self.stock_data.volatility
+        r = self.option.risk_free_rate
+        T = self.option.time_to_maturity
+        x_max = max(S0 / K, 1.0) * np.exp(abs(r) * T + DOMAIN_STD_DEVS * sigma * np.sqrt(T))
+        x, values = solve_moneyness_grid(r, sigma, T, x_max, self.american, self.num_space_steps,
+                                         self.num_time_steps, self.rannacher_steps)
+
+        # Dérivées aux nœuds intérieurs (interpolation quadratique évaluée sur les nœuds eux-mêmes)
+        column = 0 if is_call else 1
+        interior = x[1:-1]
+        v, v_x, v_xx = _quadratic_interpolation(x, values[:, column], interior)
+        return SpotGrid(K * interior, K * v, v_x, v_xx / K)
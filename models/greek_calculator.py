@@ -1,23 +1,68 @@
 import numpy as np
-import pandas as pd
-from scipy.stats import norm
+from scipy.special import ndtr
+
+GREEK_NAMES = ('delta', 'gamma', 'theta', 'vega', 'rho', 'vanna', 'volga')
+
+
+def black_scholes_greeks(spot, strike, time_to_maturity, risk_free_rate, volatility, is_call=True):
+    """
+    Calcule en une seule passe les grecques Black-Scholes d'un ensemble de contrats.
+
+    Les entrées sont des scalaires ou des arrays diffusés les uns contre les autres. d1, d2,
+    la densité n(d1) et sqrt(T) sont calculés une seule fois pour toutes les grecques.
+
+    :param spot: Prix du sous-jacent.
+    :param strike: Prix d'exercice.
+    :param time_to_maturity: Maturité en années.
+    :param risk_free_rate: Taux sans risque.
+    :param volatility: Volatilité annualisée.
+    :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+    :return: Dictionnaire {nom de la grecque: array} pour delta, gamma, theta, vega, rho, vanna et volga,
+             tous de la forme diffusée des entrées.
+    """
+    # Toutes les entrées (is_call compris) sont diffusées ensemble : chaque grecque a la même forme
+    S, K, T, r, sigma, w = np.broadcast_arrays(
+        np.asarray(spot, dtype=np.float64), np.asarray(strike, dtype=np.float64),
+        np.asarray(time_to_maturity, dtype=np.float64), np.asarray(risk_free_rate, dtype=np.float64),
+        np.asarray(volatility, dtype=np.float64), np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0))
+
+    sqrt_T = np.sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    pdf_d1 = np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi)
+    discounted_strike = K * np.exp(-r * T)
+    cdf_w_d2 = ndtr(w * d2)
+
+    vega = S * pdf_d1 * sqrt_T
+    return {
+        'delta': w * ndtr(w * d1),
+        'gamma': pdf_d1 / (S * sigma_sqrt_T),
+        'theta': -S * pdf_d1 * sigma / (2 * sqrt_T) - w * r * discounted_strike * cdf_w_d2,
+        'vega': vega,
+        'rho': w * T * discounted_strike * cdf_w_d2,
+        'vanna': -pdf_d1 * d2 / sigma,
+        'volga': vega * d1 * d2 / sigma,
+    }
+
 
 class GreekCalculator:
     def __init__(self, option, stock_data):
         self.option = option
         self.stock_data = stock_data
 
+    def calculate_all_greeks(self, is_call=True):
+        """
+        Calcule toutes les grecques (premier et second ordre) de l'option.
+
+        :param is_call: True pour un call, False pour un put.
+        :return: Dictionnaire {nom de la grecque: valeur}.
+        """
+        greeks = black_scholes_greeks(self.stock_data.current_price, self.option.strike_price,
+                                      self.option.time_to_maturity, self.option.risk_free_rate,
+                                      self.stock_data.volatility, is_call)
+        return {name: float(value) for name, value in greeks.items()}
+
     def calculate_greeks(self):
-        d1 = (np.log(self.stock_data.current_price / self.option.strike_price) + 
-              (self.option.risk_free_rate + 0.5 * self.stock_data.volatility**2) * self.option.time_to_maturity) / \
-             (self.stock_data.volatility * np.sqrt(self.option.time_to_maturity))
-        d2 = d1 - self.stock_data.volatility * np.sqrt(self.option.time_to_maturity)
-
-        delta = norm.cdf(d1)
-        gamma = norm.pdf(d1) / (self.stock_data.current_price * self.stock_data.volatility * np.sqrt(self.option.time_to_maturity))
-        theta = (-self.stock_data.current_price * norm.pdf(d1) * self.stock_data.volatility) / (2 * np.sqrt(self.option.time_to_maturity)) - \
-                self.option.risk_free_rate * self.option.strike_price * np.exp(-self.option.risk_free_rate * self.option.time_to_maturity) * norm.cdf(d2)
-        vega = self.stock_data.current_price * norm.pdf(d1) * np.sqrt(self.option.time_to_maturity)
-        rho = self.option.strike_price * self.option.time_to_maturity * np.exp(-self.option.risk_free_rate * self.option.time_to_maturity) * norm.cdf(d2)
-
-        return delta, gamma, theta, vega, rho
\ No newline at end of file
+        greeks = self.calculate_all_greeks(is_call=True)
+        return greeks['delta'], greeks['gamma'], greeks['theta'], greeks['vega'], greeks['rho']
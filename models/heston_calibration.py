@@ -0,0 +1,102 @@
+import numpy as np
+from models.heston_fft_pricer import cos_put_prices
+
+# Paramètres de Heston utilisés par défaut (et comme point de départ de la première calibration)
+DEFAULT_HESTON_PARAMS = {'kappa': 2.0, 'theta': 0.04, 'xi': 0.1, 'rho': -0.7, 'v0': 0.04}
+
+HESTON_PARAM_NAMES = ('kappa', 'theta', 'xi', 'rho', 'v0')
+
+# Bornes (kappa, theta, xi, rho, v0)
+DEFAULT_BOUNDS = ((1e-3, 1e-4, 1e-3, -0.999, 1e-4), (20.0, 2.0, 5.0, 0.999, 2.0))
+
+
+def heston_chain_prices(spot, rate, strikes, maturities, is_call, kappa, theta, xi, rho, v0, num_terms=128):
+    """
+    Prix de Heston d'une chaîne complète (plusieurs maturités) par la méthode COS.
+
+    Une évaluation vectorisée sur les strikes est faite par maturité distincte ; les calls
+    sont obtenus par parité call-put.
+
+    :return: Array des prix, dans l'ordre des cotations.
+    """
+    prices = np.empty(len(strikes))
+    for T in np.unique(maturities):
+        idx = maturities == T
+        puts = cos_put_prices(strikes[idx], spot, rate, T, kappa, theta, xi, rho, v0, num_terms=num_terms)
+        calls = puts + spot - strikes[idx] * np.exp(-rate * T)
+        prices[idx] = np.where(is_call[idx], calls, puts)
+    return prices
+
+
+class HestonCalibrator:
+    def __init__(self, initial_params=None, bounds=DEFAULT_BOUNDS, num_terms=128, max_iterations=100):
+        """
+        Initialise le calibrateur de Heston.
+
+        Chaque calibration part de la solution précédente (démarrage à chaud), ce qui permet
+        de relancer rapidement la calibration en cours de journée.
+
+        :param initial_params: Dictionnaire des paramètres de départ (par défaut DEFAULT_HESTON_PARAMS).
+        :param bounds: Tuple (bornes inférieures, bornes supérieures) dans l'ordre kappa, theta, xi, rho, v0.
+        :param num_terms: Nombre de termes de la méthode COS utilisée dans la fonction objectif.
+        :param max_iterations: Nombre maximal d'évaluations de la fonction objectif par paramètre.
+        """
+        self.params = dict(DEFAULT_HESTON_PARAMS if initial_params is None else initial_params)
+        self.bounds = bounds
+        self.num_terms = num_terms
+        self.max_iterations = max_iterations
+        self.last_result = None
+
+    def calibrate(self, spot, rate, strikes, maturities, prices, is_call):
+        """
+        Ajuste les cinq paramètres de Heston à un ensemble de cotations.
+
+        Les écarts de prix sont divisés par le vega Black-Scholes de chaque cotation : la
+        fonction objectif mesure ainsi approximativement des écarts de volatilité implicite,
+        et les options très en dehors de la monnaie ne sont pas écrasées par les autres.
+
+        :param spot: Prix du sous-jacent.
+        :param rate: Taux sans risque.
+        :param strikes: Array des prix d'exercice.
+        :param maturities: Array des maturités (en années).
+        :param prices: Array des prix de marché.
+        :param is_call: Array de booléens (True pour un call, False pour un put).
+        :return: Dictionnaire des paramètres calibrés.
+        """
+        # scipy.optimize n'est importé que lors d'une calibration (import coûteux)
+        from scipy.optimize import least_squares
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+        maturities = np.asarray(maturities, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
+
+        # Vega Black-Scholes à la volatilité de départ, plancher pour les options très hors de la monnaie
+        sigma = np.sqrt(self.params['v0'])
+        d1 = (np.log(spot / strikes) + (rate + 0.5 * sigma**2) * maturities) / (sigma * np.sqrt(maturities))
+        vega = spot * np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi) * np.sqrt(maturities)
+        weights = 1 / np.maximum(vega, 1e-3 * spot * np.sqrt(maturities))
+
+        def residuals(x):
+            model = heston_chain_prices(spot, rate, strikes, maturities, is_call, *x, num_terms=self.num_terms)
+            return (model - prices) * weights
+
+        lower, upper = np.asarray(self.bounds[0]), np.asarray(self.bounds[1])
+        x0 = np.clip([self.params[name] for name in HESTON_PARAM_NAMES], lower, upper)
+        self.last_result = least_squares(residuals, x0, bounds=(lower, upper), method='trf', x_scale='jac',
+                                         max_nfev=self.max_iterations * len(x0))
+        self.params = {name: float(value) for name, value in zip(HESTON_PARAM_NAMES, self.last_result.x)}
+        return dict(self.params)
+
+    def calibrate_market(self, market_data, stock_data, max_expirations=None):
+        """
+        Calibre le modèle sur la chaîne d'options du sous-jacent récupérée par MarketData.
+
+        :param market_data: Instance de MarketData.
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param max_expirations: Nombre maximal d'échéances utilisées (None pour toutes).
+        :return: Dictionnaire des paramètres calibrés.
+        """
+        strikes, maturities, prices, is_call = market_data.get_option_chain_quotes(max_expirations)
+        return self.calibrate(stock_data.current_price, market_data.option.risk_free_rate,
+                              strikes, maturities, prices, is_call)
@@ -0,0 +1,157 @@
+import numpy as np
+
+
+def heston_characteristic_function(u, S0, r, T, kappa, theta, xi, rho, v0):
+    """
+    Fonction caractéristique de ln(S_T) dans le modèle de Heston.
+
+    Utilise la formulation dite « little Heston trap » (Albrecher et al.), qui évite les
+    discontinuités du logarithme complexe pour les grandes maturités.
+
+    :param u: Array (éventuellement complexe) des points d'évaluation.
+    :return: Array complexe E[exp(i * u * ln(S_T))].
+    """
+    u = np.asarray(u, dtype=np.complex128)
+    iu = 1j * u
+    beta = kappa - rho * xi * iu
+    d = np.sqrt(beta**2 + xi**2 * (iu + u**2))
+    g = (beta - d) / (beta + d)
+    exp_dT = np.exp(-d * T)
+
+    C = r * iu * T + kappa * theta / xi**2 * ((beta - d) * T - 2 * np.log((1 - g * exp_dT) / (1 - g)))
+    D = (beta - d) / xi**2 * (1 - exp_dT) / (1 - g * exp_dT)
+    return np.exp(C + D * v0 + iu * np.log(S0))
+
+
+def carr_madan_call_prices(strikes, S0, r, T, kappa, theta, xi, rho, v0, alpha=1.5, num_points=4096, eta=0.25):
+    """
+    Prix de calls européens de Heston pour toute une grille de strikes, par une seule FFT (Carr-Madan).
+
+    La transformée donne les prix sur une grille de log-strikes centrée sur ln(S0), interpolée
+    ensuite (spline cubique) aux strikes demandés.
+
+    :param strikes: Array des prix d'exercice (même maturité T).
+    :param alpha: Coefficient d'amortissement du payoff. Le moment E[S_T^(alpha + 1)] doit être fini :
+                  pour une forte vol of vol et une maturité longue, réduire alpha ou utiliser cos_put_prices.
+    :param num_points: Nombre de points de la FFT (puissance de 2).
+    :param eta: Pas de la grille d'intégration en fréquence.
+    :return: Array des prix des calls (positifs ou nuls).
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    j = np.arange(num_points)
+    v = eta * j
+    lam = 2 * np.pi / (num_points * eta)
+    b = num_points * lam / 2
+    log_strikes = np.log(S0) - b + lam * j
+
+    phi = heston_characteristic_function(v - (alpha + 1) * 1j, S0, r, T, kappa, theta, xi, rho, v0)
+    psi = np.exp(-r * T) * phi / (alpha**2 + alpha - v**2 + 1j * (2 * alpha + 1) * v)
+
+    # Poids de Simpson
+    weights = eta / 3 * (3 + (-1.0)**(j + 1))
+    weights[0] = eta / 3
+
+    transform = np.fft.fft(np.exp(1j * v * (b - np.log(S0))) * psi * weights)
+    call_grid = np.exp(-alpha * log_strikes) / np.pi * transform.real
+
+    # Interpolation restreinte à la zone utile de la grille
+    k = np.log(strikes)
+    window = (log_strikes >= k.min() - 10 * lam) & (log_strikes <= k.max() + 10 * lam)
+    from scipy.interpolate import CubicSpline
+    # Le bruit numérique de la FFT rend les calls très hors de la monnaie légèrement négatifs
+    return np.maximum(CubicSpline(log_strikes[window], call_grid[window])(k), 0.0)
+
+
+def cos_put_prices(strikes, S0, r, T, kappa, theta, xi, rho, v0, num_terms=256, L=12.0):
+    """
+    Prix de puts européens de Heston par la méthode COS (Fang-Oosterlee), vectorisée sur les strikes.
+
+    :param strikes: Scalaire ou array des prix d'exercice (même maturité T).
+    :param num_terms: Nombre de termes de la série en cosinus.
+    :param L: Largeur de l'intervalle de troncature, en écarts-types de ln(S_T / S0).
+    :return: Array des prix des puts.
+    """
+    K = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+    x = np.log(S0 / K)
+
+    # Intervalle de troncature à partir des deux premiers moments approchés de ln(S_T / S0)
+    c1 = r * T + (1 - np.exp(-kappa * T)) * (theta - v0) / (2 * kappa) - 0.5 * theta * T
+    c2 = max(v0, theta) * T * (1 + xi)
+    a = x.min() + c1 - L * np.sqrt(c2)
+    b = x.max() + c1 + L * np.sqrt(c2)
+
+    k = np.arange(num_terms)
+    w = k * np.pi / (b - a)
+
+    # Coefficients en cosinus du payoff du put (max(1 - e^y, 0) sur [a, 0])
+    chi = (np.cos(w * (0 - a)) - np.exp(a) + w * np.sin(w * (0 - a))) / (1 + w**2)
+    psi = np.empty(num_terms)
+    psi[0] = -a
+    psi[1:] = np.sin(w[1:] * (0 - a)) / w[1:]
+    V = 2 / (b - a) * (psi - chi)
+
+    phi = heston_characteristic_function(w, 1.0, r, T, kappa, theta, xi, rho, v0)
+    terms = (phi * V)[:, None] * np.exp(1j * np.outer(w, x - a))
+    terms[0] *= 0.5
+    return K * np.exp(-r * T) * terms.real.sum(axis=0)
+
+
+class HestonFFTPricer:
+    def __init__(self, option, stock_data, kappa, theta, xi, rho, v0, num_points=4096, num_terms=256):
+        """
+        Initialise le pricer Heston semi-analytique (fonction caractéristique).
+
+        :param option: L'option à pricer (classe Option).
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param kappa: Vitesse de retour à la moyenne de la volatilité.
+        :param theta: Niveau de long terme de la volatilité.
+        :param xi: Volatilité de la volatilité (vol of vol).
+        :param rho: Corrélation entre le prix de l'actif et sa volatilité.
+        :param v0: Volatilité initiale.
+        :param num_points: Nombre de points de la FFT de Carr-Madan.
+        :param num_terms: Nombre de termes de la méthode COS.
+        """
+        self.option = option
+        self.stock_data = stock_data
+        self.kappa = kappa
+        self.theta = theta
+        self.xi = xi
+        self.rho = rho
+        self.v0 = v0
+        self.num_points = num_points
+        self.num_terms = num_terms
+
+    def _model_args(self, T=None):
+        T = self.option.time_to_maturity if T is None else T
+        return (self.stock_data.current_price, self.option.risk_free_rate, T,
+                self.kappa, self.theta, self.xi, self.rho, self.v0)
+
+    def price_put(self):
+        """
+        Calcule le prix d'une option de vente (put) par la méthode COS.
+        """
+        return cos_put_prices(self.option.strike_price, *self._model_args(), num_terms=self.num_terms)[0]
+
+    def price_call(self):
+        """
+        Calcule le prix d'une option d'achat (call) par la méthode COS et la parité call-put.
+        """
+        S0, r, T = self._model_args()[:3]
+        K = self.option.strike_price
+        return self.price_put() + S0 - K * np.exp(-r * T)
+
+    def price_chain(self, strikes, time_to_maturity=None, is_call=True):
+        """
+        Calcule les prix d'une grille de strikes pour une maturité en une seule FFT (Carr-Madan).
+
+        :param strikes: Array des prix d'exercice.
+        :param time_to_maturity: Maturité en années (par défaut celle de l'option).
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des prix.
+        """
+        args = self._model_args(time_to_maturity)
+        S0, r, T = args[:3]
+        strikes = np.asarray(strikes, dtype=np.float64)
+        calls = carr_madan_call_prices(strikes, *args, num_points=self.num_points)
+        puts = calls - S0 + strikes * np.exp(-r * T)
+        return np.where(is_call, calls, puts)
@@ -1,8 +1,169 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from numba import njit
+from models.instrumentation import get_instrumentation
+from models.parallel_monte_carlo import run_chunks
+
+# Nombre de trajectoires simulées par paquet dans le moteur parallèle
+DEFAULT_CHUNK_SIZE = 50000
+
+# Seuil de bascule entre les deux approximations du schéma QE (Andersen, 2008)
+QE_PSI_CRITICAL = 1.5
+
+HESTON_SCHEMES = ('qe', 'euler')
+
+
+@njit
+def simulate_heston_qe_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0, num_steps):
+    """
+    Simule des trajectoires de Heston avec le schéma Quadratic-Exponential d'Andersen et
+    renvoie uniquement les prix et variances à l'échéance.
+
+    Chaque trajectoire est simulée de bout en bout avec un état scalaire (log-prix, variance) :
+    la mémoire utilisée est O(num_paths), quel que soit le nombre de pas.
+
+    :param rng: np.random.Generator propre au paquet.
+    :return: Tuple (S_T, V_T) d'arrays de taille num_paths.
+    """
+    dt = T / num_steps
+    exp_kdt = np.exp(-kappa * dt)
+    m_var_1 = xi**2 * exp_kdt * (1 - exp_kdt) / kappa
+    m_var_2 = theta * xi**2 * (1 - exp_kdt)**2 / (2 * kappa)
+
+    # Discrétisation du log-prix (gamma1 = gamma2 = 1/2)
+    K0 = -rho * kappa * theta / xi * dt
+    K1 = 0.5 * dt * (kappa * rho / xi - 0.5) - rho / xi
+    K2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+    K3 = 0.5 * dt * (1 - rho**2)
+    drift = r * dt + K0
+
+    final_prices = np.empty(num_paths)
+    final_variances = np.empty(num_paths)
+    log_S0 = np.log(S0)
+    for i in range(num_paths):
+        log_S = log_S0
+        V = v0
+        for _ in range(num_steps):
+            m = theta + (V - theta) * exp_kdt
+            s2 = V * m_var_1 + m_var_2
+            psi = s2 / (m * m)
+            if psi <= QE_PSI_CRITICAL:
+                inv_psi = 2.0 / psi
+                b2 = inv_psi - 1 + np.sqrt(inv_psi) * np.sqrt(inv_psi - 1)
+                a = m / (1 + b2)
+                V_next = a * (np.sqrt(b2) + rng.standard_normal())**2
+            else:
+                p = (psi - 1) / (psi + 1)
+                beta = (1 - p) / m
+                U = rng.random()
+                V_next = 0.0 if U <= p else np.log((1 - p) / (1 - U)) / beta
+
+            log_S += drift + K1 * V + K2 * V_next + np.sqrt(K3 * (V + V_next)) * rng.standard_normal()
+            V = V_next
+        final_prices[i] = np.exp(log_S)
+        final_variances[i] = V
+    return final_prices, final_variances
+
+
+def simulate_heston_euler_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0, num_steps):
+    """
+    Simule des trajectoires de Heston (Euler avec troncature) en ne conservant que l'état courant.
+
+    :return: Tuple (S_T, V_T) d'arrays de taille num_paths.
+    """
+    dt = T / num_steps
+    S = np.full(num_paths, S0, dtype=np.float64)
+    V = np.full(num_paths, v0, dtype=np.float64)
+    for _ in range(num_steps):
+        Z1 = rng.standard_normal(num_paths)
+        Z2 = rho * Z1 + np.sqrt(1 - rho**2) * rng.standard_normal(num_paths)
+        sqrt_V = np.sqrt(V)
+        S = S * np.exp((r - 0.5 * V) * dt + sqrt_V * np.sqrt(dt) * Z1)
+        V = np.maximum(V + kappa * (theta - V) * dt + xi * sqrt_V * np.sqrt(dt) * Z2, 0)
+    return S, V
+
+
+def simulate_heston_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0, num_steps, scheme='qe',
+                             random_store=None):
+    """
+    Simule les prix et variances à l'échéance avec le schéma demandé ('qe' ou 'euler').
+
+    :param random_store: RandomStore (voir models.random_store) où relire les trajectoires du paquet
+                         si elles ont déjà été simulées avec les mêmes paramètres (None pour toujours simuler).
+    :return: Tuple (S_T, V_T) d'arrays de taille num_paths.
+    """
+    simulate = simulate_heston_qe_terminal if scheme == 'qe' else simulate_heston_euler_terminal
+    args = (num_paths, S0, r, T, kappa, theta, xi, rho, v0, num_steps)
+    if random_store is None:
+        return simulate(rng, *args)
+    terminal = random_store.cached(rng, ('heston_terminal', scheme) + args,
+                                   lambda: np.stack(simulate(rng, *args)))
+    return terminal[0], terminal[1]
+
+
+def heston_terminal_payoff_sums_kernel(rng, num_paths, S0, r, T, K, kappa, theta, xi, rho, v0, num_steps,
+                                       scheme='qe', random_store=None):
+    """
+    Noyau d'un paquet : simule num_paths trajectoires de Heston et renvoie les sommes des payoffs
+    call et put à l'échéance, calculées sur les mêmes trajectoires.
+    """
+    instrumentation = get_instrumentation()
+    # Les tirages sont faits dans la boucle compilée : l'étape path_stepping inclut le générateur
+    with instrumentation.stage('path_stepping'):
+        final_prices, _ = simulate_heston_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0,
+                                                    num_steps, scheme, random_store)
+    with instrumentation.stage('payoff_reduction'):
+        sums = np.maximum(final_prices - K, 0).sum(), np.maximum(K - final_prices, 0).sum()
+    instrumentation.count('paths', num_paths)
+    return sums
+
+
+def heston_strip_sums_kernel(rng, num_paths, S0, r, T, strikes, kappa, theta, xi, rho, v0, num_steps, scheme,
+                             random_store=None):
+    """
+    Noyau d'un paquet : simule num_paths trajectoires de Heston, partagées par tous les strikes,
+    et renvoie les sommes des payoffs call (un par strike) puis put.
+    """
+    instrumentation = get_instrumentation()
+    with instrumentation.stage('path_stepping'):
+        final_prices, _ = simulate_heston_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0,
+                                                    num_steps, scheme, random_store)
+    with instrumentation.stage('payoff_reduction'):
+        sums = np.array([np.maximum(final_prices - K, 0).sum() for K in strikes] +
+                        [np.maximum(K - final_prices, 0).sum() for K in strikes])
+    instrumentation.count('paths', num_paths)
+    return sums
+
+
+def heston_greeks_kernel(rng, num_paths, S0, r, T, K, kappa, theta, xi, rho, v0, num_steps, scheme, relative_bump,
+                         random_store=None):
+    """
+    Noyau d'un paquet : sommes des prix, deltas et gammas du call et du put (6 valeurs).
+
+    S_T étant proportionnel à S0 (S_T = S0 * X), le delta trajectoriel vaut 1{S_T > K} * X pour
+    un call. Le gamma est la différence centrée de ce delta en S0 * (1 +/- relative_bump),
+    évaluée sur les mêmes X : aucune nouvelle simulation n'est nécessaire.
+    """
+    instrumentation = get_instrumentation()
+    with instrumentation.stage('path_stepping'):
+        final_prices, _ = simulate_heston_terminal(rng, num_paths, S0, r, T, kappa, theta, xi, rho, v0,
+                                                    num_steps, scheme, random_store)
+
+    with instrumentation.stage('payoff_reduction'):
+        X = final_prices / S0
+        h = relative_bump * S0
+        sums = []
+        for sign in (1.0, -1.0):
+            def delta_sum(spot):
+                return (sign * (sign * (spot * X - K) > 0) * X).sum()
+            sums += [np.maximum(sign * (final_prices - K), 0).sum(), delta_sum(S0),
+                     (delta_sum(S0 + h) - delta_sum(S0 - h)) / (2 * h)]
+    instrumentation.count('paths', num_paths)
+    return np.array(sums)
+
 
 class HestonPricer:
-    def __init__(self, option, stock_data, kappa, theta, xi, rho, v0):
+    def __init__(self, option, stock_data, kappa, theta, xi, rho, v0, seed=None, num_workers=1,
+                 chunk_size=DEFAULT_CHUNK_SIZE, scheme='qe', random_store=None):
         """
         Initialise le pricer Heston.
 
@@ -13,7 +174,16 @@ class HestonPricer:
         :param xi: Volatilité de la volatilité (vol of vol).
         :param rho: Corrélation entre le prix de l'actif et sa volatilité.
         :param v0: Volatilité initiale.
+        :param seed: Graine du générateur aléatoire (None pour un tirage non reproductible).
+        :param num_workers: Nombre de processus utilisés pour simuler les paquets (par défaut 1).
+        :param chunk_size: Nombre de trajectoires par paquet.
+        :param scheme: Schéma de discrétisation : 'qe' (Quadratic-Exponential, par défaut) ou 'euler'.
+        :param random_store: RandomStore (voir models.random_store) où conserver les trajectoires simulées de
+                             chaque paquet pour les exécutions suivantes ; les prix sont identiques avec ou sans.
+                             Ignoré sans graine : des trajectoires non reproductibles ne seraient jamais relues.
         """
+        if scheme not in HESTON_SCHEMES:
+            raise ValueError(f"Unknown Heston scheme {scheme!r}, expected one of {HESTON_SCHEMES}")
         self.option = option
         self.stock_data = stock_data
         self.kappa = kappa
@@ -21,6 +191,17 @@ class HestonPricer:
         self.xi = xi
         self.rho = rho
         self.v0 = v0
+        self.seed = seed
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.scheme = scheme
+        self.random_store = random_store
+        self._cached_key = None
+        self._cached_prices = None
+
+    def _random_store(self):
+        # Sans graine, chaque exécution tire de nouveaux flux : rien à relire, le stock n'est pas utilisé
+        return None if self.seed is None else self.random_store
 
     def simulate_heston_paths(self, num_simulations, num_steps):
         """
@@ -59,36 +240,95 @@ class HestonPricer:
 
         return S, V
 
-    def price_call(self, num_simulations=10000, num_steps=252):
+    def simulate_payoff_sums(self, num_simulations, num_steps):
         """
-        Calcule le prix d'une option d'achat (call) en utilisant le modèle de Heston.
+        Simule les trajectoires de Heston par paquets (éventuellement en parallèle) et accumule
+        les payoffs du call et du put à l'échéance.
+
+        :return: Tuple (somme des payoffs call, somme des payoffs put).
+        """
+        args = (self.stock_data.current_price, self.option.risk_free_rate, self.option.time_to_maturity,
+                self.option.strike_price, self.kappa, self.theta, self.xi, self.rho, self.v0, num_steps,
+                self.scheme, self._random_store())
+        return run_chunks(heston_terminal_payoff_sums_kernel, args, num_simulations, self.chunk_size,
+                          seed=self.seed, num_workers=self.num_workers)
+
+    def price_call_put(self, num_simulations=10000, num_steps=252):
+        """
+        Calcule les prix du call et du put à partir des mêmes trajectoires.
+
+        Le résultat est conservé tant que les paramètres ne changent pas, de sorte que
+        price_call puis price_put ne simulent qu'une seule fois.
+
+        :return: Tuple (prix du call, prix du put).
         """
-        S, _ = self.simulate_heston_paths(num_simulations, num_steps)
-        K = self.option.strike_price
         r = self.option.risk_free_rate
         T = self.option.time_to_maturity
+        key = (self.stock_data.current_price, r, T, self.option.strike_price, self.kappa, self.theta,
+               self.xi, self.rho, self.v0, self.seed, self.chunk_size, self.scheme, num_simulations, num_steps)
+        if self._cached_key != key:
+            call_sum, put_sum = self.simulate_payoff_sums(num_simulations, num_steps)
+            with get_instrumentation().stage('discounting'):
+                discount = np.exp(-r * T)
+                self._cached_prices = (discount * call_sum / num_simulations, discount * put_sum / num_simulations)
+            self._cached_key = key
+        return self._cached_prices
 
-        final_prices = S[:, -1]
-        payoffs = np.maximum(final_prices - K, 0)
-        return np.exp(-r * T) * np.mean(payoffs)
+    def price_chain(self, strikes, is_call=True, num_simulations=10000, num_steps=252):
+        """
+        Calcule les prix de plusieurs strikes (même maturité) sur les mêmes trajectoires de Heston.
 
-    def price_put(self, num_simulations=10000, num_steps=252):
+        :param strikes: Array des prix d'exercice.
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des prix.
         """
-        Calcule le prix d'une option de vente (put) en utilisant le modèle de Heston.
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+        r = self.option.risk_free_rate
+        T = self.option.time_to_maturity
+        args = (self.stock_data.current_price, r, T, strikes, self.kappa, self.theta, self.xi, self.rho,
+                self.v0, num_steps, self.scheme, self._random_store())
+        sums = run_chunks(heston_strip_sums_kernel, args, num_simulations, self.chunk_size, seed=self.seed,
+                          num_workers=self.num_workers)
+        with get_instrumentation().stage('discounting'):
+            prices = np.exp(-r * T) * sums / num_simulations
+        return np.where(is_call, prices[:len(strikes)], prices[len(strikes):])
+
+    def estimate_greeks(self, num_simulations=10000, num_steps=252, relative_bump=0.01):
+        """
+        Estime le prix, le delta (trajectoriel) et le gamma du call et du put en une seule simulation.
+
+        :param relative_bump: Choc relatif sur S0 utilisé pour le gamma (sur les mêmes trajectoires).
+        :return: Dictionnaire {'call': {...}, 'put': {...}} des valeurs 'price', 'delta', 'gamma'.
         """
-        S, _ = self.simulate_heston_paths(num_simulations, num_steps)
-        K = self.option.strike_price
         r = self.option.risk_free_rate
         T = self.option.time_to_maturity
+        args = (self.stock_data.current_price, r, T, self.option.strike_price, self.kappa, self.theta,
+                self.xi, self.rho, self.v0, num_steps, self.scheme, relative_bump, self._random_store())
+        sums = run_chunks(heston_greeks_kernel, args, num_simulations, self.chunk_size, seed=self.seed,
+                          num_workers=self.num_workers)
+        with get_instrumentation().stage('discounting'):
+            means = np.exp(-r * T) * sums / num_simulations
+        names = ('price', 'delta', 'gamma')
+        return {'call': dict(zip(names, means[:3].tolist())), 'put': dict(zip(names, means[3:].tolist()))}
 
-        final_prices = S[:, -1]
-        payoffs = np.maximum(K - final_prices, 0)
-        return np.exp(-r * T) * np.mean(payoffs)
+    def price_call(self, num_simulations=10000, num_steps=252):
+        """
+        Calcule le prix d'une option d'achat (call) en utilisant le modèle de Heston.
+        """
+        return self.price_call_put(num_simulations, num_steps)[0]
+
+    def price_put(self, num_simulations=10000, num_steps=252):
+        """
+        Calcule le prix d'une option de vente (put) en utilisant le modèle de Heston.
+        """
+        return self.price_call_put(num_simulations, num_steps)[1]
 
     def plot_trajectories(self, num_simulations=10, num_steps=252):
         """
         Affiche des trajectoires simulées de prix et de volatilité.
         """
+        import matplotlib.pyplot as plt
+
         S, V = self.simulate_heston_paths(num_simulations, num_steps)
         T = self.option.time_to_maturity
         time = np.linspace(0, T, num_steps + 1)
@@ -0,0 +1,169 @@
+import numpy as np
+from scipy.special import ndtr
+
+# Précision relative visée sur la volatilité totale sigma * sqrt(T)
+IMPLIED_VOL_TOLERANCE = 4 * np.finfo(np.float64).eps
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def normalized_black_call(x, s):
+    """
+    Prix de call de Black normalisé : b(x, s) = exp(x / 2) N(x / s + s / 2) - exp(-x / 2) N(x / s - s / 2),
+    où x = ln(F / K) et s = sigma * sqrt(T) est la volatilité totale.
+    """
+    return np.exp(0.5 * x) * ndtr(x / s + 0.5 * s) - np.exp(-0.5 * x) * ndtr(x / s - 0.5 * s)
+
+
+def _initial_guess(x, beta):
+    """
+    Point de départ en volatilité totale pour un call normalisé hors de la monnaie (x <= 0).
+
+    Approximation rationnelle de Corrado-Miller ; lorsqu'elle n'est pas définie (options très
+    hors de la monnaie), on part du point d'inflection sqrt(2 |x|) de b(x, .).
+    """
+    # Variables de Corrado-Miller en unités normalisées (forward = exp(x / 2), strike = exp(-x / 2))
+    forward, strike = np.exp(0.5 * x), np.exp(-0.5 * x)
+    half_gap = 0.5 * (forward - strike)
+    discriminant = (beta - half_gap)**2 - (forward - strike)**2 / np.pi
+    with np.errstate(invalid='ignore'):
+        guess = _SQRT_2PI / (forward + strike) * (beta - half_gap + np.sqrt(discriminant))
+    inflection = np.sqrt(2 * np.abs(x))
+    return np.where(np.isfinite(guess) & (guess > 0), guess, np.maximum(inflection, 1e-2))
+
+
+def implied_volatility(prices, spot, strike, time_to_maturity, risk_free_rate, is_call=True, max_iterations=20):
+    """
+    Calcule les volatilités implicites Black-Scholes d'une chaîne complète de cotations.
+
+    Chaque cotation est ramenée à un call normalisé hors de la monnaie (parité call-put et
+    symétrie de la formule de Black), puis la volatilité totale est obtenue par itérations de
+    Householder d'ordre 3 vectorisées, protégées par un encadrement (bissection si un pas en
+    sort). Sous le point d'inflection, où le prix décroît exponentiellement, les itérations
+    portent sur le logarithme du prix, ce qui garde une convergence rapide pour les options
+    très hors de la monnaie.
+
+    Les cotations inférieures à la valeur intrinsèque (ou supérieures à la borne haute) donnent NaN ;
+    une cotation égale à la valeur intrinsèque, à l'arrondi près, donne une volatilité nulle.
+
+    :param prices: Prix de marché.
+    :param spot: Prix du sous-jacent.
+    :param strike: Prix d'exercice.
+    :param time_to_maturity: Maturité en années.
+    :param risk_free_rate: Taux sans risque.
+    :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+    :param max_iterations: Nombre maximal d'itérations.
+    :return: Array des volatilités implicites (forme diffusée des entrées).
+    """
+    prices, S, K, T, r, is_call = np.broadcast_arrays(
+        np.asarray(prices, dtype=np.float64), np.asarray(spot, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64), np.asarray(time_to_maturity, dtype=np.float64),
+        np.asarray(risk_free_rate, dtype=np.float64), np.asarray(is_call, dtype=bool))
+
+    # Prix normalisé par DF * sqrt(F * K), avec F le forward
+    forward = S * np.exp(r * T)
+    x = np.log(forward / K)
+    beta = prices / (np.exp(-r * T) * np.sqrt(forward * K))
+
+    # Réduction à un call hors de la monnaie : on retire la valeur intrinsèque, puis b_put(x) = b_call(-x).
+    # Une option déjà hors de la monnaie n'est pas convertie, ce qui préserve les prix minuscules.
+    w = np.where(is_call, 1.0, -1.0)
+    intrinsic = np.maximum(w * (np.exp(0.5 * x) - np.exp(-0.5 * x)), 0)
+    beta_otm = beta - intrinsic
+    x = -np.abs(x)
+    upper_bound = np.exp(0.5 * x)
+
+    # Valeur temps indiscernable de l'erreur d'arrondi sur la valeur intrinsèque : prix à l'intrinsèque
+    at_intrinsic = np.abs(beta_otm) <= 8 * np.finfo(np.float64).eps * intrinsic
+    valid = ~at_intrinsic & (beta_otm > 0) & (beta_otm < upper_bound) & (T > 0)
+    s = np.full(x.shape, np.nan)
+    s[(at_intrinsic | (beta_otm == 0)) & (T > 0)] = 0.0
+    x_v, beta_v = x[valid], beta_otm[valid]
+
+    s_v = _initial_guess(x_v, beta_v)
+    low = np.zeros_like(s_v)
+    high = np.full_like(s_v, np.inf)
+    inflection = np.sqrt(2 * np.abs(x_v))
+    log_region = beta_v < normalized_black_call(x_v, np.maximum(inflection, 1e-300))
+    active = np.ones(s_v.shape, dtype=bool)
+
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+        xa, sa, ba, la = x_v[active], s_v[active], beta_v[active], log_region[active]
+        b = normalized_black_call(xa, sa)
+
+        # Dérivées de b par rapport à s : b' = exp(x / 2) n(d1), b''/b' = h2, b'''/b' = h3
+        d1 = xa / sa + 0.5 * sa
+        b1 = np.exp(0.5 * xa - 0.5 * d1**2) / _SQRT_2PI
+        h2 = xa**2 / sa**3 - 0.25 * sa
+        h3 = h2**2 - 3 * xa**2 / sa**4 - 0.25
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Objectif f = b - beta, ou f = ln(b) - ln(beta) sous le point d'inflection
+            ratio = b1 / b
+            f = np.where(la, np.log(b) - np.log(ba), b - ba)
+            f1 = np.where(la, ratio, b1)
+            f2 = np.where(la, ratio * (h2 - ratio), b1 * h2)
+            f3 = np.where(la, ratio * (h3 - 3 * h2 * ratio + 2 * ratio**2), b1 * h3)
+
+            nu = -f / f1
+            step = nu * (1 + 0.5 * f2 / f1 * nu) / (1 + f2 / f1 * nu + f3 / (6 * f1) * nu**2)
+
+        # Mise à jour de l'encadrement (b est croissante en s)
+        below = f < 0
+        la_low, la_high = low[active], high[active]
+        la_low = np.where(below, sa, la_low)
+        la_high = np.where(below, la_high, sa)
+
+        candidate = sa + step
+        converged = np.abs(step) <= IMPLIED_VOL_TOLERANCE * sa
+        outside = ~converged & (~np.isfinite(candidate) | (candidate <= la_low) | (candidate >= la_high))
+        fallback = np.where(np.isfinite(la_high), 0.5 * (la_low + la_high), 2 * sa)
+        candidate = np.where(outside, fallback, candidate)
+        idx = np.flatnonzero(active)
+        s_v[idx] = candidate
+        low[idx] = la_low
+        high[idx] = la_high
+        active[idx[converged]] = False
+
+    s[valid] = s_v
+    return s / np.sqrt(T)
+
+
+class ImpliedVolatilitySolver:
+    def __init__(self, stock_data, risk_free_rate, max_iterations=20):
+        """
+        Initialise le solveur de volatilité implicite pour un sous-jacent.
+
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param risk_free_rate: Taux sans risque.
+        :param max_iterations: Nombre maximal d'itérations.
+        """
+        self.stock_data = stock_data
+        self.risk_free_rate = risk_free_rate
+        self.max_iterations = max_iterations
+
+    def solve_chain(self, prices, strikes, maturities, is_call=True):
+        """
+        Calcule les volatilités implicites d'une chaîne de cotations du sous-jacent.
+
+        :param prices: Array des prix de marché.
+        :param strikes: Array des prix d'exercice.
+        :param maturities: Array des maturités (en années).
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des volatilités implicites.
+        """
+        return implied_volatility(prices, self.stock_data.current_price, strikes, maturities,
+                                  self.risk_free_rate, is_call, self.max_iterations)
+
+    def solve_market_chain(self, market_data, max_expirations=None):
+        """
+        Récupère la chaîne d'options via MarketData et calcule toutes ses volatilités implicites.
+
+        :param market_data: Instance de MarketData.
+        :param max_expirations: Nombre maximal d'échéances (None pour toutes).
+        :return: Tuple d'arrays (strikes, maturités, is_call, volatilités implicites).
+        """
+        strikes, maturities, prices, is_call = market_data.get_option_chain_quotes(max_expirations)
+        return strikes, maturities, is_call, self.solve_chain(prices, strikes, maturities, is_call)
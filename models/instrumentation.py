@@ -0,0 +1,264 @@
+"""
+Instrumentation des pricers : temps par étape, compteurs, mémoire maximale et temps de compilation Numba.
+
+Par défaut l'instrumentation est désactivée : get_instrumentation() renvoie une instance dont
+toutes les méthodes sont des no-op, appelées une fois par paquet de simulations (jamais par
+trajectoire ni dans le code compilé par Numba). Pour mesurer :
+
+    instrumentation = RecordingInstrumentation(sink=LoggingSink())
+    previous = set_instrumentation(instrumentation)
+    try:
+        pricer.price_call_put()
+    finally:
+        set_instrumentation(previous)
+    instrumentation.flush(ticker=option.ticker)
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de la mémoire maximale
+    resource = None
+
+_NULL_STAGE = nullcontext()
+
+
+def memory_high_water():
+    """
+    :return: Mémoire résidente maximale du processus depuis son démarrage, en octets (None si indisponible).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en kilo-octets ailleurs
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Instrumentation:
+    """
+    Instrumentation désactivée : aucune mesure, aucun coût.
+    """
+    enabled = False
+
+    def stage(self, name):
+        """
+        :return: Gestionnaire de contexte mesurant la durée de l'étape name.
+        """
+        return _NULL_STAGE
+
+    def count(self, name, value=1):
+        """
+        Ajoute value au compteur name.
+        """
+
+    def merge(self, snapshot):
+        """
+        Ajoute les mesures d'un autre processus (voir RecordingInstrumentation.snapshot).
+        """
+
+    def _attach(self):
+        pass
+
+    def _detach(self):
+        pass
+
+
+class _Stage:
+    __slots__ = ('instrumentation', 'name', 'start', 'compile_start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.compile_start = self.instrumentation.numba_compile_seconds
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        compile_seconds = self.instrumentation.numba_compile_seconds - self.compile_start
+        self.instrumentation._add_stage(self.name, 1, elapsed, compile_seconds, memory_high_water())
+        return False
+
+
+class _NumbaCompileListener:
+    """
+    Cumule la durée des compilations Numba (événements "numba:compile" de premier niveau).
+    """
+
+    def __init__(self, instrumentation):
+        from numba.core import event
+
+        class Listener(event.Listener):
+            depth = 0
+
+            def on_start(self, event):
+                if self.depth == 0:
+                    self.start = time.perf_counter()
+                self.depth += 1
+
+            def on_end(self, event):
+                self.depth -= 1
+                if self.depth == 0:
+                    instrumentation._add_compilation(time.perf_counter() - self.start)
+
+        self.event = event
+        self.listener = Listener()
+
+    def register(self):
+        self.event.register("numba:compile", self.listener)
+
+    def unregister(self):
+        self.event.unregister("numba:compile", self.listener)
+
+
+class RecordingInstrumentation(Instrumentation):
+    """
+    Instrumentation active : enregistre, pour chaque étape, le nombre d'appels, le temps
+    total et la part de ce temps passée à compiler avec Numba, ainsi que des compteurs
+    (trajectoires, paquets...) et la mémoire résidente maximale.
+
+    Les mesures sont lues avec snapshot() ou envoyées au sink avec flush().
+    """
+    enabled = True
+
+    def __init__(self, sink=None):
+        """
+        :param sink: Fonction recevant le dictionnaire des mesures à chaque flush (LoggingSink,
+                     JsonLinesSink ou tout autre callable), None pour ne rien exporter.
+        """
+        self.sink = sink
+        self._lock = threading.Lock()
+        self._listener = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.memory_high_water = None
+            self.numba_compile_seconds = 0.0
+            self.numba_compilations = 0
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _add_stage(self, name, calls, seconds, compile_seconds, memory):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'compile_seconds': 0.0})
+            stage['calls'] += calls
+            stage['seconds'] += seconds
+            stage['compile_seconds'] += compile_seconds
+            if memory is not None:
+                self.memory_high_water = max(memory, self.memory_high_water or 0)
+
+    def _add_compilation(self, seconds, compilations=1):
+        with self._lock:
+            self.numba_compile_seconds += seconds
+            self.numba_compilations += compilations
+
+    def merge(self, snapshot):
+        for name, stage in snapshot['stages'].items():
+            self._add_stage(name, stage['calls'], stage['seconds'], stage['compile_seconds'],
+                            snapshot['memory_high_water'])
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+        self._add_compilation(snapshot['numba_compile_seconds'], snapshot['numba_compilations'])
+
+    def snapshot(self):
+        """
+        :return: Dictionnaire des mesures (sérialisable en JSON). Le temps d'exécution hors
+                 compilation d'une étape vaut seconds - compile_seconds.
+        """
+        with self._lock:
+            return {
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+                'memory_high_water': self.memory_high_water,
+                'numba_compile_seconds': self.numba_compile_seconds,
+                'numba_compilations': self.numba_compilations,
+            }
+
+    def flush(self, **labels):
+        """
+        Envoie les mesures au sink, avec des étiquettes (ticker, modèle...), puis les remet à zéro.
+
+        :return: Le dictionnaire des mesures envoyé.
+        """
+        metrics = {'timestamp': time.time(), **labels, **self.snapshot()}
+        if self.sink is not None:
+            self.sink(metrics)
+        self.reset()
+        return metrics
+
+    def _attach(self):
+        if self._listener is None:
+            self._listener = _NumbaCompileListener(self)
+        self._listener.register()
+
+    def _detach(self):
+        if self._listener is not None:
+            self._listener.unregister()
+
+
+class LoggingSink:
+    """
+    Sink écrivant les mesures comme un log structuré : message JSON, et dictionnaire
+    disponible dans l'attribut 'metrics' de l'enregistrement pour les formateurs.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logging.getLogger("option_pricer.metrics") if logger is None else logger
+        self.level = level
+
+    def __call__(self, metrics):
+        self.logger.log(self.level, json.dumps(metrics), extra={'metrics': metrics})
+
+
+class JsonLinesSink:
+    """
+    Sink ajoutant une ligne JSON par flush à un fichier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics):
+        with self._lock, open(self.path, 'a') as file:
+            file.write(json.dumps(metrics) + '\n')
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation():
+    """
+    Instrumentation utilisée par les pricers (désactivée par défaut).
+    """
+    return _instrumentation
+
+
+def set_instrumentation(instrumentation):
+    """
+    Remplace l'instrumentation utilisée par les pricers.
+
+    :param instrumentation: Nouvelle instrumentation (None pour la désactiver).
+    :return: L'instrumentation précédente, pour pouvoir la rétablir.
+    """
+    global _instrumentation
+    previous = _instrumentation
+    previous._detach()
+    _instrumentation = Instrumentation() if instrumentation is None else instrumentation
+    _instrumentation._attach()
+    return previous
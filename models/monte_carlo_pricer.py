@@ -1,5 +1,9 @@
 import numpy as np
+from collections import namedtuple
 from numba import njit
+from models.instrumentation import get_instrumentation
+from models.parallel_monte_carlo import resolve_seed, run_chunks
+from models.quasi_random import sobol_brownian_paths
 
 # Fonction statique optimisée pour générer les marches aléatoires
 @njit
@@ -16,66 +20,437 @@ def generate_random_walks(current_price, volatility, risk_free_rate, time_to_mat
     drift = (risk_free_rate - 0.5 * volatility**2) * dt
     diffusion = volatility * np.sqrt(dt)
 
-    print(f"Initial current price: {current_price}")
-    print(f"Volatility: {volatility}, Risk-Free Rate: {risk_free_rate}, Time to Maturity: {time_to_maturity}")
-    
-    # Calcul de chaque marche aléatoire
+    # Calcul de chaque marche aléatoire (aucune entrée/sortie dans le code compilé : voir models.instrumentation)
     for t in range(1, num_steps + 1):
         paths[:, t] = paths[:, t-1] * np.exp(drift + diffusion * Z[:, t-1])
-        if t % 100 == 0:  # Affiche un message tous les 100 pas
-            print(f"Step {t}/{num_steps} completed")
-    
-    print(f"Generated paths for {num_simulations} simulations.")
+
     return paths
 
+# Budget mémoire par défaut pour le mode européen (en octets)
+DEFAULT_MEMORY_BUDGET = 64 * 1024**2
+
+# Taille par défaut d'un paquet de trajectoires, indépendante du nombre de workers : assez
+# petite pour répartir quelques centaines de milliers de trajectoires entre processus
+DEFAULT_CHUNK_SIZE = 2**16
+
+# Octets nécessaires par trajectoire en mode européen : tirage normal, prix final,
+# payoffs du call et du put et leurs produits pour les statistiques (float64)
+BYTES_PER_TERMINAL_PATH = 6 * 8
+
+# Nombre minimal de réplications indépendantes en échantillonnage quasi-aléatoire,
+# nécessaire pour estimer l'erreur standard
+MIN_QMC_REPLICATIONS = 8
+
+SAMPLING_METHODS = ('pseudo', 'sobol')
+
+# Prix estimé, erreur standard et nombre de trajectoires simulées
+MonteCarloResult = namedtuple('MonteCarloResult', ['price', 'std_error', 'num_paths'])
+
+
+def chunk_size_for_budget(memory_budget, bytes_per_path):
+    """
+    Calcule le nombre de trajectoires traitées par paquet : DEFAULT_CHUNK_SIZE, réduit si
+    nécessaire pour respecter un budget mémoire.
+
+    :param memory_budget: Budget mémoire en octets.
+    :param bytes_per_path: Nombre d'octets alloués par trajectoire.
+    :return: Taille d'un paquet (au moins 1).
+    """
+    return max(1, min(DEFAULT_CHUNK_SIZE, int(memory_budget // bytes_per_path)))
+
+
+def simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, Z):
+    """
+    Échantillonne directement les prix à l'échéance d'un mouvement brownien géométrique.
+
+    La loi de S(T) étant connue, aucun pas de temps intermédiaire n'est nécessaire :
+    S(T) = S0 * exp((r - sigma^2 / 2) * T + sigma * sqrt(T) * Z).
+
+    :param Z: Array de tirages normaux centrés réduits (un par trajectoire).
+    :return: Array des prix à l'échéance.
+    """
+    drift = (risk_free_rate - 0.5 * volatility**2) * time_to_maturity
+    diffusion = volatility * np.sqrt(time_to_maturity)
+    return current_price * np.exp(drift + diffusion * Z)
+
+
+def payoff_statistics(Y, C):
+    """
+    Statistiques additives d'un échantillon de payoffs Y et de variables de contrôle C :
+    [n, somme Y, somme Y^2, somme C, somme C^2, somme Y*C].
+    """
+    return np.array([Y.size, Y.sum(), (Y * Y).sum(), C.sum(), (C * C).sum(), (Y * C).sum()])
+
+
+def control_variate_beta(stats):
+    """
+    Coefficient optimal beta = Cov(Y, C) / Var(C) de la variable de contrôle.
+    """
+    n, sum_y, _, sum_c, sum_cc, sum_yc = stats
+    var_c = sum_cc - sum_c**2 / n
+    if var_c <= 0:
+        return 0.0
+    return (sum_yc - sum_y * sum_c / n) / var_c
+
+
+def estimate_from_statistics(stats, control_mean=None):
+    """
+    Moyenne et erreur standard d'un échantillon i.i.d. à partir de ses statistiques additives.
+
+    :param stats: Statistiques renvoyées par payoff_statistics (éventuellement additionnées).
+    :param control_mean: Espérance connue de la variable de contrôle (None pour ne pas l'utiliser).
+    :return: Tuple (moyenne, erreur standard).
+    """
+    n, sum_y, sum_yy, sum_c, sum_cc, sum_yc = stats
+    mean = sum_y / n
+    if n < 2:
+        return mean, np.nan
+    var_y = (sum_yy - sum_y**2 / n) / (n - 1)
+    if control_mean is not None:
+        beta = control_variate_beta(stats)
+        cov_yc = (sum_yc - sum_y * sum_c / n) / (n - 1)
+        var_c = (sum_cc - sum_c**2 / n) / (n - 1)
+        mean -= beta * (sum_c / n - control_mean)
+        var_y = var_y - 2 * beta * cov_yc + beta**2 * var_c
+    return mean, np.sqrt(max(var_y, 0.0) / n)
+
+
+def estimate_from_replications(chunk_stats, control_mean=None):
+    """
+    Moyenne et erreur standard à partir de réplications indépendantes (un paquet = une suite
+    de Sobol brouillée) : l'erreur est estimée par la dispersion des moyennes des paquets.
+
+    :param chunk_stats: Array (nombre de paquets, 6) des statistiques de chaque paquet.
+    :param control_mean: Espérance connue de la variable de contrôle (None pour ne pas l'utiliser).
+    :return: Tuple (moyenne, erreur standard).
+    """
+    n, sum_y, sum_c = chunk_stats[:, 0], chunk_stats[:, 1], chunk_stats[:, 3]
+    chunk_means = sum_y / n
+    if control_mean is not None:
+        beta = control_variate_beta(chunk_stats.sum(axis=0))
+        chunk_means = chunk_means - beta * (sum_c / n - control_mean)
+    mean = np.average(chunk_means, weights=n)
+    if len(chunk_means) < 2:
+        return mean, np.nan
+    return mean, np.std(chunk_means, ddof=1) / np.sqrt(len(chunk_means))
+
+
+def draw_terminal_normals(rng, num_samples, sampling, random_store=None):
+    """
+    Tire un normal centré réduit par échantillon, pseudo-aléatoire ou quasi-aléatoire (Sobol).
+
+    :param random_store: RandomStore (voir models.random_store) où relire les tirages du paquet
+                         s'ils ont déjà été faits (None pour toujours tirer).
+    """
+    if random_store is not None:
+        return random_store.cached(rng, ('terminal_normals', num_samples, sampling),
+                                   lambda: draw_terminal_normals(rng, num_samples, sampling))
+    if sampling == 'sobol':
+        return sobol_brownian_paths(rng, num_samples, 1, 1.0)[:, -1]
+    return rng.standard_normal(num_samples)
+
+
+def european_payoff_stats_kernel(rng, num_samples, current_price, volatility, risk_free_rate, time_to_maturity, K,
+                                 antithetic, sampling, random_store=None):
+    """
+    Noyau d'un paquet : simule num_samples échantillons de prix finaux et renvoie les statistiques
+    additives des payoffs call puis put (12 valeurs).
+
+    En mode antithétique, un échantillon est la moyenne des payoffs obtenus avec Z et -Z.
+    La variable de contrôle est le prix final S_T (moyenné de la même façon), d'espérance
+    connue S0 * exp(r * T) sous la probabilité risque-neutre.
+    """
+    instrumentation = get_instrumentation()
+    with instrumentation.stage('rng'):
+        Z = draw_terminal_normals(rng, num_samples, sampling, random_store)
+    with instrumentation.stage('path_stepping'):
+        final_prices = simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, Z)
+        if antithetic:
+            mirrored_prices = simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, -Z)
+    with instrumentation.stage('payoff_reduction'):
+        call_payoffs = np.maximum(final_prices - K, 0)
+        put_payoffs = np.maximum(K - final_prices, 0)
+        if antithetic:
+            call_payoffs = 0.5 * (call_payoffs + np.maximum(mirrored_prices - K, 0))
+            put_payoffs = 0.5 * (put_payoffs + np.maximum(K - mirrored_prices, 0))
+            final_prices = 0.5 * (final_prices + mirrored_prices)
+        stats = np.concatenate([payoff_statistics(call_payoffs, final_prices),
+                                payoff_statistics(put_payoffs, final_prices)])
+    instrumentation.count('paths', 2 * num_samples if antithetic else num_samples)
+    return stats
+
+
+def european_strip_sums_kernel(rng, num_samples, current_price, volatility, risk_free_rate, time_to_maturity,
+                               strikes, antithetic, sampling, random_store=None):
+    """
+    Noyau d'un paquet : simule num_samples échantillons de prix finaux, partagés par tous les strikes,
+    et renvoie les sommes des payoffs call (un par strike) puis put (2 * len(strikes) valeurs).
+    """
+    instrumentation = get_instrumentation()
+    with instrumentation.stage('rng'):
+        Z = draw_terminal_normals(rng, num_samples, sampling, random_store)
+    with instrumentation.stage('path_stepping'):
+        final_prices = [simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, Z)]
+        if antithetic:
+            final_prices.append(simulate_terminal_prices(current_price, volatility, risk_free_rate,
+                                                         time_to_maturity, -Z))
+    with instrumentation.stage('payoff_reduction'):
+        # Boucle sur les strikes : les temporaires restent de la taille d'un paquet
+        sums = np.zeros(2 * len(strikes))
+        for prices in final_prices:
+            for i, K in enumerate(strikes):
+                sums[i] += np.maximum(prices - K, 0).sum()
+                sums[len(strikes) + i] += np.maximum(K - prices, 0).sum()
+        sums /= len(final_prices)
+    instrumentation.count('paths', len(final_prices) * num_samples)
+    return sums
+
+
+def pathwise_greek_sums(Z, current_price, volatility, risk_free_rate, time_to_maturity, K):
+    """
+    Sommes actualisées des payoffs et des estimateurs de grecques, call puis put :
+    prix, delta et vega trajectoriels (pathwise), gamma par rapport de vraisemblance.
+    """
+    final_prices = simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, Z)
+    discount = np.exp(-risk_free_rate * time_to_maturity)
+    sqrt_T = np.sqrt(time_to_maturity)
+
+    # dS_T / dS0 et dS_T / dsigma
+    d_spot = final_prices / current_price
+    d_vol = final_prices * (Z * sqrt_T - volatility * time_to_maturity)
+    # Score de second ordre de la densité de S_T par rapport à S0
+    lr_gamma = ((Z**2 - 1) / (volatility * sqrt_T) - Z) / (current_price**2 * volatility * sqrt_T)
+
+    sums = []
+    for sign in (1.0, -1.0):
+        payoffs = np.maximum(sign * (final_prices - K), 0)
+        in_the_money = sign * (final_prices - K) > 0
+        sums += [payoffs.sum(), (sign * in_the_money * d_spot).sum(), (sign * in_the_money * d_vol).sum(),
+                 (payoffs * lr_gamma).sum()]
+    return discount * np.array(sums)
+
+
+def european_greeks_kernel(rng, num_samples, current_price, volatility, risk_free_rate, time_to_maturity, K,
+                           antithetic, sampling, random_store=None):
+    """
+    Noyau d'un paquet : sommes des prix et grecques Monte Carlo du call et du put (8 valeurs),
+    calculées sur les mêmes tirages que european_payoff_stats_kernel.
+    """
+    instrumentation = get_instrumentation()
+    with instrumentation.stage('rng'):
+        Z = draw_terminal_normals(rng, num_samples, sampling, random_store)
+    # Prix finaux et sommes des estimateurs sont calculés ensemble, sans étape intermédiaire séparable
+    with instrumentation.stage('payoff_reduction'):
+        sums = pathwise_greek_sums(Z, current_price, volatility, risk_free_rate, time_to_maturity, K)
+        if antithetic:
+            sums = 0.5 * (sums + pathwise_greek_sums(-Z, current_price, volatility, risk_free_rate,
+                                                     time_to_maturity, K))
+    instrumentation.count('paths', 2 * num_samples if antithetic else num_samples)
+    return sums
+
+
 class MonteCarloPricer:
-    def __init__(self, option, stock_data, num_simulations):
+    def __init__(self, option, stock_data, num_simulations, memory_budget=DEFAULT_MEMORY_BUDGET, seed=None,
+                 num_workers=1, antithetic=False, control_variate=False, sampling='pseudo',
+                 target_std_error=None, batch_size=50000, random_store=None):
+        """
+        Initialise le pricer Monte Carlo.
+
+        :param option: L'option à pricer (classe Option).
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param num_simulations: Nombre de simulations (nombre maximal si target_std_error est fixé).
+        :param memory_budget: Budget mémoire en octets pour un paquet de trajectoires (par défaut 64 Mo).
+        :param seed: Graine du générateur aléatoire (None pour un tirage non reproductible).
+        :param num_workers: Nombre de processus utilisés pour simuler les paquets (par défaut 1).
+        :param antithetic: Utilise des variables antithétiques (Z, -Z).
+        :param control_variate: Utilise le prix final S_T, d'espérance connue, comme variable de contrôle.
+        :param sampling: 'pseudo' (pseudo-aléatoire) ou 'sobol' (quasi-aléatoire avec pont brownien).
+        :param target_std_error: Erreur standard visée : les simulations s'arrêtent dès qu'elle est atteinte.
+        :param batch_size: Nombre de trajectoires ajoutées à chaque itération en mode target_std_error.
+        :param random_store: RandomStore (voir models.random_store) où conserver les tirages de chaque paquet
+                             pour les exécutions suivantes ; les prix sont identiques avec ou sans.
+                             Ignoré sans graine : des tirages non reproductibles ne seraient jamais relus.
+        """
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method {sampling!r}, expected one of {SAMPLING_METHODS}")
         self.option = option
         self.stock_data = stock_data
         self.num_simulations = num_simulations
+        self.memory_budget = memory_budget
+        self.seed = seed
+        self.num_workers = num_workers
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.sampling = sampling
+        self.target_std_error = target_std_error
+        self.batch_size = batch_size
+        self.random_store = random_store
+        self._cached_key = None
+        self._cached_results = None
+
+    def _random_store(self):
+        # Sans graine, chaque exécution tire de nouveaux flux : rien à relire, le stock n'est pas utilisé
+        return None if self.seed is None else self.random_store
+
+    def _pricing_key(self):
+        return (self.stock_data.current_price, self.stock_data.volatility, self.option.risk_free_rate,
+                self.option.time_to_maturity, self.option.strike_price, self.num_simulations,
+                self.memory_budget, self.seed, self.antithetic, self.control_variate, self.sampling,
+                self.target_std_error, self.batch_size)
+
+    def _chunk_size(self, num_samples, paths_per_sample):
+        chunk_size = min(num_samples, chunk_size_for_budget(self.memory_budget,
+                                                            BYTES_PER_TERMINAL_PATH * paths_per_sample))
+        if self.sampling == 'sobol':
+            # Paquets de taille identique, puissance de 2, en nombre suffisant pour estimer l'erreur
+            chunk_size = min(chunk_size, max(1, num_samples // MIN_QMC_REPLICATIONS))
+            chunk_size = 1 << (chunk_size.bit_length() - 1)
+        return chunk_size
+
+    def _estimate(self, chunk_stats, control_mean, paths_per_sample, discount):
+        with get_instrumentation().stage('discounting'):
+            if self.sampling == 'sobol':
+                price, std_error = estimate_from_replications(chunk_stats, control_mean)
+            else:
+                price, std_error = estimate_from_statistics(chunk_stats.sum(axis=0), control_mean)
+            num_paths = int(chunk_stats[:, 0].sum()) * paths_per_sample
+            return MonteCarloResult(discount * price, discount * std_error, num_paths)
+
+    def estimate_call_put(self):
+        """
+        Estime les prix du call et du put, avec leur erreur standard, à partir d'un même jeu de tirages.
+
+        Si target_std_error est fixé, les simulations sont ajoutées par lots de batch_size
+        trajectoires jusqu'à ce que l'erreur standard des deux prix soit inférieure à la cible,
+        dans la limite de num_simulations trajectoires.
+
+        :return: Tuple (MonteCarloResult du call, MonteCarloResult du put).
+        """
+        S0 = self.stock_data.current_price
+        sigma = self.stock_data.volatility
+        r = self.option.risk_free_rate
+        T = self.option.time_to_maturity
+        K = self.option.strike_price
+        discount = np.exp(-r * T)
+
+        paths_per_sample = 2 if self.antithetic else 1
+        max_samples = max(1, self.num_simulations // paths_per_sample)
+        if self.target_std_error is None:
+            chunk_size = self._chunk_size(max_samples, paths_per_sample)
+            batch = max_samples
+        else:
+            batch = max(1, self.batch_size // paths_per_sample)
+            chunk_size = self._chunk_size(min(batch, max_samples), paths_per_sample)
+            batch = max(chunk_size, batch // chunk_size * chunk_size)
+
+        if self.control_variate:
+            # Espérance risque-neutre du prix final, variable de contrôle du call comme du put
+            call_mean = put_mean = S0 / discount
+        else:
+            call_mean = put_mean = None
+
+        # La graine est fixée une fois : les lots successifs poursuivent les mêmes flux de paquets
+        seed = resolve_seed(self.seed)
+        args = (S0, sigma, r, T, K, self.antithetic, self.sampling, self._random_store())
+        blocks = []
+        num_samples = 0
+        while num_samples < max_samples:
+            n = min(batch, max_samples - num_samples)
+            if self.sampling == 'sobol':
+                # Paquets complets uniquement : le reliquat inférieur à un paquet n'est pas simulé
+                n -= n % chunk_size
+                if n == 0:
+                    break
+            first_chunk_index = sum(len(block) for block in blocks)
+            blocks.append(run_chunks(european_payoff_stats_kernel, args, n, chunk_size, seed=seed,
+                                     num_workers=self.num_workers, first_chunk_index=first_chunk_index,
+                                     reduce=False))
+            num_samples += n
+
+            chunk_stats = np.concatenate(blocks)
+            call_result = self._estimate(chunk_stats[:, :6], call_mean, paths_per_sample, discount)
+            put_result = self._estimate(chunk_stats[:, 6:], put_mean, paths_per_sample, discount)
+            if self.target_std_error is not None and \
+                    max(call_result.std_error, put_result.std_error) <= self.target_std_error:
+                break
+        return call_result, put_result
+
+    def estimate_greeks(self):
+        """
+        Estime le prix, le delta, le vega (estimateurs trajectoriels) et le gamma (rapport de
+        vraisemblance) du call et du put, en une seule simulation.
+
+        Pour une même graine, les tirages sont ceux utilisés par estimate_call_put (sans
+        variable de contrôle ni arrêt anticipé).
+
+        :return: Dictionnaire {'call': {...}, 'put': {...}} des valeurs 'price', 'delta', 'vega', 'gamma'.
+        """
+        paths_per_sample = 2 if self.antithetic else 1
+        num_samples = max(1, self.num_simulations // paths_per_sample)
+        chunk_size = self._chunk_size(num_samples, paths_per_sample)
+        if self.sampling == 'sobol':
+            # Arrondi inférieur à un nombre entier de paquets, sans dépasser num_simulations
+            num_samples = num_samples // chunk_size * chunk_size
+
+        args = (self.stock_data.current_price, self.stock_data.volatility, self.option.risk_free_rate,
+                self.option.time_to_maturity, self.option.strike_price, self.antithetic, self.sampling,
+                self._random_store())
+        sums = run_chunks(european_greeks_kernel, args, num_samples, chunk_size, seed=self.seed,
+                          num_workers=self.num_workers)
+        means = sums / num_samples
+        names = ('price', 'delta', 'vega', 'gamma')
+        return {'call': dict(zip(names, means[:4].tolist())), 'put': dict(zip(names, means[4:].tolist()))}
+
+    def price_chain(self, strikes, is_call=True):
+        """
+        Calcule les prix de plusieurs strikes (même sous-jacent, même maturité) sur les mêmes
+        trajectoires : les prix finaux ne sont simulés qu'une fois pour toute la chaîne.
+
+        Les variables antithétiques et l'échantillonnage de Sobol sont pris en compte ; la
+        variable de contrôle et l'arrêt sur erreur standard cible ne s'appliquent pas ici.
+
+        :param strikes: Array des prix d'exercice.
+        :param is_call: Booléen ou array de booléens (True pour un call, False pour un put).
+        :return: Array des prix.
+        """
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+        paths_per_sample = 2 if self.antithetic else 1
+        num_samples = max(1, self.num_simulations // paths_per_sample)
+        chunk_size = self._chunk_size(num_samples, paths_per_sample)
+        if self.sampling == 'sobol':
+            # Arrondi inférieur à un nombre entier de paquets, sans dépasser num_simulations
+            num_samples = num_samples // chunk_size * chunk_size
+
+        r = self.option.risk_free_rate
+        T = self.option.time_to_maturity
+        args = (self.stock_data.current_price, self.stock_data.volatility, r, T, strikes, self.antithetic,
+                self.sampling, self._random_store())
+        sums = run_chunks(european_strip_sums_kernel, args, num_samples, chunk_size, seed=self.seed,
+                          num_workers=self.num_workers)
+        with get_instrumentation().stage('discounting'):
+            prices = np.exp(-r * T) * sums / num_samples
+        return np.where(is_call, prices[:len(strikes)], prices[len(strikes):])
+
+    def price_call_put(self):
+        """
+        Calcule les prix du call et du put à partir d'un même jeu de tirages.
+
+        Le résultat est conservé tant que les paramètres de marché et de simulation ne changent
+        pas, de sorte que price_call puis price_put ne simulent qu'une seule fois.
+
+        :return: Tuple (prix du call, prix du put).
+        """
+        key = self._pricing_key()
+        if self._cached_key != key:
+            self._cached_results = self.estimate_call_put()
+            self._cached_key = key
+        call_result, put_result = self._cached_results
+        return call_result.price, put_result.price
 
     def price_call(self):
-        # Pré-calculs des valeurs constantes
-        current_price = self.stock_data.current_price
-        volatility = self.stock_data.volatility
-        risk_free_rate = self.option.risk_free_rate
-        time_to_maturity = self.option.time_to_maturity
-        
-        # Appeler la méthode optimisée de simulation
-        print(f"Pricing call option...")
-        paths = generate_random_walks(current_price, volatility, risk_free_rate, time_to_maturity, self.num_simulations)
-        
-        # Calculer le payoff
-        final_prices = paths[:, -1]
-        payoffs = np.maximum(final_prices - self.option.strike_price, 0)
-        
-        # Vérification de la moyenne des payoffs
-        print(f"Average payoff for call option: {np.mean(payoffs)}")
-        
-        # Retourner le prix actualisé de l'option Call
-        call_price = np.exp(-risk_free_rate * time_to_maturity) * np.mean(payoffs)
-        print(f"Call option price: {call_price}")
+        call_price, _ = self.price_call_put()
         return call_price
 
     def price_put(self):
-        # Pré-calculs des valeurs constantes
-        current_price = self.stock_data.current_price
-        volatility = self.stock_data.volatility
-        risk_free_rate = self.option.risk_free_rate
-        time_to_maturity = self.option.time_to_maturity
-        
-        # Appeler la méthode optimisée de simulation
-        print(f"Pricing put option...")
-        paths = generate_random_walks(current_price, volatility, risk_free_rate, time_to_maturity, self.num_simulations)
-        
-        # Calculer le payoff
-        final_prices = paths[:, -1]
-        payoffs = np.maximum(self.option.strike_price - final_prices, 0)
-        
-        # Vérification de la moyenne des payoffs
-        print(f"Average payoff for put option: {np.mean(payoffs)}")
-        
-        # Retourner le prix actualisé de l'option Put
-        put_price = np.exp(-risk_free_rate * time_to_maturity) * np.mean(payoffs)
-        print(f"Put option price: {put_price}")
+        _, put_price = self.price_call_put()
         return put_price
@@ -1,25 +1,42 @@
-import numpy as np
-import pandas as pd
-import yfinance as yf
-from scipy.stats import norm
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+from data.market_data_provider import get_default_provider
 
 class Option:
-    def __init__(self, ticker, strike_price, maturity_date, risk_free_rate):
+    def __init__(self, ticker, strike_price, maturity_date, risk_free_rate, provider=None):
         self.ticker = ticker
+        self.provider = get_default_provider() if provider is None else provider
         self.strike_price = strike_price
         self.maturity_date = self.validate_maturity_date(maturity_date)
         self.risk_free_rate = risk_free_rate
         self.time_to_maturity = self.calculate_time_to_maturity()
 
+    @classmethod
+    def from_values(cls, ticker, strike_price, time_to_maturity, risk_free_rate, maturity_date=None, provider=None):
+        """
+        Construit une option à partir de valeurs connues, sans interroger la source de données
+        (traitements par lots, workers hors ligne).
+
+        :param time_to_maturity: Maturité en années.
+        :param maturity_date: Échéance au format "%Y-%m-%d", à titre informatif.
+        """
+        if time_to_maturity <= 0:
+            raise ValueError(f"Time to maturity must be positive, got {time_to_maturity}")
+        option = cls.__new__(cls)
+        option.ticker = ticker
+        option.provider = provider
+        option.strike_price = strike_price
+        option.maturity_date = maturity_date
+        option.risk_free_rate = risk_free_rate
+        option.time_to_maturity = time_to_maturity
+        return option
+
     def validate_maturity_date(self, maturity_date):
         if maturity_date is None:
             target_date = datetime.now() + timedelta(days=180)
         else:
             target_date = datetime.strptime(maturity_date, "%Y-%m-%d")
         
-        expirations = yf.Ticker(self.ticker).options
+        expirations = self.provider.get_expirations(self.ticker)
         closest_date = min(expirations, key=lambda x: abs(datetime.strptime(x, "%Y-%m-%d") - target_date))
         return closest_date
 
@@ -0,0 +1,182 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from models.instrumentation import RecordingInstrumentation, get_instrumentation, set_instrumentation
+
+
+def resolve_seed(seed):
+    """
+    Retourne une graine entière utilisable comme clé Philox.
+
+    :param seed: Graine fournie par l'utilisateur (None pour une graine tirée aléatoirement).
+    :return: Entier positif inférieur à 2**128.
+    """
+    if seed is None:
+        return np.random.SeedSequence().entropy % (1 << 128)
+    return int(seed) % (1 << 128)
+
+
+def chunk_generator(seed, chunk_index):
+    """
+    Construit le générateur aléatoire propre à un paquet de simulations.
+
+    Chaque paquet utilise le générateur à compteur Philox avec la même clé (la graine),
+    avancé de chunk_index * 2**128 tirages : les flux sont indépendants et ne dépendent que
+    de (seed, chunk_index), jamais du processus qui exécute le paquet.
+
+    :param seed: Graine entière (voir resolve_seed).
+    :param chunk_index: Indice du paquet.
+    :return: np.random.Generator dédié au paquet.
+    """
+    bit_generator = np.random.Philox(key=seed)
+    if chunk_index:
+        bit_generator = bit_generator.jumped(chunk_index)
+    return np.random.Generator(bit_generator)
+
+
+def split_into_chunks(num_simulations, chunk_size):
+    """
+    Découpe num_simulations en paquets de taille chunk_size (le dernier pouvant être plus petit).
+
+    :return: Liste de tuples (indice du paquet, nombre de simulations du paquet).
+    """
+    chunk_size = max(1, int(chunk_size))
+    return [(index, min(chunk_size, num_simulations - start))
+            for index, start in enumerate(range(0, num_simulations, chunk_size))]
+
+
+def process_pool_context():
+    """
+    Contexte multiprocessing des pools créés alors que d'autres threads tournent (E/S, boucle
+    asyncio) : 'forkserver' si disponible, 'spawn' sinon. Un fork hériterait des verrous tenus
+    par ces threads au moment où les processus sont lancés, d'où des blocages.
+
+    Les noyaux et leurs arguments doivent alors être importables depuis un module.
+
+    :return: Contexte à passer en mp_context à ProcessPoolExecutor.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+# Pools de processus partagés, créés au premier usage et conservés d'un appel à l'autre
+# (un par nombre de workers) : les lots successifs d'une simulation ne relancent pas de processus
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def get_process_pool(num_workers=None):
+    """
+    Renvoie le pool de processus partagé de num_workers processus, créé au premier appel.
+
+    :param num_workers: Nombre de processus (None pour le nombre de cœurs).
+    :return: ProcessPoolExecutor à passer à run_chunks (paramètre executor).
+    """
+    num_workers = num_workers or os.cpu_count()
+    with _process_pools_lock:
+        pool = _process_pools.get(num_workers)
+        if pool is None:
+            # Pool atteint depuis des threads (portefeuille, pipeline asyncio) : pas de fork
+            pool = _process_pools[num_workers] = ProcessPoolExecutor(max_workers=num_workers,
+                                                                     mp_context=process_pool_context())
+        return pool
+
+
+def _discard_process_pool(pool):
+    # Pool cassé (processus tué) : il est retiré pour que l'appel suivant en recrée un
+    with _process_pools_lock:
+        for num_workers, shared in list(_process_pools.items()):
+            if shared is pool:
+                del _process_pools[num_workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_process_pools():
+    """
+    Arrête les pools de processus partagés (appelé automatiquement à la sortie de l'interpréteur).
+    """
+    with _process_pools_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+def _run_chunk(task):
+    kernel, seed, chunk_index, num_paths, args, recording_pid = task
+    if recording_pid is None:
+        return np.asarray(kernel(chunk_generator(seed, chunk_index), num_paths, *args), dtype=np.float64)
+    if recording_pid == os.getpid():
+        # Pool de threads : l'instrumentation active du processus enregistre directement
+        return np.asarray(kernel(chunk_generator(seed, chunk_index), num_paths, *args), dtype=np.float64), None
+
+    # Paquet exécuté dans un autre processus : ses mesures sont renvoyées avec le résultat
+    instrumentation = RecordingInstrumentation()
+    previous = set_instrumentation(instrumentation)
+    try:
+        result = np.asarray(kernel(chunk_generator(seed, chunk_index), num_paths, *args), dtype=np.float64)
+    finally:
+        set_instrumentation(previous)
+    return result, instrumentation.snapshot()
+
+
+def run_chunks(kernel, args, num_simulations, chunk_size, seed=None, num_workers=1, executor=None,
+               first_chunk_index=0, reduce=True):
+    """
+    Exécute un noyau Monte Carlo sur des paquets de simulations, éventuellement en parallèle.
+
+    Le noyau est une fonction de module (pour pouvoir être envoyée aux processus) de signature
+    kernel(rng, num_paths, *args) qui renvoie un array de statistiques additives (sommes de
+    payoffs, etc.). Le découpage en paquets ne dépend que de chunk_size et les résultats sont
+    additionnés dans l'ordre des paquets : pour une graine donnée, le résultat est identique
+    au bit près quel que soit le nombre de processus.
+
+    :param kernel: Noyau à exécuter sur chaque paquet.
+    :param args: Tuple d'arguments supplémentaires passés au noyau.
+    :param num_simulations: Nombre total de simulations.
+    :param chunk_size: Nombre de simulations par paquet.
+    :param seed: Graine (None pour un tirage non reproductible).
+    :param num_workers: Nombre de processus (1 pour une exécution dans le processus courant) ; au-delà,
+                        les paquets sont répartis sur le pool partagé (voir get_process_pool).
+    :param executor: Pool de processus existant à réutiliser (prioritaire sur num_workers).
+    :param first_chunk_index: Indice du premier paquet, pour poursuivre une simulation déjà entamée
+                              avec de nouveaux flux aléatoires.
+    :param reduce: Si False, renvoie les statistiques de chaque paquet sans les additionner.
+    :return: Array des statistiques additionnées sur tous les paquets (ou empilées si reduce=False).
+    """
+    seed = resolve_seed(seed)
+    instrumentation = get_instrumentation()
+    chunks = split_into_chunks(num_simulations, chunk_size)
+    in_pool = executor is not None or num_workers is None or num_workers > 1 and len(chunks) > 1
+    # Les paquets exécutés hors du processus courant renvoient leurs mesures avec leur résultat
+    recording_pid = os.getpid() if in_pool and instrumentation.enabled else None
+    tasks = [(kernel, seed, first_chunk_index + index, num_paths, tuple(args), recording_pid)
+             for index, num_paths in chunks]
+
+    with instrumentation.stage('run_chunks'):
+        if executor is not None:
+            results = list(executor.map(_run_chunk, tasks))
+        elif in_pool:
+            pool = get_process_pool(num_workers)
+            try:
+                results = list(pool.map(_run_chunk, tasks))
+            except BrokenProcessPool:
+                _discard_process_pool(pool)
+                raise
+        else:
+            results = [_run_chunk(task) for task in tasks]
+    instrumentation.count('chunks', len(tasks))
+
+    if recording_pid is not None:
+        results, snapshots = zip(*results)
+        for snapshot in snapshots:
+            if snapshot is not None:
+                instrumentation.merge(snapshot)
+    results = np.stack(results)
+    return np.sum(results, axis=0) if reduce else results
@@ -0,0 +1,76 @@
+import numpy as np
+from collections import deque
+from scipy.special import ndtri
+
+
+def brownian_bridge_schedule(num_steps):
+    """
+    Ordre de construction du pont brownien sur une grille de num_steps pas.
+
+    Le premier point construit est l'échéance, puis les milieux successifs des intervalles
+    (parcours en largeur) : les premières coordonnées d'une suite à faible discrépance
+    déterminent ainsi la forme globale de la trajectoire.
+
+    :return: Liste de tuples (indice construit, indice gauche, indice droit ou None pour l'échéance).
+    """
+    schedule = [(num_steps, 0, None)]
+    queue = deque([(0, num_steps)])
+    while queue:
+        left, right = queue.popleft()
+        if right - left > 1:
+            middle = (left + right) // 2
+            schedule.append((middle, left, right))
+            queue.append((left, middle))
+            queue.append((middle, right))
+    return schedule
+
+
+def brownian_bridge(Z, time_to_maturity):
+    """
+    Construit des trajectoires browniennes par pont brownien à partir de tirages normaux.
+
+    :param Z: Array (num_paths, num_steps) de tirages normaux ; la colonne 0 fixe W(T).
+    :param time_to_maturity: Horizon de simulation en années.
+    :return: Array (num_paths, num_steps) des valeurs W(t_1), ..., W(t_n) sur une grille uniforme.
+    """
+    num_paths, num_steps = Z.shape
+    dt = time_to_maturity / num_steps
+    W = np.zeros((num_paths, num_steps + 1))
+    for k, (i, left, right) in enumerate(brownian_bridge_schedule(num_steps)):
+        if right is None:
+            W[:, i] = np.sqrt(i * dt) * Z[:, k]
+        else:
+            t_left, t_i, t_right = left * dt, i * dt, right * dt
+            mean = ((t_right - t_i) * W[:, left] + (t_i - t_left) * W[:, right]) / (t_right - t_left)
+            std = np.sqrt((t_i - t_left) * (t_right - t_i) / (t_right - t_left))
+            W[:, i] = mean + std * Z[:, k]
+    return W[:, 1:]
+
+
+def sobol_normals(rng, num_paths, dimension):
+    """
+    Tire des normales quasi-aléatoires à partir d'une suite de Sobol brouillée.
+
+    Le brouillage est initialisé par rng : deux paquets avec des générateurs différents
+    donnent deux réplications indépendantes, ce qui permet d'estimer l'erreur standard.
+
+    :param rng: np.random.Generator utilisé pour le brouillage.
+    :param num_paths: Nombre de points (de préférence une puissance de 2).
+    :param dimension: Dimension de la suite (nombre de pas de temps).
+    :return: Array (num_paths, dimension) de tirages normaux.
+    """
+    # scipy.stats est long à importer : on ne le charge que pour l'échantillonnage de Sobol
+    from scipy.stats import qmc
+    sampler = qmc.Sobol(d=dimension, scramble=True, seed=int(rng.integers(2**63)))
+    U = sampler.random(num_paths)
+    return ndtri(np.clip(U, 1e-16, 1 - 1e-16))
+
+
+def sobol_brownian_paths(rng, num_paths, num_steps, time_to_maturity):
+    """
+    Trajectoires browniennes quasi-aléatoires : suite de Sobol de dimension num_steps
+    transformée en trajectoires par pont brownien.
+
+    :return: Array (num_paths, num_steps) des valeurs de W sur la grille.
+    """
+    return brownian_bridge(sobol_normals(rng, num_paths, num_steps), time_to_maturity)
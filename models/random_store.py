@@ -0,0 +1,136 @@
+"""
+Stock sur disque de tirages aléatoires et de résultats de simulation, relus par np.memmap.
+
+Une entrée est indexée par l'état du générateur qui l'a produite (clé et compteur Philox, voir
+models.parallel_monte_carlo.chunk_generator) et par une étiquette décrivant le calcul : pour
+une même graine et un même paquet, le stock renvoie exactement les valeurs que le générateur
+aurait produites, d'un processus ou d'une exécution à l'autre. Les fichiers sont au format .npy
+et relus sans copie (mmap_mode='r') ; les moins récemment utilisés sont supprimés au-delà du
+budget disque.
+
+    store = RandomStore('/tmp/option_pricer_store', disk_budget=2 * 1024**3)
+    MonteCarloPricer(option, stock_data, 10_000_000, seed=42, random_store=store).price_call()
+"""
+import hashlib
+import os
+
+import numpy as np
+from models.instrumentation import get_instrumentation
+
+# Budget disque par défaut (en octets)
+DEFAULT_DISK_BUDGET = 4 * 1024**3
+
+
+class RandomStore:
+    def __init__(self, directory, disk_budget=DEFAULT_DISK_BUDGET):
+        """
+        Initialise le stock (le répertoire est créé si besoin et peut être partagé entre processus).
+
+        :param directory: Répertoire des fichiers du stock.
+        :param disk_budget: Taille maximale en octets de l'ensemble des fichiers.
+        """
+        if disk_budget <= 0:
+            raise ValueError(f"Disk budget must be positive, got {disk_budget}")
+        self.directory = directory
+        self.disk_budget = disk_budget
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, rng, tag):
+        # Les scalaires NumPy sont ramenés aux types Python : 100.0 et np.float64(100.0) donnent la même clé
+        tag = tuple(item.item() if isinstance(item, np.generic) else item for item in tag)
+        key = hashlib.sha1(repr((rng.bit_generator.state, tag)).encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def cached(self, rng, tag, compute):
+        """
+        Renvoie le résultat de compute() pour l'état courant de rng, lu sur disque s'il y est déjà.
+
+        compute doit être une fonction déterministe de rng et de tag (tirages du paquet,
+        trajectoires simulées...). Lorsque l'entrée est lue sur disque, rng n'est pas avancé :
+        le stock ne convient qu'aux tirages qui épuisent l'usage du générateur dans le paquet.
+
+        :param rng: np.random.Generator du paquet, dans l'état où compute l'utiliserait.
+        :param tag: Description hachable du calcul (type de tirage, dimensions, paramètres).
+        :param compute: Fonction sans argument renvoyant un array.
+        :return: Array (en lecture seule s'il est lu sur disque).
+        """
+        instrumentation = get_instrumentation()
+        path = self._path(rng, tag)
+        try:
+            values = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            # Absent, ou fichier incomplet d'une écriture interrompue : l'entrée est recalculée
+            values = None
+        if values is not None:
+            instrumentation.count('random_store_hits')
+            try:
+                # Date de modification = date du dernier usage, pour l'éviction
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            return values
+
+        instrumentation.count('random_store_misses')
+        values = np.asarray(compute())
+        if values.nbytes <= self.disk_budget:
+            self._write(path, values)
+        return values
+
+    def normals(self, rng, shape):
+        """
+        Tirages normaux centrés réduits rng.standard_normal(shape), lus sur disque s'ils y sont déjà.
+        """
+        return self.cached(rng, ('normals', shape), lambda: rng.standard_normal(shape))
+
+    def _write(self, path, values):
+        # Écriture dans un fichier temporaire puis renommage atomique : un lecteur concurrent
+        # ne voit jamais de fichier partiel
+        temporary = f"{path}.{os.getpid()}.tmp"
+        array = np.lib.format.open_memmap(temporary, mode='w+', dtype=values.dtype, shape=values.shape)
+        array[...] = values
+        array.flush()
+        del array
+        os.replace(temporary, path)
+        self._evict(keep=path)
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def usage(self):
+        """
+        :return: Taille totale en octets des fichiers du stock.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep=None):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_budget:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            get_instrumentation().count('random_store_evictions')
+
+    def clear(self):
+        """
+        Supprime tous les fichiers du stock.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
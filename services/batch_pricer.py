@@ -0,0 +1,375 @@
+"""
+Pricing par lots, sans interface graphique.
+
+Lit un fichier de contrats (CSV ou JSON lines), applique les modèles demandés et écrit les
+résultats au format CSV, JSON lines ou Parquet :
+
+    python -m services.batch_pricer contrats.csv -o resultats.jsonl --models black_scholes heston
+
+Colonnes reconnues : ticker, strike, maturity (en années) ou maturity_date ("%Y-%m-%d"), rate,
+option_type ('call' ou 'put') et, en option, spot et volatility. Lorsque spot ou volatility
+manquent, ils sont calculés à partir de l'historique du sous-jacent (seul accès réseau).
+
+Les modules de pricing, pandas, yfinance et matplotlib ne sont importés que s'ils servent :
+un lot Black-Scholes sur des contrats complets n'importe que NumPy et scipy.special.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from models.heston_calibration import DEFAULT_HESTON_PARAMS
+
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def read_contracts(path, default_rate=None):
+    """
+    Lit un fichier de contrats au format CSV ou JSON lines (selon l'extension).
+
+    :param path: Chemin du fichier ('.jsonl' ou '.json' pour JSON lines, CSV sinon).
+    :param default_rate: Taux sans risque utilisé lorsque la colonne rate est absente ou vide.
+    :return: Liste de dictionnaires normalisés (ticker, strike, maturity, maturity_date, rate,
+             is_call, spot, volatility, error), spot et volatility valant None s'ils sont inconnus.
+             Un contrat échu (maturité négative ou nulle) n'interrompt pas la lecture : error
+             contient le motif du rejet (None pour un contrat valide) et il ne sera pas pricé.
+    """
+    with open(path, newline='') as file:
+        if path.endswith(('.jsonl', '.json')):
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            records = list(csv.DictReader(file))
+
+    now = datetime.now()
+    contracts = []
+    for line, record in enumerate(records, start=1):
+        def value(name):
+            field = record.get(name)
+            return None if field is None or field == '' else field
+
+        maturity, maturity_date = value('maturity'), value('maturity_date')
+        if maturity is None:
+            if maturity_date is None:
+                raise ValueError(f"Contract {line} of {path} has neither maturity nor maturity_date")
+            maturity = (datetime.strptime(maturity_date, "%Y-%m-%d") - now).days / 365.0
+        rate = value('rate')
+        if rate is None:
+            if default_rate is None:
+                raise ValueError(f"Contract {line} of {path} has no rate and no default rate was given")
+            rate = default_rate
+        option_type = str(value('option_type') or 'call').lower()
+        if option_type not in ('call', 'put'):
+            raise ValueError(f"Contract {line} of {path} has unknown option_type {option_type!r}")
+
+        maturity = float(maturity)
+        error = None
+        if maturity <= 0:
+            error = f"ValueError: Time to maturity must be positive, got {maturity}"
+
+        spot, volatility = value('spot'), value('volatility')
+        contracts.append({
+            'ticker': value('ticker'),
+            'strike': float(value('strike')),
+            'maturity': maturity,
+            'maturity_date': maturity_date,
+            'rate': float(rate),
+            'is_call': option_type == 'call',
+            'spot': None if spot is None else float(spot),
+            'volatility': None if volatility is None else float(volatility),
+            'error': error,
+        })
+    return contracts
+
+
+def fill_market_inputs(contracts, provider=None, volatility_estimator=None):
+    """
+    Complète spot et volatility des contrats qui n'en ont pas, à partir de l'historique d'un an
+    du sous-jacent (une seule requête groupée pour tous les tickers concernés).
+
+    :param contracts: Liste de contrats (voir read_contracts), complétés sur place.
+    :param provider: Source de données de marché (par défaut celle du projet).
+    :param volatility_estimator: Estimateur incrémental de la volatilité (voir data.volatility_estimators) ;
+                                 les tickers dont il a déjà une estimation ne téléchargent pas d'historique.
+    :return: La liste des contrats.
+    """
+    missing = sorted({c['ticker'] for c in contracts if c['spot'] is None or c['volatility'] is None})
+    if not missing:
+        return contracts
+
+    from data.market_data_provider import get_default_provider
+    from data.stock_data import StockData
+
+    provider = get_default_provider() if provider is None else provider
+    # Préchargement groupé : chaque StockData lit ensuite l'historique dans le cache du provider
+    unknown = [ticker for ticker in missing
+               if volatility_estimator is None or not volatility_estimator.has_estimate(ticker)]
+    if unknown:
+        provider.get_price_histories(unknown, "1y")
+    stock_data = {ticker: StockData(ticker, provider, volatility_estimator) for ticker in missing}
+    for contract in contracts:
+        data = stock_data.get(contract['ticker'])
+        if data is None:
+            continue
+        if contract['spot'] is None:
+            contract['spot'] = float(data.current_price)
+        if contract['volatility'] is None:
+            contract['volatility'] = float(data.volatility)
+    return contracts
+
+
+def contract_arrays(contracts):
+    """
+    :return: Dictionnaire {champ: array} des entrées des modèles (ticker, strike, maturity, rate,
+             is_call, spot, volatility).
+    """
+    return {name: np.array([contract[name] for contract in contracts])
+            for name in ('ticker', 'strike', 'maturity', 'rate', 'is_call', 'spot', 'volatility')}
+
+
+def _group_indices(*keys):
+    """
+    Regroupe les indices des contrats partageant les mêmes valeurs de clés.
+
+    :return: Dictionnaire {tuple des clés: array des indices}.
+    """
+    groups = {}
+    for index, key in enumerate(zip(*keys)):
+        groups.setdefault(key, []).append(index)
+    return {key: np.array(indices) for key, indices in groups.items()}
+
+
+def price_black_scholes(inputs, settings):
+    from models.black_scholes_pricer import black_scholes_prices
+    return black_scholes_prices(inputs['spot'], inputs['strike'], inputs['maturity'], inputs['rate'],
+                                inputs['volatility'], inputs['is_call'])
+
+
+def price_binomial(inputs, settings):
+    """
+    Arbre binomial : les strikes d'un même (spot, taux, volatilité, maturité) sont remontés dans un seul arbre.
+    """
+    from models.binomial_tree_pricer import binomial_tree_prices
+    prices = np.empty(len(inputs['strike']))
+    groups = _group_indices(inputs['spot'], inputs['rate'], inputs['volatility'], inputs['maturity'])
+    for (S0, r, sigma, T), indices in groups.items():
+        prices[indices] = binomial_tree_prices(S0, inputs['strike'][indices], r, sigma, T, settings['num_steps'],
+                                               inputs['is_call'][indices])
+    return prices
+
+
+def price_finite_difference(inputs, settings):
+    """
+    Différences finies (Crank-Nicolson) : une résolution de l'EDP par (spot, taux, volatilité, maturité) pour tous les strikes.
+    """
+    from models.finite_difference_pricer import finite_difference_prices
+    prices = np.empty(len(inputs['strike']))
+    groups = _group_indices(inputs['spot'], inputs['rate'], inputs['volatility'], inputs['maturity'])
+    for (S0, r, sigma, T), indices in groups.items():
+        prices[indices] = finite_difference_prices(S0, inputs['strike'][indices], r, sigma, T,
+                                                   inputs['is_call'][indices])
+    return prices
+
+
+def price_heston(inputs, settings):
+    """
+    Heston semi-analytique (méthode COS) : une évaluation par (spot, taux, maturité) pour tous les strikes.
+    """
+    from models.heston_fft_pricer import cos_put_prices
+    params = settings['heston_params']
+    prices = np.empty(len(inputs['strike']))
+    for (S0, r, T), indices in _group_indices(inputs['spot'], inputs['rate'], inputs['maturity']).items():
+        K = inputs['strike'][indices]
+        puts = cos_put_prices(K, S0, r, T, **params)
+        calls = puts + S0 - K * np.exp(-r * T)
+        prices[indices] = np.where(inputs['is_call'][indices], calls, puts)
+    return prices
+
+
+def _chain_objects(ticker, S0, r, sigma, T):
+    from data.stock_data import StockData
+    from models.option import Option
+    # Le strike de l'option n'est pas utilisé : price_chain reçoit les strikes du groupe
+    return Option.from_values(ticker, S0, T, r), StockData.from_values(ticker, S0, sigma)
+
+
+def price_monte_carlo(inputs, settings):
+    """
+    Monte Carlo : les strikes d'un même (sous-jacent, spot, volatilité, taux, maturité) partagent leurs trajectoires.
+    """
+    from models.monte_carlo_pricer import MonteCarloPricer
+    prices = np.empty(len(inputs['strike']))
+    groups = _group_indices(inputs['ticker'], inputs['spot'], inputs['rate'], inputs['volatility'],
+                            inputs['maturity'])
+    for (ticker, S0, r, sigma, T), indices in groups.items():
+        pricer = MonteCarloPricer(*_chain_objects(ticker, S0, r, sigma, T), settings['num_simulations'],
+                                  seed=settings['seed'], num_workers=settings['num_workers'])
+        prices[indices] = pricer.price_chain(inputs['strike'][indices], inputs['is_call'][indices])
+    return prices
+
+
+def price_heston_monte_carlo(inputs, settings):
+    """
+    Heston Monte Carlo : les strikes d'un même (sous-jacent, spot, taux, maturité) partagent leurs trajectoires.
+    """
+    from models.heston_pricer import HestonPricer
+    prices = np.empty(len(inputs['strike']))
+    groups = _group_indices(inputs['ticker'], inputs['spot'], inputs['rate'], inputs['maturity'])
+    for (ticker, S0, r, T), indices in groups.items():
+        pricer = HestonPricer(*_chain_objects(ticker, S0, r, None, T), **settings['heston_params'],
+                              seed=settings['seed'], num_workers=settings['num_workers'])
+        prices[indices] = pricer.price_chain(inputs['strike'][indices], inputs['is_call'][indices],
+                                             settings['num_simulations'], settings['num_steps'])
+    return prices
+
+
+# Modèles disponibles : nom -> fonction (entrées en arrays, paramètres) -> array des prix
+PRICING_MODELS = {
+    'black_scholes': price_black_scholes,
+    'binomial': price_binomial,
+    'finite_difference': price_finite_difference,
+    'heston': price_heston,
+    'monte_carlo': price_monte_carlo,
+    'heston_mc': price_heston_monte_carlo,
+}
+
+
+def price_contracts(contracts, models=('black_scholes',), heston_params=None, num_simulations=10000,
+                    num_steps=252, seed=None, num_workers=1, provider=None):
+    """
+    Price une liste de contrats avec chacun des modèles demandés.
+
+    :param contracts: Liste de contrats (voir read_contracts).
+    :param models: Noms des modèles, parmi PRICING_MODELS.
+    :param heston_params: Dictionnaire des paramètres de Heston (par défaut DEFAULT_HESTON_PARAMS).
+    :param num_simulations: Nombre de simulations des modèles Monte Carlo.
+    :param num_steps: Nombre de pas de temps (arbre binomial et Heston Monte Carlo).
+    :param seed: Graine des modèles Monte Carlo (None pour un tirage non reproductible).
+    :param num_workers: Nombre de processus des modèles Monte Carlo.
+    :param provider: Source de données utilisée pour compléter spot et volatility.
+    :return: Liste de dictionnaires : champs du contrat et une colonne '<modèle>_price' par modèle,
+             plus une colonne 'error' (prix None) si des contrats ont été rejetés à la lecture.
+    """
+    unknown = [name for name in models if name not in PRICING_MODELS]
+    if unknown:
+        raise ValueError(f"Unknown pricing models {unknown}, expected some of {tuple(PRICING_MODELS)}")
+    valid = [contract for contract in contracts if contract.get('error') is None]
+    fill_market_inputs(valid, provider)
+
+    inputs = contract_arrays(valid)
+    settings = {
+        'heston_params': DEFAULT_HESTON_PARAMS if heston_params is None else heston_params,
+        'num_simulations': num_simulations,
+        'num_steps': num_steps,
+        'seed': seed,
+        'num_workers': num_workers,
+    }
+    prices = {name: PRICING_MODELS[name](inputs, settings) for name in models} if valid else {}
+
+    # Même structure pour toutes les lignes (en-tête CSV) : la colonne error n'apparaît que si nécessaire
+    with_errors = len(valid) < len(contracts)
+    rows = []
+    position = 0
+    for contract in contracts:
+        if contract.get('error') is None:
+            row = result_row(contract, {name: prices[name][position] for name in models})
+            position += 1
+        else:
+            row = result_row(contract, {name: None for name in models})
+        if with_errors:
+            row['error'] = contract.get('error')
+        rows.append(row)
+    return rows
+
+
+def result_row(contract, prices):
+    """
+    Ligne de résultat d'un contrat : ses champs et une colonne '<modèle>_price' par modèle.
+
+    :param contract: Contrat (voir read_contracts).
+    :param prices: Dictionnaire {nom du modèle: prix}.
+    """
+    row = {
+        'ticker': contract['ticker'],
+        'option_type': 'call' if contract['is_call'] else 'put',
+        'strike': contract['strike'],
+        'maturity': contract['maturity'],
+        'maturity_date': contract['maturity_date'],
+        'rate': contract['rate'],
+        'spot': contract['spot'],
+        'volatility': contract['volatility'],
+    }
+    for name, price in prices.items():
+        row[f'{name}_price'] = None if price is None else float(price)
+    return row
+
+
+def write_results(results, path, output_format=None):
+    """
+    Écrit les résultats au format CSV, JSON lines ou Parquet.
+
+    :param results: Liste de dictionnaires de même structure (voir price_contracts).
+    :param path: Chemin du fichier, ou '-' pour la sortie standard (CSV ou JSON lines).
+    :param output_format: 'csv', 'jsonl' ou 'parquet' (par défaut déduit de l'extension, JSON lines sinon).
+    """
+    if output_format is None:
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        output_format = {'json': 'jsonl', 'pq': 'parquet'}.get(extension, extension)
+        if output_format not in OUTPUT_FORMATS:
+            output_format = 'jsonl'
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}")
+
+    if output_format == 'parquet':
+        if path == '-':
+            raise ValueError("Parquet output needs a file path")
+        import pandas as pd
+        pd.DataFrame(results).to_parquet(path, index=False)
+        return
+
+    file = sys.stdout if path == '-' else open(path, 'w', newline='')
+    try:
+        if output_format == 'csv':
+            fieldnames = list(results[0]) if results else []
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            for row in results:
+                file.write(json.dumps(row) + '\n')
+    finally:
+        if file is not sys.stdout:
+            file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pricing d'un fichier de contrats, sans affichage graphique.")
+    parser.add_argument('contracts', help="Fichier des contrats (CSV ou JSON lines)")
+    parser.add_argument('-o', '--output', default='-', help="Fichier de résultats (par défaut la sortie standard)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Format de sortie (par défaut selon l'extension)")
+    parser.add_argument('--models', nargs='+', default=['black_scholes'], choices=tuple(PRICING_MODELS),
+                        help="Modèles de pricing à appliquer")
+    parser.add_argument('--rate', type=float, help="Taux sans risque des contrats sans colonne rate")
+    parser.add_argument('--heston-params', help="Fichier JSON des paramètres de Heston (kappa, theta, xi, rho, v0)")
+    parser.add_argument('--num-simulations', type=int, default=10000)
+    parser.add_argument('--num-steps', type=int, default=252)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--num-workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    heston_params = None
+    if args.heston_params is not None:
+        with open(args.heston_params) as file:
+            heston_params = {**DEFAULT_HESTON_PARAMS, **json.load(file)}
+
+    contracts = read_contracts(args.contracts, args.rate)
+    results = price_contracts(contracts, args.models, heston_params, args.num_simulations, args.num_steps,
+                              args.seed, args.num_workers)
+    write_results(results, args.output, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,416 @@
+"""
+Repricing en continu d'un portefeuille de contrats à partir d'un flux de ticks.
+
+Un flux (TickFeed) produit des ticks de spot, éventuellement de volatilité. À chaque tick, les
+contrats du sous-jacent sont repricés avec les modèles de services.batch_pricer :
+- les modèles rapides (Black-Scholes, arbre, différences finies...) et les grecques
+  Black-Scholes à chaque tick ;
+- les modèles coûteux (Heston, Monte Carlo) au plus une fois toutes les slow_interval
+  secondes de temps de marché par sous-jacent, dans des processus séparés : le chemin rapide
+  ne les attend jamais, leur dernier prix est reporté entre-temps et une mise à jour est
+  publiée dès qu'un nouveau prix est disponible.
+
+Les ticks arrivés pendant un repricing sont fusionnés : seul le dernier tick de chaque
+sous-jacent est pricé. La latence de chaque mise à jour (de la réception du tick à la fin du
+repricing) est enregistrée et résumée en percentiles.
+
+    python -m services.live_pipeline contrats.csv ticks.csv --models black_scholes heston_mc -o maj.jsonl
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from models.greek_calculator import black_scholes_greeks
+from models.heston_calibration import DEFAULT_HESTON_PARAMS
+from models.parallel_monte_carlo import process_pool_context
+from services.batch_pricer import PRICING_MODELS, contract_arrays, fill_market_inputs, read_contracts, result_row
+from services.portfolio_pricer import _price_underlying, underlying_seed
+
+# Tick de marché : horodatage (secondes epoch), ticker, spot et volatilité (None si inchangée)
+Tick = namedtuple('Tick', ['timestamp', 'ticker', 'spot', 'volatility'])
+
+# Modèles repricés à la cadence lente par défaut
+SLOW_MODELS = ('heston', 'monte_carlo', 'heston_mc')
+
+LIVE_GREEKS = ('delta', 'gamma', 'theta', 'vega', 'rho')
+
+
+def _lower_priority():
+    # Initialisation des processus des modèles lents : priorité réduite, pour que le repricing
+    # rapide garde le processeur quand les cœurs sont moins nombreux que les processus
+    if hasattr(os, 'nice'):
+        os.nice(10)
+
+
+def _timestamp(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def read_ticks(path):
+    """
+    Lit un fichier de ticks au format CSV ou JSON lines (selon l'extension).
+
+    Colonnes reconnues : timestamp (secondes epoch ou date ISO), ticker, spot ou bid et ask
+    (le spot est alors le milieu de la fourchette) et, en option, volatility.
+
+    :return: Liste de Tick, dans l'ordre du fichier.
+    """
+    with open(path, newline='') as file:
+        if path.endswith(('.jsonl', '.json')):
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            records = list(csv.DictReader(file))
+
+    ticks = []
+    for line, record in enumerate(records, start=1):
+        def value(name):
+            field = record.get(name)
+            return None if field is None or field == '' else field
+
+        spot = value('spot')
+        if spot is None:
+            bid, ask = value('bid'), value('ask')
+            if bid is None or ask is None:
+                raise ValueError(f"Tick {line} of {path} has neither spot nor bid and ask")
+            spot = 0.5 * (float(bid) + float(ask))
+        volatility = value('volatility')
+        ticks.append(Tick(_timestamp(str(value('timestamp'))), value('ticker'), float(spot),
+                          None if volatility is None else float(volatility)))
+    return ticks
+
+
+class TickFeed:
+    """
+    Interface des flux de ticks : itérateur asynchrone de Tick.
+
+    Les sous-classes implémentent ticks, un générateur asynchrone ; un flux de marché réel
+    attend ses messages réseau là où FileReplayFeed attend l'écart entre deux horodatages.
+    """
+
+    def ticks(self):
+        """
+        :return: Itérateur asynchrone de Tick.
+        """
+        raise NotImplementedError
+
+    def __aiter__(self):
+        return self.ticks().__aiter__()
+
+
+class FileReplayFeed(TickFeed):
+    """
+    Rejoue un fichier de ticks (voir read_ticks), pour les tests et l'analyse hors ligne.
+    """
+
+    def __init__(self, path, speed=None):
+        """
+        :param path: Fichier de ticks (CSV ou JSON lines).
+        :param speed: Facteur d'accélération par rapport au temps réel (1.0 pour le rythme d'origine,
+                      None pour rejouer aussi vite que possible).
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.path = path
+        self.speed = speed
+
+    async def ticks(self):
+        loop = asyncio.get_running_loop()
+        start = None
+        for tick in read_ticks(self.path):
+            if start is None:
+                start = (loop.time(), tick.timestamp)
+            if self.speed is not None:
+                # Échéance calculée depuis le début du rejeu : les retards ne s'accumulent pas
+                due = start[0] + (tick.timestamp - start[1]) / self.speed
+                await asyncio.sleep(max(0.0, due - loop.time()))
+            else:
+                # Rend la main à la boucle : le repricing en cours peut se terminer pendant le rejeu
+                await asyncio.sleep(0)
+            yield tick
+
+
+class LivePipeline:
+    def __init__(self, contracts, models=('black_scholes',), slow_models=SLOW_MODELS, slow_interval=5.0,
+                 heston_params=None, num_simulations=10000, num_steps=252, seed=0, provider=None,
+                 volatility_estimator=None, slow_workers=1):
+        """
+        Initialise le pipeline de repricing.
+
+        :param contracts: Liste de contrats (voir services.batch_pricer.read_contracts) ; spot et volatility
+                          manquants sont complétés une fois au démarrage, les contrats rejetés ignorés.
+        :param models: Noms des modèles, parmi services.batch_pricer.PRICING_MODELS.
+        :param slow_models: Modèles repricés à la cadence lente (les autres le sont à chaque tick).
+        :param slow_interval: Intervalle minimal, en secondes d'horodatage des ticks, entre deux repricings
+                              d'un même sous-jacent par les modèles lents.
+        :param heston_params: Dictionnaire des paramètres de Heston (par défaut DEFAULT_HESTON_PARAMS).
+        :param num_simulations: Nombre de simulations des modèles Monte Carlo.
+        :param num_steps: Nombre de pas de temps (arbre binomial et Heston Monte Carlo).
+        :param seed: Graine des modèles Monte Carlo, identique d'un tick à l'autre pour un même sous-jacent
+                     (nombres aléatoires communs : les variations de prix ne sont pas du bruit de simulation).
+        :param provider: Source de données utilisée pour compléter spot et volatility.
+        :param volatility_estimator: Estimateur de volatilité (voir data.volatility_estimators) utilisé pour
+                                     compléter volatility.
+        :param slow_workers: Nombre de processus dédiés aux modèles lents.
+        """
+        unknown = [name for name in models if name not in PRICING_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown pricing models {unknown}, expected some of {tuple(PRICING_MODELS)}")
+        self.models = tuple(models)
+        self.fast_models = tuple(name for name in self.models if name not in slow_models)
+        self.slow_models = tuple(name for name in self.models if name in slow_models)
+        self.slow_interval = slow_interval
+        self.heston_params = DEFAULT_HESTON_PARAMS if heston_params is None else heston_params
+        self.num_simulations = num_simulations
+        self.num_steps = num_steps
+        self.seed = seed
+        self.slow_workers = slow_workers
+
+        # Les contrats rejetés à la lecture (voir read_contracts) gardent une ligne d'erreur et ne sont pas repricés
+        self.contracts = list(contracts)
+        valid = [contract for contract in self.contracts if contract.get('error') is None]
+        fill_market_inputs(valid, provider, volatility_estimator)
+        self._groups = {}
+        self.rows = [None] * len(self.contracts)
+        for index, contract in enumerate(self.contracts):
+            if contract.get('error') is None:
+                self._groups.setdefault(contract['ticker'], []).append(index)
+            else:
+                self.rows[index] = {**result_row(contract, {name: None for name in self.models}),
+                                    'error': contract['error']}
+        self._slow_prices = {}
+        self._slow_refreshed_at = {}
+        # Sous-jacents dont les prix lents ont changé depuis leur dernière mise à jour publiée
+        self._slow_unpublished = set()
+
+        self.ticks_received = 0
+        self.ticks_coalesced = 0
+        self.latencies = []
+
+    def _settings(self, ticker):
+        return {
+            'heston_params': self.heston_params,
+            'num_simulations': self.num_simulations,
+            'num_steps': self.num_steps,
+            'seed': underlying_seed(self.seed, ticker),
+            'num_workers': 1,
+        }
+
+    def reprice(self, tick):
+        """
+        Applique un tick et reprice les contrats de son sous-jacent avec les modèles rapides (synchrone).
+
+        Les prix des modèles lents sont les derniers obtenus (voir refresh_slow), None avant le premier.
+
+        :return: Mise à jour {'ticker', 'timestamp', 'spot', 'slow_refresh', 'rows'} (None si aucun
+                 contrat ne porte sur ce sous-jacent). Chaque ligne contient les prix de tous les
+                 modèles et les grecques Black-Scholes ; slow_refresh indique que les prix lents
+                 ont changé depuis la mise à jour précédente.
+        """
+        indices = self._groups.get(tick.ticker)
+        if indices is None:
+            return None
+        group = [self.contracts[index] for index in indices]
+        for contract in group:
+            contract['spot'] = tick.spot
+            if tick.volatility is not None:
+                contract['volatility'] = tick.volatility
+
+        inputs = contract_arrays(group)
+        prices = _price_underlying(inputs, self._settings(tick.ticker), self.fast_models)
+        prices.update(self._slow_prices.get(tick.ticker, {}))
+        slow_refresh = tick.ticker in self._slow_unpublished
+        self._slow_unpublished.discard(tick.ticker)
+
+        greeks = black_scholes_greeks(inputs['spot'], inputs['strike'], inputs['maturity'], inputs['rate'],
+                                      inputs['volatility'], inputs['is_call'])
+        rows = []
+        for position, (index, contract) in enumerate(zip(indices, group)):
+            row = result_row(contract, {name: prices[name][position] if name in prices else None
+                                        for name in self.models})
+            row.update({name: float(greeks[name][position]) for name in LIVE_GREEKS})
+            self.rows[index] = row
+            rows.append(row)
+        return {'ticker': tick.ticker, 'timestamp': tick.timestamp, 'spot': tick.spot,
+                'slow_refresh': slow_refresh, 'rows': rows}
+
+    def slow_refresh_due(self, tick):
+        """
+        :return: True si les modèles lents doivent être repricés pour le sous-jacent du tick.
+        """
+        if not self.slow_models or tick.ticker not in self._groups:
+            return False
+        last_refresh = self._slow_refreshed_at.get(tick.ticker)
+        return last_refresh is None or tick.timestamp - last_refresh >= self.slow_interval
+
+    def _slow_job(self, tick):
+        # Instantané des entrées du sous-jacent : les ticks suivants peuvent être appliqués pendant le calcul
+        self._slow_refreshed_at[tick.ticker] = tick.timestamp
+        group = [self.contracts[index] for index in self._groups[tick.ticker]]
+        return contract_arrays(group), self._settings(tick.ticker), self.slow_models
+
+    def _merge_slow(self, ticker, prices):
+        self._slow_prices[ticker] = prices
+        self._slow_unpublished.add(ticker)
+
+    def refresh_slow(self, tick):
+        """
+        Reprice les contrats du sous-jacent du tick avec les modèles lents (synchrone), aux entrées
+        courantes ; les prix sont repris par les appels suivants de reprice.
+        """
+        self._merge_slow(tick.ticker, _price_underlying(*self._slow_job(tick)))
+
+    async def run(self, feed, on_update=None):
+        """
+        Consomme un flux de ticks jusqu'à son épuisement et reprice le portefeuille au fil de l'eau.
+
+        La lecture du flux continue pendant les repricings rapides (exécutés dans un thread dédié) :
+        les ticks d'un sous-jacent arrivés entre-temps sont fusionnés et seul le plus récent est pricé.
+        Les modèles lents tournent dans slow_workers processus ; à la fin de chaque calcul, le
+        sous-jacent est repricé avec son dernier tick pour publier les nouveaux prix.
+
+        :param feed: Flux de ticks (TickFeed ou tout itérateur asynchrone de Tick).
+        :param on_update: Fonction appelée avec chaque mise à jour (voir reprice).
+        :return: Statistiques du rejeu (voir stats).
+        """
+        loop = asyncio.get_running_loop()
+        pending = {}
+        last_ticks = {}
+        slow_jobs = {}
+        failures = []
+        ready = asyncio.Event()
+        finished = False
+
+        async def consume():
+            nonlocal finished
+            try:
+                async for tick in feed:
+                    self.ticks_received += 1
+                    if tick.ticker in pending:
+                        self.ticks_coalesced += 1
+                    pending[tick.ticker] = (tick, time.perf_counter())
+                    ready.set()
+            finally:
+                finished = True
+                ready.set()
+
+        def slow_done(ticker, future):
+            del slow_jobs[ticker]
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                failures.append(future.exception())
+            else:
+                self._merge_slow(ticker, future.result())
+                # Republie le sous-jacent avec les nouveaux prix lents, sauf si un tick est déjà en attente
+                pending.setdefault(ticker, (last_ticks[ticker], time.perf_counter()))
+            ready.set()
+
+        reader = asyncio.create_task(consume())
+        executor = ThreadPoolExecutor(max_workers=1)
+        slow_executor = None
+        if self.slow_models:
+            slow_executor = ProcessPoolExecutor(max_workers=self.slow_workers, mp_context=process_pool_context(),
+                                                initializer=_lower_priority)
+        try:
+            while True:
+                if failures:
+                    raise failures[0]
+                if not pending:
+                    if finished and not slow_jobs:
+                        break
+                    await ready.wait()
+                    ready.clear()
+                    continue
+                batch = list(pending.values())
+                pending.clear()
+                for tick, received_at in batch:
+                    update = await loop.run_in_executor(executor, self.reprice, tick)
+                    if update is None:
+                        continue
+                    last_ticks[tick.ticker] = tick
+                    self.latencies.append(time.perf_counter() - received_at)
+                    if on_update is not None:
+                        on_update(update)
+                    if tick.ticker not in slow_jobs and self.slow_refresh_due(tick):
+                        future = loop.run_in_executor(slow_executor, _price_underlying, *self._slow_job(tick))
+                        slow_jobs[tick.ticker] = future
+                        future.add_done_callback(lambda future, ticker=tick.ticker: slow_done(ticker, future))
+            # Propage une éventuelle erreur du flux
+            await reader
+        finally:
+            if not reader.done():
+                reader.cancel()
+            executor.shutdown(wait=True)
+            if slow_executor is not None:
+                slow_executor.shutdown(wait=True, cancel_futures=True)
+        return self.stats()
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """
+        :return: Dictionnaire {'p50': ..., 'p90': ..., ...} des latences par mise à jour, en millisecondes.
+        """
+        if not self.latencies:
+            return {f'p{p:g}': None for p in percentiles}
+        values = np.percentile(np.array(self.latencies) * 1e3, percentiles)
+        return {f'p{p:g}': float(value) for p, value in zip(percentiles, values)}
+
+    def stats(self):
+        """
+        :return: Dictionnaire (ticks reçus, ticks fusionnés, mises à jour, percentiles de latence en ms).
+        """
+        return {
+            'ticks': self.ticks_received,
+            'coalesced': self.ticks_coalesced,
+            'updates': len(self.latencies),
+            'latency_ms': self.latency_percentiles(),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repricing d'un portefeuille sur un flux de ticks rejoué.")
+    parser.add_argument('contracts', help="Fichier des contrats (CSV ou JSON lines)")
+    parser.add_argument('ticks', help="Fichier des ticks (CSV ou JSON lines)")
+    parser.add_argument('-o', '--output', help="Fichier JSON lines des mises à jour ('-' pour la sortie standard)")
+    parser.add_argument('--models', nargs='+', default=['black_scholes'], choices=tuple(PRICING_MODELS),
+                        help="Modèles de pricing à appliquer")
+    parser.add_argument('--slow-models', nargs='*', default=list(SLOW_MODELS), choices=tuple(PRICING_MODELS),
+                        help="Modèles repricés à la cadence lente")
+    parser.add_argument('--slow-interval', type=float, default=5.0,
+                        help="Secondes entre deux repricings d'un sous-jacent par les modèles lents")
+    parser.add_argument('--slow-workers', type=int, default=1, help="Processus dédiés aux modèles lents")
+    parser.add_argument('--speed', type=float, help="Accélération du rejeu (par défaut aussi vite que possible)")
+    parser.add_argument('--rate', type=float, help="Taux sans risque des contrats sans colonne rate")
+    parser.add_argument('--num-simulations', type=int, default=10000)
+    parser.add_argument('--num-steps', type=int, default=252)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pipeline = LivePipeline(read_contracts(args.contracts, args.rate), args.models, args.slow_models,
+                            args.slow_interval, num_simulations=args.num_simulations, num_steps=args.num_steps,
+                            seed=args.seed, slow_workers=args.slow_workers)
+    output = None
+    if args.output is not None:
+        output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        on_update = None if output is None else lambda update: output.write(json.dumps(update) + '\n')
+        stats = asyncio.run(pipeline.run(FileReplayFeed(args.ticks, args.speed), on_update))
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from models import monte_carlo_pricer
 from models.black_scholes_pricer import BlackScholesPricer
 from models.monte_carlo_pricer import MonteCarloPricer
 from models.heston_pricer import HestonPricer
+from models.heston_fft_pricer import HestonFFTPricer
+from models.heston_calibration import DEFAULT_HESTON_PARAMS, HestonCalibrator
 from models.binomial_tree_pricer import BinomialTreePricer
 from data.market_data import MarketData
 from models.greek_calculator import GreekCalculator
 
 class OptionPricer:
-    def __init__(self, option, stock_data, num_simulations=10000, num_steps=252):
+    def __init__(self, option, stock_data, num_simulations=10000, num_steps=252, heston_params=None):
         """
         Initialise le pricer d'options.
 
@@ -17,6 +18,8 @@ class OptionPricer:
         :param stock_data: Les données de l'actif sous-jacent (classe StockData).
         :param num_simulations: Nombre de simulations pour Monte Carlo (par défaut 10 000).
         :param num_steps: Nombre de pas de temps pour les simulations (par défaut 252).
+        :param heston_params: Dictionnaire des paramètres de Heston (kappa, theta, xi, rho, v0),
+                              par défaut DEFAULT_HESTON_PARAMS.
         """
         self.option = option
         self.stock_data = stock_data
@@ -26,10 +29,29 @@ class OptionPricer:
         # Initialisation des pricers
         self.black_scholes_pricer = BlackScholesPricer(option, stock_data)
         self.monte_carlo_pricer = MonteCarloPricer(option, stock_data, num_simulations)
-        self.heston_pricer = HestonPricer(option, stock_data, kappa=2.0, theta=0.04, xi=0.1, rho=-0.7, v0=0.04)
+        heston_params = DEFAULT_HESTON_PARAMS if heston_params is None else heston_params
+        self.heston_pricer = HestonPricer(option, stock_data, **heston_params)
+        self.heston_fft_pricer = HestonFFTPricer(option, stock_data, **heston_params)
         self.binomial_tree_pricer = BinomialTreePricer(option, stock_data, num_steps) 
         self.market_data = MarketData(option)
         self.greek_calculator = GreekCalculator(option, stock_data)
+        self.heston_calibrator = HestonCalibrator(heston_params)
+
+    def calibrate_heston(self, max_expirations=None):
+        """
+        Calibre les paramètres de Heston sur la chaîne d'options du marché et les applique
+        aux pricers Heston (Monte Carlo et semi-analytique).
+
+        Les appels successifs repartent de la calibration précédente.
+
+        :param max_expirations: Nombre maximal d'échéances utilisées (None pour toutes).
+        :return: Dictionnaire des paramètres calibrés.
+        """
+        params = self.heston_calibrator.calibrate_market(self.market_data, self.stock_data, max_expirations)
+        for pricer in (self.heston_pricer, self.heston_fft_pricer):
+            for name, value in params.items():
+                setattr(pricer, name, value)
+        return params
 
     def compare_prices(self):
         """
@@ -40,6 +62,7 @@ class OptionPricer:
         bs_call_price = self.black_scholes_pricer.price_call()
         mc_call_price = self.monte_carlo_pricer.price_call()
         heston_call_price = self.heston_pricer.price_call(self.num_simulations, self.num_steps)
+        heston_fft_call_price = self.heston_fft_pricer.price_call()
         binomial_call_price = self.binomial_tree_pricer.price_call()
         market_call_price = self.market_data.get_market_price(call=True)
 
@@ -47,6 +70,7 @@ class OptionPricer:
         bs_put_price = self.black_scholes_pricer.price_put()
         mc_put_price = self.monte_carlo_pricer.price_put()
         heston_put_price = self.heston_pricer.price_put(self.num_simulations, self.num_steps)
+        heston_fft_put_price = self.heston_fft_pricer.price_put()
         binomial_put_price = self.binomial_tree_pricer.price_put()
         market_put_price = self.market_data.get_market_price(call=False)
 
@@ -68,6 +92,7 @@ class OptionPricer:
         print(f"{'Black-Scholes':<20} {bs_call_price:>9.2f} $")
         print(f"{'Monte Carlo':<20} {mc_call_price:>9.2f} $")
         print(f"{'Heston':<20} {heston_call_price:>9.2f} $")
+        print(f"{'Heston (COS)':<20} {heston_fft_call_price:>9.2f} $")
         print(f"{'Binomial Tree':<20} {binomial_call_price:>9.2f} $")
 
         # Résultats pour les puts
@@ -79,6 +104,7 @@ class OptionPricer:
         print(f"{'Black-Scholes':<20} {bs_put_price:>9.2f} $")
         print(f"{'Monte Carlo':<20} {mc_put_price:>9.2f} $")
         print(f"{'Heston':<20} {heston_put_price:>9.2f} $")
+        print(f"{'Heston (COS)':<20} {heston_fft_put_price:>9.2f} $")
         print(f"{'Binomial Tree':<20} {binomial_put_price:>9.2f} $")
 
         # Affichage des grecques
@@ -89,6 +115,7 @@ class OptionPricer:
         print(f"{'Vega':<10} {vega:.4f}")
         print(f"{'Rho':<10} {rho:.4f}")
 
+        import matplotlib.pyplot as plt
         plt.plot(delta)
 
         # Visualisation des trajectoires de Heston
@@ -103,13 +130,15 @@ class OptionPricer:
         """
         Affiche un histogramme des prix finaux simulés par Monte Carlo.
         """
+        import matplotlib.pyplot as plt
+
         current_price = self.stock_data.current_price
         volatility = self.stock_data.volatility
         risk_free_rate = self.option.risk_free_rate
         time_to_maturity = self.option.time_to_maturity
         
-        paths = monte_carlo_pricer.generate_random_walks(current_price, volatility, risk_free_rate, time_to_maturity, self.num_simulations)
-        final_prices = paths[:, -1]
+        Z = np.random.standard_normal(self.num_simulations)
+        final_prices = monte_carlo_pricer.simulate_terminal_prices(current_price, volatility, risk_free_rate, time_to_maturity, Z)
 
         plt.figure(figsize=(10, 6))
         plt.hist(final_prices, bins=50, alpha=0.75, color='blue', edgecolor='black')
@@ -126,6 +155,8 @@ class OptionPricer:
         """
         Affiche un graphique comparant les prix des options (call et put) calculés par Black-Scholes, Monte Carlo, Heston, Binomial Tree et le marché.
         """
+        import matplotlib.pyplot as plt
+
         # Données pour les calls
         call_methods = ['Black-Scholes', 'Monte Carlo', 'Heston', 'Binomial Tree']
         call_prices = [bs_call_price, mc_call_price, heston_call_price, binomial_call_price]
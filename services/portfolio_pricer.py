@@ -0,0 +1,205 @@
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from models.heston_calibration import DEFAULT_HESTON_PARAMS
+from models.parallel_monte_carlo import process_pool_context
+from services.batch_pricer import PRICING_MODELS, contract_arrays, fill_market_inputs, result_row
+
+
+def _price_underlying(inputs, settings, models):
+    """
+    Price les contrats d'un sous-jacent avec chacun des modèles (exécuté dans un processus du pool).
+
+    Les entrées sont des arrays et des nombres uniquement : rien qui dépende d'une connexion
+    (provider, base SQLite) n'est envoyé aux processus.
+    """
+    return {name: PRICING_MODELS[name](inputs, settings) for name in models}
+
+
+def underlying_seed(seed, ticker):
+    """
+    Graine propre à un sous-jacent, qui ne dépend que de (seed, ticker) et pas de l'ordre de traitement.
+    """
+    if seed is None:
+        return None
+    return (int(seed) << 32) + zlib.crc32(str(ticker).encode())
+
+
+class PortfolioPricer:
+    def __init__(self, models=('black_scholes',), heston_params=None, num_simulations=10000, num_steps=252,
+                 seed=None, num_workers=None, io_workers=8, provider=None, market_prices=False):
+        """
+        Initialise le pricer de portefeuille.
+
+        Les contrats sont regroupés par sous-jacent : les historiques de tous les sous-jacents sont
+        préchargés en une requête groupée, puis les données de marché (spot, volatilité, chaînes
+        d'options) sont complétées une fois par sous-jacent, en parallèle dans un pool de threads, et chaque sous-jacent est pricé dans un pool de processus dès que ses données
+        sont disponibles. Au sein d'un sous-jacent, les modèles partagent arbres, trajectoires et
+        évaluations entre strikes (voir services.batch_pricer).
+
+        :param models: Noms des modèles, parmi services.batch_pricer.PRICING_MODELS.
+        :param heston_params: Dictionnaire des paramètres de Heston (par défaut DEFAULT_HESTON_PARAMS).
+        :param num_simulations: Nombre de simulations des modèles Monte Carlo.
+        :param num_steps: Nombre de pas de temps (arbre binomial et Heston Monte Carlo).
+        :param seed: Graine des modèles Monte Carlo, déclinée par sous-jacent (None pour un tirage non reproductible).
+        :param num_workers: Nombre de processus de calcul (None pour un par cœur, 1 pour calculer dans le processus courant).
+        :param io_workers: Nombre de threads pour les accès aux données de marché.
+        :param provider: Source de données de marché (par défaut celle du projet).
+        :param market_prices: Ajoute le prix de marché (colonne market_price) des contrats ayant une maturity_date.
+        """
+        unknown = [name for name in models if name not in PRICING_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown pricing models {unknown}, expected some of {tuple(PRICING_MODELS)}")
+        self.models = tuple(models)
+        self.heston_params = DEFAULT_HESTON_PARAMS if heston_params is None else heston_params
+        self.num_simulations = num_simulations
+        self.num_steps = num_steps
+        self.seed = seed
+        self.num_workers = num_workers
+        self.io_workers = io_workers
+        self.provider = provider
+        self.market_prices = market_prices
+
+    def _settings(self, ticker):
+        return {
+            'heston_params': self.heston_params,
+            'num_simulations': self.num_simulations,
+            'num_steps': self.num_steps,
+            'seed': underlying_seed(self.seed, ticker),
+            # Le parallélisme est déjà au niveau des sous-jacents
+            'num_workers': 1,
+        }
+
+    def _provider(self):
+        """
+        Source de données du portefeuille, derrière un cache : le préchargement groupé (voir _prefetch)
+        y dépose les historiques que chaque sous-jacent relit ensuite.
+        """
+        from data.market_data_provider import CachedProvider, get_default_provider
+        provider = get_default_provider() if self.provider is None else self.provider
+        return provider if isinstance(provider, CachedProvider) else CachedProvider(provider)
+
+    def _prefetch(self, provider, contracts):
+        """
+        Télécharge en une seule requête groupée les historiques de tous les sous-jacents à compléter.
+        """
+        tickers = sorted({contract['ticker'] for contract in contracts
+                          if contract['spot'] is None or contract['volatility'] is None})
+        if not tickers:
+            return
+        try:
+            provider.get_price_histories(tickers, "1y")
+        except Exception:
+            # Échec du lot : chaque sous-jacent retente seul et ses erreurs deviennent des lignes d'erreur
+            pass
+
+    def _fetch_underlying(self, contracts, provider):
+        """
+        Récupère les données de marché d'un sous-jacent (exécuté dans un thread).
+
+        :return: Liste des prix de marché des contrats (None si non demandés ou indisponibles).
+        """
+        fill_market_inputs(contracts, provider)
+        if not self.market_prices:
+            return [None] * len(contracts)
+
+        from data.market_data import MarketData
+        from models.option import Option
+        market_prices = []
+        for contract in contracts:
+            price = None
+            if contract['maturity_date'] is not None:
+                option = Option.from_values(contract['ticker'], contract['strike'], contract['maturity'],
+                                            contract['rate'], contract['maturity_date'], provider)
+                try:
+                    price = float(MarketData(option, provider).get_market_price(call=contract['is_call']))
+                except (KeyError, ValueError):
+                    # Échéance non cotée : le contrat est pricé sans prix de marché
+                    price = None
+            market_prices.append(price)
+        return market_prices
+
+    def _rows(self, contracts, prices, market_prices):
+        rows = []
+        for index, contract in enumerate(contracts):
+            row = result_row(contract, {name: prices[name][index] for name in self.models})
+            if self.market_prices:
+                row['market_price'] = market_prices[index]
+            rows.append(row)
+        return rows
+
+    def _error_rows(self, contracts, error):
+        rows = []
+        for contract in contracts:
+            row = result_row(contract, {name: None for name in self.models})
+            if self.market_prices:
+                row['market_price'] = None
+            row['error'] = error
+            rows.append(row)
+        return rows
+
+    def iter_prices(self, contracts):
+        """
+        Price un portefeuille et renvoie les résultats au fil de l'eau, sous-jacent par sous-jacent.
+
+        Un sous-jacent dont les données ou le pricing échouent produit des lignes avec une
+        colonne 'error' (et des prix None), sans interrompre le reste du portefeuille ; de même
+        pour les contrats rejetés à la lecture (voir read_contracts).
+
+        :param contracts: Liste de contrats (voir services.batch_pricer.read_contracts), complétés sur place.
+        :return: Générateur de tuples (indice du contrat dans la liste, ligne de résultat).
+        """
+        groups = {}
+        for index, contract in enumerate(contracts):
+            if contract.get('error') is not None:
+                yield index, self._error_rows([contract], contract['error'])[0]
+                continue
+            groups.setdefault(contract['ticker'], []).append(index)
+
+        # Les processus sont lancés par un forkserver et non par fork : le pool démarre ses workers
+        # au premier submit, pendant que les threads d'E/S tournent
+        provider = self._provider()
+        self._prefetch(provider, [contracts[index] for indices in groups.values() for index in indices])
+
+        pool = None if self.num_workers == 1 else ProcessPoolExecutor(max_workers=self.num_workers,
+                                                                      mp_context=process_pool_context())
+        io_pool = ThreadPoolExecutor(max_workers=self.io_workers)
+        try:
+            pending = {}
+            for ticker, indices in groups.items():
+                group = [contracts[index] for index in indices]
+                pending[io_pool.submit(self._fetch_underlying, group, provider)] = ('fetch', ticker, group, None)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, ticker, group, market_prices = pending.pop(future)
+                    indices = groups[ticker]
+                    try:
+                        result = future.result()
+                        if stage == 'fetch':
+                            market_prices = result
+                            args = (contract_arrays(group), self._settings(ticker), self.models)
+                            if pool is not None:
+                                pending[pool.submit(_price_underlying, *args)] = ('price', ticker, group, market_prices)
+                                continue
+                            result = _price_underlying(*args)
+                        rows = self._rows(group, result, market_prices)
+                    except Exception as error:
+                        rows = self._error_rows(group, f"{type(error).__name__}: {error}")
+                    yield from zip(indices, rows)
+        finally:
+            io_pool.shutdown(wait=True, cancel_futures=True)
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def price_portfolio(self, contracts):
+        """
+        Price un portefeuille complet.
+
+        :return: Liste des lignes de résultat, dans l'ordre des contrats.
+        """
+        rows = [None] * len(contracts)
+        for index, row in self.iter_prices(contracts):
+            rows[index] = row
+        return rows
@@ -0,0 +1,234 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from data.stock_data import StockData
+from models.binomial_tree_pricer import BinomialTreePricer
+from models.black_scholes_pricer import BlackScholesPricer
+from models.greek_calculator import black_scholes_greeks
+from models.heston_pricer import HestonPricer
+from models.monte_carlo_pricer import MonteCarloPricer
+
+# Chocs relatifs des différences finies utilisées pour les pricers sans grecques dédiées
+FINITE_DIFFERENCE_SPOT_BUMP = 1e-3
+FINITE_DIFFERENCE_VOL_BUMP = 1e-3
+
+
+def _freeze(value):
+    """
+    Convertit une valeur de paramètre en valeur hachable, utilisable dans une clé de cache.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return tuple(value.ravel().tolist())
+    return value
+
+
+def pricer_key(pricer, is_call=True, args=()):
+    """
+    Clé de cache d'un prix : modèle, contrat (sous-jacent compris) et paramètres du pricer, hors spot
+    et volatilité.
+
+    Les paramètres du pricer sont ses attributs publics (nombre de simulations, graine,
+    paramètres de Heston, nombre de pas...), de sorte que deux configurations différentes
+    ne partagent jamais une entrée.
+
+    :param pricer: Pricer (BlackScholesPricer, MonteCarloPricer, HestonPricer...).
+    :param is_call: True pour un call, False pour un put.
+    :param args: Arguments supplémentaires de price_call / price_put (par exemple num_simulations).
+    """
+    option = pricer.option
+    params = tuple(sorted((name, _freeze(value)) for name, value in vars(pricer).items()
+                          if not name.startswith('_') and name not in ('option', 'stock_data')))
+    return (type(pricer).__name__, bool(is_call), _freeze(args), option.ticker, option.strike_price,
+            option.time_to_maturity, option.risk_free_rate, params)
+
+
+def _with_market(pricer, spot, volatility):
+    """
+    Copie du pricer sur un sous-jacent de spot et de volatilité donnés (le pricer d'origine n'est pas modifié).
+    """
+    bumped = copy.copy(pricer)
+    bumped.stock_data = StockData.from_values(pricer.stock_data.ticker, spot, volatility)
+    return bumped
+
+
+def finite_difference_greeks(price, pricer, is_call=True, args=()):
+    """
+    Delta, gamma et vega d'un pricer quelconque par différences finies centrées (quatre évaluations).
+
+    :param price: Prix au point courant.
+    """
+    S = pricer.stock_data.current_price
+    sigma = pricer.stock_data.volatility
+    method = 'price_call' if is_call else 'price_put'
+    h = FINITE_DIFFERENCE_SPOT_BUMP * S
+    k = FINITE_DIFFERENCE_VOL_BUMP
+
+    up, down = (getattr(_with_market(pricer, spot, sigma), method)(*args) for spot in (S + h, S - h))
+    vol_up, vol_down = (getattr(_with_market(pricer, S, vol), method)(*args) for vol in (sigma + k, sigma - k))
+    return {'delta': (up - down) / (2 * h), 'gamma': (up - 2 * price + down) / h**2,
+            'vega': (vol_up - vol_down) / (2 * k)}
+
+
+def anchor_greeks(pricer, price, is_call=True, args=()):
+    """
+    Sensibilités utilisées pour la mise à jour de Taylor, selon le modèle :
+    formules fermées pour Black-Scholes et l'arbre binomial européen, estimateurs Monte Carlo sur
+    les mêmes tirages pour MonteCarloPricer et HestonPricer, différences finies sinon (dont l'arbre
+    américain, dont les sensibilités s'écartent de Black-Scholes près de la frontière d'exercice).
+
+    :return: Dictionnaire des grecques ('delta', 'gamma', 'vega' et éventuellement 'vanna', 'volga').
+    """
+    side = 'call' if is_call else 'put'
+    if isinstance(pricer, BlackScholesPricer) or isinstance(pricer, BinomialTreePricer) and not pricer.american:
+        greeks = black_scholes_greeks(pricer.stock_data.current_price, pricer.option.strike_price,
+                                      pricer.option.time_to_maturity, pricer.option.risk_free_rate,
+                                      pricer.stock_data.volatility, is_call)
+        return {name: float(greeks[name]) for name in ('delta', 'gamma', 'vega', 'vanna', 'volga')}
+    if isinstance(pricer, MonteCarloPricer):
+        return pricer.estimate_greeks()[side]
+    if isinstance(pricer, HestonPricer):
+        # Le prix de Heston ne dépend pas de la volatilité historique du sous-jacent : vega nul
+        return {**pricer.estimate_greeks(*args)[side], 'vega': 0.0}
+    return finite_difference_greeks(price, pricer, is_call, args)
+
+
+class PricingCache:
+    def __init__(self, max_entries=10000, spot_threshold=0.005, vol_threshold=0.005):
+        """
+        Cache des prix, avec éviction LRU et mise à jour de Taylor pour les petits mouvements.
+
+        Chaque entrée est indexée par le modèle et tous ses paramètres hors spot et volatilité
+        (voir pricer_key) et conserve le dernier prix complet, son point d'ancrage (spot,
+        volatilité) et ses grecques, calculées seulement à la première mise à jour de Taylor
+        (un miss coûte ainsi un seul repricing). Un nouveau prix est :
+        - lu directement si spot et volatilité n'ont pas bougé ;
+        - extrapolé au second ordre depuis l'ancrage si le spot a bougé de moins de spot_threshold
+          (en relatif) et la volatilité de moins de vol_threshold (en absolu) ;
+        - recalculé complètement sinon, ce qui déplace l'ancrage.
+
+        :param max_entries: Nombre maximal d'entrées (les moins récemment utilisées sont évincées).
+        :param spot_threshold: Mouvement relatif du spot au-delà duquel le prix est recalculé (0 pour désactiver Taylor).
+        :param vol_threshold: Mouvement absolu de la volatilité au-delà duquel le prix est recalculé.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.spot_threshold = spot_threshold
+        self.vol_threshold = vol_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.taylor_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, spot, volatility):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            anchor_spot, anchor_vol, price, greeks, compute_greeks = entry
+            if spot == anchor_spot and volatility == anchor_vol:
+                self.hits += 1
+                return price
+
+            dS = spot - anchor_spot
+            dsigma = volatility - anchor_vol
+            if greeks is None and compute_greeks is None or abs(dS) > self.spot_threshold * abs(anchor_spot) \
+                    or abs(dsigma) > self.vol_threshold:
+                self.misses += 1
+                return None
+
+        if greeks is None:
+            # Première mise à jour de Taylor depuis cet ancrage : grecques calculées hors du verrou
+            greeks = compute_greeks(price)
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    entry[3:] = [greeks, None]
+        with self._lock:
+            self.taylor_hits += 1
+        return (price + greeks.get('delta', 0.0) * dS + 0.5 * greeks.get('gamma', 0.0) * dS**2
+                + greeks.get('vega', 0.0) * dsigma + greeks.get('vanna', 0.0) * dS * dsigma
+                + 0.5 * greeks.get('volga', 0.0) * dsigma**2)
+
+    def _store(self, key, spot, volatility, price, compute_greeks):
+        with self._lock:
+            # Grecques (None tant qu'elles ne servent pas) et fonction qui les calcule à l'ancrage
+            self._entries[key] = [spot, volatility, price, None, compute_greeks]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_price(self, key, spot, volatility, reprice, greeks=None):
+        """
+        Renvoie le prix en cache (exact ou mis à jour par Taylor), ou le calcule et l'enregistre.
+
+        :param key: Clé hachable du modèle et de ses paramètres, hors spot et volatilité.
+        :param spot: Prix courant du sous-jacent.
+        :param volatility: Volatilité courante.
+        :param reprice: Fonction sans argument calculant le prix complet.
+        :param greeks: Fonction recevant le prix et renvoyant les grecques au point courant, appelée à la
+                       première mise à jour de Taylor (None pour ne servir que les correspondances exactes).
+        :return: Prix.
+        """
+        price = self._lookup(key, spot, volatility)
+        if price is None:
+            price = float(reprice())
+            self._store(key, spot, volatility, price, greeks)
+        return price
+
+    def price(self, pricer, is_call=True, *args):
+        """
+        Prix d'un call ou d'un put par un pricer du projet, à travers le cache.
+
+        :param pricer: Pricer (BlackScholesPricer, MonteCarloPricer, HestonPricer, BinomialTreePricer...).
+        :param is_call: True pour un call, False pour un put.
+        :param args: Arguments supplémentaires de price_call / price_put (par exemple num_simulations, num_steps).
+        :return: Prix.
+        """
+        method = pricer.price_call if is_call else pricer.price_put
+        greeks = None
+        if self.spot_threshold > 0 or self.vol_threshold > 0:
+            # Copie figée au point d'ancrage : les grecques peuvent être calculées bien après le prix
+            anchor = _with_market(pricer, pricer.stock_data.current_price, pricer.stock_data.volatility)
+            greeks = lambda price: anchor_greeks(anchor, price, is_call, args)
+        return self.get_or_price(pricer_key(pricer, is_call, args), pricer.stock_data.current_price,
+                                 pricer.stock_data.volatility, lambda: method(*args), greeks)
+
+    def invalidate(self, key=None):
+        """
+        Supprime une entrée (ou toutes si key est None).
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        :return: Dictionnaire des statistiques (entrées, hits exacts, hits Taylor, misses, évictions, taux de hit).
+        """
+        with self._lock:
+            lookups = self.hits + self.taylor_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'taylor_hits': self.taylor_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.taylor_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,196 @@
+import numpy as np
+
+from models.binomial_tree_pricer import binomial_tree_prices
+from models.black_scholes_pricer import black_scholes_prices
+from models.heston_calibration import DEFAULT_HESTON_PARAMS
+from models.heston_fft_pricer import cos_put_prices
+from models.heston_pricer import HESTON_SCHEMES, simulate_heston_euler_terminal, simulate_heston_qe_terminal
+from models.parallel_monte_carlo import chunk_generator, resolve_seed
+
+SCENARIO_MODELS = ('black_scholes', 'binomial', 'heston', 'monte_carlo', 'heston_mc')
+
+
+def sorted_payoff_means(X, scales, K, is_call=True):
+    """
+    Moyennes des payoffs max(w * (a * X - K), 0) pour plusieurs facteurs d'échelle a, sur un
+    même échantillon X trié par ordre croissant.
+
+    Avec les sommes cumulées de X, chaque facteur ne coûte qu'une recherche dichotomique :
+    E[(a X - K)+] = (a * somme des X > K / a - K * nombre des X > K / a) / n.
+
+    :param X: Array trié de valeurs positives (prix finaux normalisés).
+    :param scales: Array des facteurs d'échelle a > 0.
+    :param K: Prix d'exercice.
+    :param is_call: True pour un call, False pour un put.
+    :return: Array des moyennes, de la forme de scales.
+    """
+    scales = np.asarray(scales, dtype=np.float64)
+    cumulative = np.concatenate([[0.0], np.cumsum(X)])
+    below = np.searchsorted(X, K / scales, side='right')
+    if is_call:
+        return (scales * (cumulative[-1] - cumulative[below]) - K * (len(X) - below)) / len(X)
+    return (K * below - scales * cumulative[below]) / len(X)
+
+
+class ScenarioEngine:
+    def __init__(self, option, stock_data, num_simulations=100000, num_steps=252, seed=0, heston_params=None,
+                 heston_scheme='qe'):
+        """
+        Initialise le moteur de scénarios (grilles de stress spot / volatilité / taux / temps).
+
+        Les modèles à formule fermée sont évalués sur toute la grille en une passe vectorisée.
+        Les modèles de simulation réutilisent les mêmes tirages dans tous les scénarios
+        (nombres aléatoires communs) : les écarts entre scénarios sont lisses, et les chocs de
+        spot et de taux, qui ne font que multiplier S_T, ne demandent aucune nouvelle simulation.
+
+        :param option: L'option à pricer (classe Option).
+        :param stock_data: Les données de l'actif sous-jacent (classe StockData).
+        :param num_simulations: Nombre de trajectoires des modèles Monte Carlo.
+        :param num_steps: Nombre de pas (arbre binomial et Heston Monte Carlo).
+        :param seed: Graine des tirages communs à tous les scénarios.
+        :param heston_params: Dictionnaire des paramètres de Heston (par défaut DEFAULT_HESTON_PARAMS).
+        :param heston_scheme: Schéma de discrétisation de Heston Monte Carlo ('qe' ou 'euler').
+        """
+        if heston_scheme not in HESTON_SCHEMES:
+            raise ValueError(f"Unknown Heston scheme {heston_scheme!r}, expected one of {HESTON_SCHEMES}")
+        self.option = option
+        self.stock_data = stock_data
+        self.num_simulations = num_simulations
+        self.num_steps = num_steps
+        self.seed = resolve_seed(seed)
+        self.heston_params = DEFAULT_HESTON_PARAMS if heston_params is None else heston_params
+        self.heston_scheme = heston_scheme
+        self._normals = None
+
+    def _common_normals(self):
+        if self._normals is None or len(self._normals) != self.num_simulations:
+            self._normals = chunk_generator(self.seed, 0).standard_normal(self.num_simulations)
+        return self._normals
+
+    def _scenario_axes(self, spot_shifts, vol_shifts, rate_shifts, time_shifts):
+        spots = self.stock_data.current_price * (1 + np.asarray(spot_shifts, dtype=np.float64))
+        vols = self.stock_data.volatility + np.asarray(vol_shifts, dtype=np.float64)
+        rates = self.option.risk_free_rate + np.asarray(rate_shifts, dtype=np.float64)
+        maturities = self.option.time_to_maturity - np.asarray(time_shifts, dtype=np.float64)
+        if np.any(spots <= 0):
+            raise ValueError(f"Spot shifts must keep the spot positive, got spots {spots}")
+        if np.any(vols <= 0):
+            raise ValueError(f"Volatility shifts must keep the volatility positive, got {vols}")
+        if np.any(maturities <= 0):
+            raise ValueError(f"Time shifts must stay before maturity {self.option.time_to_maturity}, "
+                             f"got remaining maturities {maturities}")
+        return spots, vols, rates, maturities
+
+    def _heston_v0(self, vol_shift):
+        # Un choc de volatilité porte sur la volatilité instantanée initiale sqrt(v0)
+        shocked = np.sqrt(self.heston_params['v0']) + vol_shift
+        if shocked <= 0:
+            raise ValueError(f"Volatility shift {vol_shift} makes the Heston initial volatility non-positive")
+        return shocked**2
+
+    def _black_scholes(self, spots, vols, rates, maturities, is_call):
+        return black_scholes_prices(spots[:, None, None, None], self.option.strike_price,
+                                    maturities[None, None, None, :], rates[None, None, :, None],
+                                    vols[None, :, None, None], is_call)
+
+    def _binomial(self, spots, vols, rates, maturities, is_call):
+        # Homogénéité : prix(S, K) = S * prix(1, K / S), tous les spots dans un seul arbre
+        K = self.option.strike_price
+        grid = np.empty((len(spots), len(vols), len(rates), len(maturities)))
+        for j, sigma in enumerate(vols):
+            for k, r in enumerate(rates):
+                for l, T in enumerate(maturities):
+                    grid[:, j, k, l] = spots * binomial_tree_prices(1.0, K / spots, r, sigma, T, self.num_steps,
+                                                                    is_call)
+        return grid
+
+    def _heston(self, spots, vol_shifts, rates, maturities, is_call):
+        K = self.option.strike_price
+        params = dict(self.heston_params)
+        grid = np.empty((len(spots), len(vol_shifts), len(rates), len(maturities)))
+        for j, vol_shift in enumerate(vol_shifts):
+            params['v0'] = self._heston_v0(vol_shift)
+            for k, r in enumerate(rates):
+                for l, T in enumerate(maturities):
+                    puts = spots * cos_put_prices(K / spots, 1.0, r, T, **params)
+                    grid[:, j, k, l] = puts + spots - K * np.exp(-r * T) if is_call else puts
+        return grid
+
+    def _monte_carlo(self, spots, vols, rates, maturities, is_call):
+        # S_T = S * exp(r T) * X avec X = exp(-sigma^2 T / 2 + sigma sqrt(T) Z) : un tri de X par (vol, maturité),
+        # puis chaque (spot, taux) n'est qu'un facteur d'échelle
+        K = self.option.strike_price
+        Z = self._common_normals()
+        grid = np.empty((len(spots), len(vols), len(rates), len(maturities)))
+        for j, sigma in enumerate(vols):
+            for l, T in enumerate(maturities):
+                X = np.sort(np.exp(-0.5 * sigma**2 * T + sigma * np.sqrt(T) * Z))
+                scales = spots[:, None] * np.exp(rates * T)[None, :]
+                grid[:, j, :, l] = np.exp(-rates * T)[None, :] * sorted_payoff_means(X, scales, K, is_call)
+        return grid
+
+    def _heston_monte_carlo(self, spots, vol_shifts, rates, maturities, is_call):
+        # Les trajectoires de Heston sont simulées une fois par (choc de volatilité, maturité), avec la même
+        # graine ; le log-prix étant affine en ln(S0) et en r T, spot et taux ne font que multiplier S_T
+        K = self.option.strike_price
+        r0 = self.option.risk_free_rate
+        params = dict(self.heston_params)
+        simulate = simulate_heston_qe_terminal if self.heston_scheme == 'qe' else simulate_heston_euler_terminal
+        grid = np.empty((len(spots), len(vol_shifts), len(rates), len(maturities)))
+        for j, vol_shift in enumerate(vol_shifts):
+            params['v0'] = self._heston_v0(vol_shift)
+            for l, T in enumerate(maturities):
+                X, _ = simulate(chunk_generator(self.seed, 0), self.num_simulations, 1.0, r0, T, params['kappa'],
+                                params['theta'], params['xi'], params['rho'], params['v0'], self.num_steps)
+                X.sort()
+                scales = spots[:, None] * np.exp((rates - r0) * T)[None, :]
+                grid[:, j, :, l] = np.exp(-rates * T)[None, :] * sorted_payoff_means(X, scales, K, is_call)
+        return grid
+
+    def price_grid(self, spot_shifts=(0.0,), vol_shifts=(0.0,), rate_shifts=(0.0,), time_shifts=(0.0,),
+                   is_call=True, models=('black_scholes',)):
+        """
+        Calcule les prix de l'option sur une grille de scénarios.
+
+        Pour Heston (semi-analytique et Monte Carlo), la volatilité de l'actif n'intervient pas :
+        le choc de volatilité s'applique à la volatilité initiale sqrt(v0).
+
+        :param spot_shifts: Chocs relatifs du spot (par exemple np.linspace(-0.2, 0.2, 9)).
+        :param vol_shifts: Chocs absolus de volatilité (par exemple np.linspace(-0.1, 0.1, 5)).
+        :param rate_shifts: Chocs absolus du taux sans risque.
+        :param time_shifts: Temps écoulé en années (la maturité restante diminue d'autant).
+        :param is_call: True pour un call, False pour un put.
+        :param models: Noms des modèles, parmi SCENARIO_MODELS.
+        :return: Dictionnaire {modèle: array (spot, volatilité, taux, temps) des prix}.
+        """
+        unknown = [name for name in models if name not in SCENARIO_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown scenario models {unknown}, expected some of {SCENARIO_MODELS}")
+        spots, vols, rates, maturities = self._scenario_axes(spot_shifts, vol_shifts, rate_shifts, time_shifts)
+        vol_shifts = np.asarray(vol_shifts, dtype=np.float64)
+
+        grids = {}
+        for name in models:
+            if name == 'black_scholes':
+                grids[name] = self._black_scholes(spots, vols, rates, maturities, is_call)
+            elif name == 'binomial':
+                grids[name] = self._binomial(spots, vols, rates, maturities, is_call)
+            elif name == 'heston':
+                grids[name] = self._heston(spots, vol_shifts, rates, maturities, is_call)
+            elif name == 'monte_carlo':
+                grids[name] = self._monte_carlo(spots, vols, rates, maturities, is_call)
+            else:
+                grids[name] = self._heston_monte_carlo(spots, vol_shifts, rates, maturities, is_call)
+        return grids
+
+    def pnl_grid(self, spot_shifts=(0.0,), vol_shifts=(0.0,), rate_shifts=(0.0,), time_shifts=(0.0,),
+                 is_call=True, models=('black_scholes',)):
+        """
+        Variations de prix de l'option sur une grille de scénarios, par rapport au scénario sans choc
+        (évalué avec les mêmes tirages pour les modèles de simulation).
+
+        :return: Dictionnaire {modèle: array (spot, volatilité, taux, temps) des variations de prix}.
+        """
+        grids = self.price_grid(spot_shifts, vol_shifts, rate_shifts, time_shifts, is_call, models)
+        base = self.price_grid(is_call=is_call, models=models)
+        return {name: grid - base[name].reshape(()) for name, grid in grids.items()}